@@ -0,0 +1,142 @@
+"""
+Columnar analytics for revenue and inventory.
+
+Rows are turned into parallel arrays once (quantities, prices, category codes)
+and the aggregates are computed with whole-array NumPy operations: ``bincount``
+for group sums, ``cumsum`` for moving averages. When NumPy is not
+installed every function falls back to the equivalent Python loop, which is
+also what ``benchmarks/bench_analytics.py`` measures the vectorized versions
+against.
+"""
+import itertools
+import math
+from collections import OrderedDict
+from utils.constants import DEFAULT_REORDER_POINT
+
+try:
+    import numpy as np
+except ImportError:  # analytics still work, just without vectorization
+    np = None
+
+def inventory_valuation(quantities, prices, categories, reorder_points=DEFAULT_REORDER_POINT):
+    """
+    Stock value per category and overall. Returns {'categories': [{'Category', 'Items',
+    'Units', 'Value', 'Low_Stock'}, ...] sorted by category, 'items', 'units', 'value'}.
+    ``reorder_points`` is one level for every item or one per item; items below it count
+    as low stock, the same rule as ``sales_products.Below_Reorder``.
+    """
+    if np is None:
+        if isinstance(reorder_points, (int, float)):
+            reorder_points = itertools.repeat(reorder_points)
+        groups = OrderedDict()
+        for qty, price, category, low_stock in sorted(zip(quantities, prices, categories, reorder_points),
+                                                       key=lambda r: str(r[2])):
+            group = groups.setdefault(category, {'Category': category, 'Items': 0, 'Units': 0, 'Value': 0.0, 'Low_Stock': 0})
+            group['Items'] += 1
+            group['Units'] += int(qty or 0)
+            group['Value'] += float(qty or 0) * float(price or 0)
+            group['Low_Stock'] += int((qty or 0) < low_stock)
+        result = list(groups.values())
+    else:
+        qty = np.asarray(quantities, dtype=np.float64)
+        value = qty * np.asarray(prices, dtype=np.float64)
+        names, codes = np.unique(np.asarray(categories, dtype=str), return_inverse=True)
+        items = np.bincount(codes, minlength=len(names))
+        units = np.bincount(codes, weights=qty, minlength=len(names))
+        values = np.bincount(codes, weights=value, minlength=len(names))
+        low = np.bincount(codes, weights=(qty < np.asarray(reorder_points, dtype=np.float64)), minlength=len(names))
+        result = [{'Category': str(name), 'Items': int(i), 'Units': int(u), 'Value': float(v), 'Low_Stock': int(l)}
+                  for name, i, u, v, l in zip(names, items, units, values, low)]
+    return {
+        'categories': result,
+        'items': sum(r['Items'] for r in result),
+        'units': sum(r['Units'] for r in result),
+        'value': sum(r['Value'] for r in result),
+    }
+
+
+def moving_average(values, window):
+    """Trailing mean over ``window`` points; the first ``window - 1`` entries are None."""
+    window = int(window)
+    if window < 1:
+        raise ValueError('Window must be at least 1')
+    if np is None:
+        result, running = [], 0.0
+        values = [float(v) for v in values]
+        for i, value in enumerate(values):
+            running += value
+            if i >= window:
+                running -= values[i - window]
+            result.append(running / window if i >= window - 1 else None)
+        return result
+    data = np.asarray(values, dtype=np.float64)
+    sums = np.cumsum(np.concatenate(([0.0], data)))
+    means = (sums[window:] - sums[:-window]) / window
+    return [None] * min(window - 1, len(data)) + means.tolist()
+
+
+def sell_through(product_ids, quantities_sold, stock_on_hand):
+    """
+    Units sold / (units sold + units still on hand) per product. ``stock_on_hand``
+    maps product id -> current quantity. Returns {product_id: rate}.
+    """
+    if np is None:
+        sold = {}
+        for product_id, qty in zip(product_ids, quantities_sold):
+            sold[product_id] = sold.get(product_id, 0) + qty
+    else:
+        ids = np.asarray(product_ids, dtype=np.int64)
+        if ids.size == 0:
+            return {}
+        totals = np.bincount(ids, weights=np.asarray(quantities_sold, dtype=np.float64))
+        present = np.nonzero(totals)[0]
+        sold = dict(zip(present.tolist(), totals[present].tolist()))
+    rates = {}
+    for product_id, units in sold.items():
+        available = units + max(0, stock_on_hand.get(product_id, 0) or 0)
+        rates[product_id] = units / available if available else 0.0
+    return rates
+
+
+def reorder_forecast(item_ids, stock, demand_ids, demand_qty, window_days, lead_time_days, cover_days):
+    """
+    Demand rate and days of stock left per item. ``demand_ids``/``demand_qty`` are the
+    units sold over the last ``window_days`` (ids not in ``item_ids`` are ignored).
+    An item is due for reorder when it cannot cover ``lead_time_days + cover_days``;
+    the reorder quantity tops it back up to that. Returns {'daily_demand', 'days_left'
+    (None when nothing sells), 'reorder_qty'}, each aligned with ``item_ids``.
+    """
+    horizon = lead_time_days + cover_days
+    if np is None:
+        sold = {}
+        for item_id, qty in zip(demand_ids, demand_qty):
+            sold[item_id] = sold.get(item_id, 0) + float(qty or 0)
+        daily, days_left, reorder = [], [], []
+        for item_id, on_hand in zip(item_ids, stock):
+            on_hand = max(0.0, float(on_hand or 0))
+            rate = sold.get(item_id, 0.0) / window_days
+            daily.append(rate)
+            days_left.append(on_hand / rate if rate > 0 else None)
+            reorder.append(max(0, math.ceil(rate * horizon - on_hand)))
+        return {'daily_demand': daily, 'days_left': days_left, 'reorder_qty': reorder}
+
+    ids = np.asarray(item_ids, dtype=np.int64)
+    on_hand = np.maximum(np.asarray(stock, dtype=np.float64), 0)
+    sold = np.zeros(len(ids))
+    demand = np.asarray(demand_ids, dtype=np.int64)
+    if len(ids) and len(demand):
+        # Map each demand row to its item position with one sorted search
+        order = np.argsort(ids)
+        positions = order[np.minimum(np.searchsorted(ids, demand, sorter=order), len(ids) - 1)]
+        known = ids[positions] == demand
+        sold = np.bincount(positions[known], weights=np.asarray(demand_qty, dtype=np.float64)[known],
+                           minlength=len(ids))
+    rate = sold / window_days
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days = np.where(rate > 0, on_hand / rate, np.nan)
+    reorder = np.ceil(np.maximum(rate * horizon - on_hand, 0))
+    return {
+        'daily_demand': rate.tolist(),
+        'days_left': [None if math.isnan(d) else d for d in days.tolist()],
+        'reorder_qty': reorder.astype(np.int64).tolist(),
+    }
@@ -1,5 +1,11 @@
 from database.db_connection import Database
+from database.schema_cache import SchemaCache
 from abc import ABC, abstractmethod
+from utils.constants import ARCHIVE_CHUNK_SIZE
+
+# MySQL errors an archive move hits when the table changed since its columns were cached:
+# unknown column, column count mismatch, unknown table
+_SCHEMA_ERRNOS = (1054, 1136, 1146)
 
 
 class BaseManager(ABC):
@@ -9,54 +15,133 @@ class BaseManager(ABC):
         self.table_name = None
         self.archived_table_name = None
         self.id_column = None
+        self.schema = SchemaCache(db)
+        self._cache = {}
+        # Cleared when nothing invalidates the cache on other terminals' writes (no change feed)
+        self.cache_enabled = True
     
-    def archive(self, record_id):
+    def cached(self, key, loader):
+        """Memoizes a read until the next write or change-feed invalidation."""
+        if not self.cache_enabled:
+            return list(loader())
+        if key not in self._cache:
+            self._cache[key] = loader()
+        return list(self._cache[key])
+    
+    def invalidate_cache(self, *args):
+        self._cache.clear()
+    
+    def stored_columns(self):
+        """Columns of table_name that can be copied; generated columns are computed by MySQL."""
+        return self.schema.stored_columns(self.table_name)
+    
+    def archive_columns(self):
+        """Stored columns that exist in both the live and the archive table."""
+        archived = set(self.schema.columns(self.archived_table_name))
+        return [col for col in self.stored_columns() if col in archived]
+    
+    def _require_archive(self):
         if not self.table_name or not self.archived_table_name or not self.id_column:
             raise NotImplementedError("Subclass must define table_name, archived_table_name, and id_column")
-        
+    
+    def _move_chunks(self, source, target, ids, chunk_size, on_progress, archiving):
+        """
+        Moves rows ``ids`` from ``source`` to ``target`` in chunks of ``chunk_size``,
+        each an INSERT ... SELECT plus DELETE in its own transaction, so row locks are
+        held for one chunk at a time. When archiving, ``_close_dependents`` runs in the
+        same transaction. Returns the number of rows moved.
+        """
+        ids = list(ids)
+        moved = 0
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            try:
+                moved += self._move_chunk(source, target, chunk, archiving)
+            except Exception as e:
+                if getattr(e, 'errno', None) not in _SCHEMA_ERRNOS:
+                    raise
+                # Another process altered the table after its columns were cached; reload and retry once
+                self.schema.invalidate()
+                moved += self._move_chunk(source, target, chunk, archiving)
+            if on_progress:
+                on_progress(min(start + chunk_size, len(ids)), len(ids))
+        self.invalidate_cache()
+        return moved
+    
+    def _move_chunk(self, source, target, chunk, archiving):
+        column_list = ', '.join(self.archive_columns())
+        if archiving:
+            copy_columns, select_columns = f"{column_list}, Deleted_On", f"{column_list}, NOW()"
+        else:
+            copy_columns = select_columns = column_list
+        placeholders = ', '.join(['%s'] * len(chunk))
+        with self.db.transaction():
+            moved = self.db.execute_rowcount(f"""
+                INSERT INTO {target} ({copy_columns})
+                SELECT {select_columns}
+                FROM {source} WHERE {self.id_column} IN ({placeholders})
+            """, tuple(chunk))
+            self.db.execute(f'DELETE FROM {source} WHERE {self.id_column} IN ({placeholders})', tuple(chunk))
+            if archiving:
+                self._close_dependents(chunk, placeholders)
+        return moved
+    
+    def _close_dependents(self, ids, placeholders):
+        """Closes rows of other tables that refer to the archived ``ids``; nothing by default."""
+        pass
+    
+    def archive_many(self, record_ids, chunk_size=ARCHIVE_CHUNK_SIZE, on_progress=None):
+        """Archives ``record_ids`` chunk by chunk; ``on_progress(done, total)`` is called after each chunk."""
+        self._require_archive()
         try:
-            columns = self.db.fetch(f"SHOW COLUMNS FROM {self.table_name}")
-            column_names = [col['Field'] for col in columns]
-            column_list = ", ".join(column_names)
-            
-            archive_query = f"""
-                INSERT INTO {self.archived_table_name} ({column_list}, Deleted_On)
-                SELECT {column_list}, NOW()
-                FROM {self.table_name} WHERE {self.id_column}=%s
-            """
-            self.db.execute(archive_query, (record_id,))
-            
-            self.db.execute(f'DELETE FROM {self.table_name} WHERE {self.id_column}=%s', (record_id,))
-            return True
+            return self._move_chunks(self.table_name, self.archived_table_name, record_ids, chunk_size, on_progress, True)
         except Exception as e:
-            raise RuntimeError(f"Failed to archive {self.table_name} record: {str(e)}")
+            raise RuntimeError(f"Failed to archive {self.table_name} records: {str(e)}")
     
-    def restore(self, record_id):
-        if not self.table_name or not self.archived_table_name or not self.id_column:
-            raise NotImplementedError("Subclass must define table_name, archived_table_name, and id_column")
-        
+    def archive_where(self, predicate, params=(), chunk_size=ARCHIVE_CHUNK_SIZE, on_progress=None):
+        """
+        Archives every row matching the SQL ``predicate`` (placeholders filled from
+        ``params``), e.g. ``archive_where("Status = %s AND Appointment_Date < %s",
+        ('Done', cutoff))``. Ids are read one chunk at a time in key order, so the
+        match is never held in memory or locked as a whole. Returns the rows archived.
+        """
+        self._require_archive()
+        total = self.db.fetch(f"SELECT COUNT(*) AS count FROM {self.table_name} WHERE {predicate}", tuple(params))[0]['count']
+        archived, last_id = 0, None
         try:
-            row = self.db.fetch(f'SELECT * FROM {self.archived_table_name} WHERE {self.id_column}=%s', (record_id,))
-            if not row:
-                return None
-            
-            record = row[0]
-            columns = self.db.fetch(f"SHOW COLUMNS FROM {self.table_name}")
-            column_names = [col['Field'] for col in columns]
-            
-            # Build insert values
-            placeholders = ', '.join(['%s'] * len(column_names))
-            column_list = ', '.join(column_names)
-            
-            values = tuple(record.get(col) for col in column_names)
-            
-            insert_query = f'INSERT INTO {self.table_name} ({column_list}) VALUES ({placeholders})'
-            self.db.execute(insert_query, values)
-            
-            self.db.execute(f'DELETE FROM {self.archived_table_name} WHERE {self.id_column}=%s', (record_id,))
-            return True
+            while True:
+                after = f" AND {self.id_column} > %s" if last_id is not None else ''
+                rows = self.db.fetch(f"""SELECT {self.id_column} FROM {self.table_name}
+                                        WHERE ({predicate}){after}
+                                        ORDER BY {self.id_column} LIMIT %s""",
+                                     (*params, *([last_id] if last_id is not None else []), int(chunk_size)))
+                if not rows:
+                    break
+                ids = [row[self.id_column] for row in rows]
+                archived += self._move_chunks(self.table_name, self.archived_table_name, ids, chunk_size, None, True)
+                last_id = ids[-1]
+                if on_progress:
+                    on_progress(archived, max(total, archived))
+                if len(ids) < chunk_size:
+                    break
         except Exception as e:
-            raise RuntimeError(f"Failed to restore {self.table_name} record: {str(e)}")
+            raise RuntimeError(f"Failed to archive {self.table_name} records: {str(e)}")
+        return archived
+    
+    def restore_many(self, record_ids, chunk_size=ARCHIVE_CHUNK_SIZE, on_progress=None):
+        """Moves archived ``record_ids`` back, chunk by chunk. Returns the rows restored."""
+        self._require_archive()
+        try:
+            return self._move_chunks(self.archived_table_name, self.table_name, record_ids, chunk_size, on_progress, False)
+        except Exception as e:
+            raise RuntimeError(f"Failed to restore {self.table_name} records: {str(e)}")
+    
+    def archive(self, record_id):
+        self.archive_many([record_id])
+        return True
+    
+    def restore(self, record_id):
+        return True if self.restore_many([record_id]) else None
     
     def list_archived(self):
         if not self.archived_table_name:
@@ -0,0 +1,79 @@
+"""
+Week-at-a-time appointment cache for the calendar view.
+
+Weeks are loaded with one date-range query each and kept in a small LRU.
+The neighbours of the week on screen are fetched on a background thread so
+paging back and forth never waits on the database.
+"""
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+
+def week_start(day):
+    """Monday of the week containing ``day``."""
+    return day - timedelta(days=day.weekday())
+
+
+class WeekCache:
+    def __init__(self, loader, max_weeks=12):
+        """``loader(start_date, end_date)`` returns the appointment rows of that range."""
+        self.loader = loader
+        self.max_weeks = max_weeks
+        self._weeks = OrderedDict()
+        self._inflight = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def _store(self, start, rows):
+        self._weeks[start] = rows
+        self._weeks.move_to_end(start)
+        while len(self._weeks) > self.max_weeks:
+            self._weeks.popitem(last=False)
+
+    def get(self, start):
+        with self._lock:
+            if start in self._weeks:
+                self._weeks.move_to_end(start)
+                return self._weeks[start]
+            generation = self._generation
+        rows = self.loader(start, start + timedelta(days=6))
+        with self._lock:
+            if generation == self._generation:
+                self._store(start, rows)
+        return rows
+
+    def prefetch(self, *starts):
+        for start in starts:
+            with self._lock:
+                if start in self._weeks or start in self._inflight:
+                    continue
+                self._inflight.add(start)
+                generation = self._generation
+            threading.Thread(target=self._load, args=(start, generation), name='week-prefetch', daemon=True).start()
+
+    def _load(self, start, generation):
+        try:
+            rows = self.loader(start, start + timedelta(days=6))
+            with self._lock:
+                # Drop results that raced with an invalidation
+                if generation == self._generation:
+                    self._store(start, rows)
+        except Exception as e:
+            logger.warning(f"Prefetch of week {start} failed: {str(e)}")
+        finally:
+            with self._lock:
+                self._inflight.discard(start)
+
+    def invalidate(self, days=None):
+        """Drops the cached weeks containing ``days``, or every week when ``days`` is None."""
+        with self._lock:
+            if days is None:
+                self._weeks.clear()
+            else:
+                for start in {week_start(day) for day in days}:
+                    self._weeks.pop(start, None)
+            self._generation += 1
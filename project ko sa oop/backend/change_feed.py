@@ -0,0 +1,122 @@
+"""
+Lightweight change feed.
+
+Every tracked table has ``CHANGE_FEED_SHARDS`` rows in ``table_versions`` whose
+counters are bumped by AFTER INSERT/UPDATE/DELETE triggers, so writes from any
+terminal are visible. A trigger bumps the row picked by the writer's connection
+id, so concurrent checkouts do not queue on one row lock; a table's version is
+the sum of its rows. Frames subscribe to the tables they display and only
+refetch when one of those versions moves, which costs a single small SELECT per
+poll.
+"""
+from database.db_connection import Database
+from utils.constants import TRACKED_TABLES, CHANGE_FEED_SHARDS
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+_TRIGGER_EVENTS = ('INSERT', 'UPDATE', 'DELETE')
+
+
+def install_change_triggers(db: Database, tables=TRACKED_TABLES):
+    """
+    Create the version-bump triggers that are missing and replace ones written
+    before the counters were sharded. Safe to run on every start.
+    """
+    existing = {row['Trigger']: row['Statement'] for row in db.fetch('SHOW TRIGGERS')}
+    db.execute_many("INSERT IGNORE INTO table_versions (Table_Name, Shard, Version) VALUES (%s, %s, 0)",
+                    [(table, shard) for table in tables for shard in range(CHANGE_FEED_SHARDS)])
+    for table in tables:
+        for event in _TRIGGER_EVENTS:
+            name = f"trg_{table}_{event.lower()}_version"
+            if name in existing and 'Shard' in existing[name]:
+                continue
+            try:
+                if name in existing:
+                    db.execute(f"DROP TRIGGER IF EXISTS `{name}`")
+                db.execute(f"""
+                    CREATE TRIGGER `{name}` AFTER {event} ON `{table}`
+                    FOR EACH ROW
+                    UPDATE table_versions SET Version = Version + 1, Updated_At = NOW(6)
+                    WHERE Table_Name = '{table}' AND Shard = CONNECTION_ID() % {CHANGE_FEED_SHARDS}
+                """)
+                logger.info(f"Trigger '{name}' created")
+            except Exception as e:
+                # Binary logging without SUPER/log_bin_trust_function_creators blocks triggers;
+                # the UI keeps working, it just falls back to manual refresh.
+                logger.warning(f"Could not create trigger '{name}': {str(e)}")
+
+
+def change_triggers_installed(db: Database, tables=TRACKED_TABLES):
+    """True when every version trigger exists, so writes from any terminal move the feed."""
+    expected = {f"trg_{table}_{event.lower()}_version" for table in tables for event in _TRIGGER_EVENTS}
+    return expected <= {row['Trigger'] for row in db.fetch('SHOW TRIGGERS')}
+
+
+def drop_change_triggers(db: Database, tables=TRACKED_TABLES):
+    """Remove the version triggers, e.g. around bulk loads where per-row bumps would dominate."""
+    for table in tables:
+        for event in _TRIGGER_EVENTS:
+            db.execute(f"DROP TRIGGER IF EXISTS `trg_{table}_{event.lower()}_version`")
+
+
+def bump_versions(db: Database, tables=TRACKED_TABLES):
+    """Mark tables as changed without touching their rows."""
+    for table in tables:
+        db.execute("UPDATE table_versions SET Version = Version + 1, Updated_At = NOW(6) WHERE Table_Name = %s AND Shard = 0",
+                   (table,))
+
+
+class ChangeFeed:
+    """Polls ``table_versions`` and notifies subscribers about tables that changed."""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.known = {}
+        self.subscribers = []
+        try:
+            self.live = change_triggers_installed(db)
+        except Exception as e:
+            logger.error(f"Change feed check failed: {str(e)}")
+            self.live = False
+        if not self.live:
+            logger.warning("Change triggers are missing; other terminals' writes show up on manual refresh only")
+
+    def versions(self):
+        rows = self.db.fetch("SELECT Table_Name, SUM(Version) AS Version FROM table_versions GROUP BY Table_Name")
+        # End the read snapshot so the next poll sees commits from other sessions.
+        self.db.commit()
+        return {row['Table_Name']: int(row['Version']) for row in rows}
+
+    def subscribe(self, tables, callback):
+        """Call ``callback(changed_tables)`` whenever one of ``tables`` changes."""
+        self.subscribers.append((frozenset(tables), callback))
+
+    def unsubscribe(self, callback):
+        self.subscribers = [(t, cb) for t, cb in self.subscribers if cb != callback]
+
+    def poll(self):
+        """Returns the set of tables whose version moved since the last poll."""
+        try:
+            current = self.versions()
+        except Exception as e:
+            logger.error(f"Change feed poll failed: {str(e)}")
+            return set()
+
+        if not self.known:
+            self.known = current
+            return set()
+
+        changed = {table for table, version in current.items() if self.known.get(table) != version}
+        self.known = current
+        if not changed:
+            return changed
+
+        for tables, callback in list(self.subscribers):
+            hits = tables & changed
+            if hits:
+                try:
+                    callback(hits)
+                except Exception as e:
+                    logger.error(f"Change feed subscriber failed: {str(e)}")
+        return changed
@@ -0,0 +1,258 @@
+"""
+Streaming CSV/XLSX export.
+
+Rows are read through ``Database.stream`` and written chunk by chunk, so an
+export of a million invoices uses the same memory as one of ten. XLSX files are
+written with openpyxl's write-only workbook and roll over to a new sheet at
+Excel's row limit. Files are written next to the target and only replace it
+once complete. ``ExportWorker`` runs an export on its own thread and
+connection, reporting progress and honouring cancellation between chunks.
+"""
+import csv
+import os
+import threading
+from backend.rollups import refresh_rollups
+from database.db_connection import Database
+from utils.constants import EXPORT_CHUNK_SIZE
+from utils.logger import setup_logging
+
+try:
+    import openpyxl
+except ImportError:  # XLSX export is optional
+    openpyxl = None
+
+logger = setup_logging(__name__)
+
+EXPORT_FORMATS = ('CSV', 'XLSX')
+XLSX_MAX_ROWS = 1048576
+
+# Dataset -> (query, query counting its rows for the progress bar, date column the From/To
+# range applies to, whether it reads the daily rollups). Queries take the range as {where}.
+EXPORT_DATASETS = {
+    'Invoices': (
+        """SELECT i.Invoice_Number, i.Invoice_Date, i.Sale_ID, i.Patient_ID,
+                  CONCAT(pa.Surname, ', ', pa.FirstName) AS Patient_Name,
+                  i.Total_Amount, i.Tax, i.Grand_Total, i.Status, i.Generated_By
+           FROM invoices i
+           LEFT JOIN patients pa ON i.Patient_ID = pa.Patient_ID
+           {where}
+           ORDER BY i.Invoice_ID""",
+        "SELECT COUNT(*) AS count FROM invoices i {where}",
+        'i.Invoice_Date', False,
+    ),
+    'Sales': (
+        "SELECT id AS Sale_ID, customer_name AS Customer, total AS Total, sale_date AS Sale_Date FROM sales {where} ORDER BY id",
+        "SELECT COUNT(*) AS count FROM sales {where}",
+        'sale_date', False,
+    ),
+    'Sale Lines': (
+        """SELECT si.sale_id AS Sale_ID, s.sale_date AS Sale_Date, si.product_id AS Product_ID,
+                  sp.name AS Product, sp.category AS Category, si.quantity AS Quantity, si.price AS Price,
+                  si.quantity * si.price AS Line_Total
+           FROM sale_items si
+           JOIN sales s ON s.id = si.sale_id
+           LEFT JOIN sales_products sp ON sp.id = si.product_id
+           {where}
+           ORDER BY si.id""",
+        "SELECT COUNT(*) AS count FROM sale_items si JOIN sales s ON s.id = si.sale_id {where}",
+        's.sale_date', False,
+    ),
+    'Billing': (
+        "SELECT Bill_ID, Patient_ID, Amount, Billing_Date, Payment_Method, Status FROM billing {where} ORDER BY Bill_ID",
+        "SELECT COUNT(*) AS count FROM billing {where}",
+        'Billing_Date', False,
+    ),
+    'Daily Revenue': (
+        "SELECT Day, Sales, Revenue FROM sales_daily {where} ORDER BY Day",
+        "SELECT COUNT(*) AS count FROM sales_daily {where}",
+        'Day', True,
+    ),
+    'Patient Counts': (
+        """SELECT IF(City = '', 'Unknown', City) AS City, Age_Group, Gender, SUM(Patients) AS Patients
+           FROM patients_daily
+           {where}
+           GROUP BY City, Age_Group, Gender
+           ORDER BY City, Age_Group, Gender""",
+        None,
+        'Day', True,
+    ),
+}
+
+
+def range_filter(column, start=None, end=None):
+    """WHERE clause and params keeping ``column`` within [start, end]; a missing side stays open."""
+    conditions, params = [], []
+    if start:
+        conditions.append(f"{column} >= %s")
+        params.append(start)
+    if end:
+        # Half-open on the next day so DATETIME columns keep the whole end date
+        conditions.append(f"{column} < %s + INTERVAL 1 DAY")
+        params.append(end)
+    return ("WHERE " + " AND ".join(conditions) if conditions else ""), tuple(params)
+
+
+def iter_chunks(rows, columns, chunk_size=EXPORT_CHUNK_SIZE, headings=None):
+    """Adapts a list of dict rows (e.g. a ReportManager result) to the (columns, rows) chunks written below."""
+    headings = list(headings or columns)
+    if not rows:
+        yield headings, []
+    for start in range(0, len(rows), chunk_size):
+        yield headings, [tuple(row.get(c) for c in columns) for row in rows[start:start + chunk_size]]
+
+
+def report_chunks(sections, chunk_size=EXPORT_CHUNK_SIZE):
+    """Chunks of a finished ReportJob's sections, each under its own header row."""
+    for section in sections:
+        columns = [key for key, _, _, _ in section['columns']]
+        headings = [heading for _, heading, _, _ in section['columns']]
+        yield from iter_chunks(section['rows'], columns, chunk_size, headings)
+
+
+class StreamingExporter:
+    def __init__(self, path, file_format='CSV'):
+        file_format = file_format.upper()
+        if file_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format '{file_format}' (expected {' or '.join(EXPORT_FORMATS)})")
+        if file_format == 'XLSX' and openpyxl is None:
+            raise ValueError('XLSX export needs openpyxl (pip install openpyxl)')
+        self.path = path
+        self.format = file_format
+
+    def write(self, chunks, on_progress=None, stop_event=None):
+        """
+        Writes every chunk; returns the row count, or None when stopped early.
+        The target is only replaced once the export completes, so a failed or
+        cancelled export leaves an existing file untouched.
+        """
+        writer = self._write_xlsx if self.format == 'XLSX' else self._write_csv
+        tmp = f"{self.path}.{threading.get_ident()}.part"
+        try:
+            written = writer(tmp, chunks, on_progress or (lambda rows: None), stop_event)
+            if written is not None:
+                os.replace(tmp, self.path)
+            return written
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _write_csv(self, path, chunks, on_progress, stop_event):
+        written = 0
+        # utf-8-sig so Excel opens peso signs and accented names correctly
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            out = csv.writer(f)
+            header = None
+            for columns, rows in chunks:
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                if columns != header:
+                    if header is not None:
+                        out.writerow([])  # blank line before the next report section
+                    out.writerow(columns)
+                    header = columns
+                out.writerows(rows)
+                written += len(rows)
+                on_progress(written)
+        return written
+
+    def _write_xlsx(self, path, chunks, on_progress, stop_event):
+        workbook = openpyxl.Workbook(write_only=True)
+        sheet, header, sheet_rows, written = None, None, 0, 0
+        try:
+            for columns, rows in chunks:
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                if columns != header:
+                    sheet = None  # each report section gets its own sheet
+                for row in rows:
+                    if sheet is None or sheet_rows >= XLSX_MAX_ROWS:
+                        sheet = workbook.create_sheet(f"Export {len(workbook.worksheets) + 1}")
+                        sheet.append(columns)
+                        header, sheet_rows = columns, 1
+                    sheet.append(row)
+                    sheet_rows += 1
+                if sheet is None:
+                    sheet = workbook.create_sheet(f"Export {len(workbook.worksheets) + 1}")
+                    sheet.append(columns)
+                    header, sheet_rows = columns, 1
+                written += len(rows)
+                on_progress(written)
+            workbook.save(path)
+            return written
+        finally:
+            workbook.close()
+
+
+class ExportWorker(threading.Thread):
+    """
+    Exports one query or row source in the background. ``rows_written``,
+    ``total`` (None when unknown), ``done`` and ``error`` can be polled from the UI.
+    """
+
+    def __init__(self, path, file_format, query=None, params=None, count_query=None, chunks=None, config=None,
+                 chunk_size=EXPORT_CHUNK_SIZE, refresh=False):
+        super().__init__(name='export-worker', daemon=True)
+        if query is None and chunks is None:
+            raise ValueError('Nothing to export')
+        self.exporter = StreamingExporter(path, file_format)
+        self.query = query
+        self.params = params
+        self.count_query = count_query
+        self.chunks = chunks
+        self.refresh = refresh
+        self.config = config
+        self.chunk_size = chunk_size
+        self.rows_written = 0
+        self.total = None
+        self.done = False
+        self.cancelled = False
+        self.error = None
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def for_dataset(cls, name, path, file_format, start=None, end=None, config=None):
+        """Exports one of EXPORT_DATASETS limited to [start, end]; rollup datasets are refreshed first."""
+        query, count_query, date_column, rollup = EXPORT_DATASETS[name]
+        where, params = range_filter(date_column, start, end)
+        return cls(path, file_format, query=query.format(where=where), params=params,
+                   count_query=count_query and count_query.format(where=where), config=config, refresh=rollup)
+
+    @classmethod
+    def for_report(cls, sections, path, file_format):
+        """Exports the sections of a finished report as shown in ReportsFrame."""
+        worker = cls(path, file_format, chunks=report_chunks(sections))
+        worker.total = sum(len(section['rows']) for section in sections)
+        return worker
+
+    def cancel(self):
+        self._stop_event.set()
+
+    def _progress(self, rows):
+        self.rows_written = rows
+
+    def run(self):
+        db = None
+        try:
+            chunks = self.chunks
+            if chunks is None:
+                db = Database(raise_on_error=True, config=self.config)
+                if self.refresh:
+                    refresh_rollups(db)
+                if self.count_query:
+                    self.total = db.fetch(self.count_query, self.params)[0]['count']
+                chunks = db.stream(self.query, self.params, self.chunk_size)
+            written = self.exporter.write(chunks, self._progress, self._stop_event)
+            if written is None:
+                self.cancelled = True
+                logger.info(f"Export to {self.exporter.path} cancelled after {self.rows_written} rows")
+            else:
+                logger.info(f"Exported {written} rows to {self.exporter.path}")
+        except Exception as e:
+            self.error = e
+            logger.error(f"Export to {self.exporter.path} failed: {str(e)}")
+        finally:
+            if chunks is not None and hasattr(chunks, 'close'):
+                chunks.close()
+            if db is not None:
+                db.close()
+            self.done = True
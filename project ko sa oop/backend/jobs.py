@@ -0,0 +1,111 @@
+"""
+Background jobs.
+
+``JobScheduler`` runs periodic jobs on a daemon thread with its own database
+connection, so long batches never hold the connection the UI uses. Every job
+is safe to run from several terminals at once.
+"""
+import threading
+import time
+from database.db_connection import Database
+from utils.constants import (REMINDER_GENERATE_INTERVAL_S, REMINDER_DISPATCH_INTERVAL_S, RECALL_SCAN_INTERVAL_S,
+                             ROLLUP_REFRESH_INTERVAL_S, FORECAST_REFRESH_INTERVAL_S)
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+
+def default_jobs():
+    """(name, interval seconds, factory) where ``factory(db)`` returns ``run(stop_event)``."""
+    from backend.managers import ReminderManager, RecallManager, InventoryManager
+    from backend.reminder_dispatch import ReminderDispatcher
+    from backend.rollups import refresh_rollups
+
+    def generate_reminders(db):
+        reminders = ReminderManager(db)
+        return lambda stop: reminders.generate_for_upcoming()
+
+    def dispatch_reminders(db):
+        dispatcher = ReminderDispatcher(ReminderManager(db))
+        return lambda stop: dispatcher.run_once(stop_event=stop)
+
+    def scan_expiring_prescriptions(db):
+        recalls = RecallManager(db)
+        return lambda stop: recalls.scan_expiring_prescriptions()
+
+    def sync_followups(db):
+        recalls = RecallManager(db)
+        return lambda stop: recalls.sync_followups()
+
+    def refresh_report_rollups(db):
+        return lambda stop: refresh_rollups(db)
+
+    def forecast_reorders(db):
+        inventory = InventoryManager(db)
+        return lambda stop: inventory.sync_forecast()
+
+    return [
+        ('reminders.generate', REMINDER_GENERATE_INTERVAL_S, generate_reminders),
+        ('reminders.dispatch', REMINDER_DISPATCH_INTERVAL_S, dispatch_reminders),
+        ('recalls.prescriptions', RECALL_SCAN_INTERVAL_S, scan_expiring_prescriptions),
+        ('recalls.followups', RECALL_SCAN_INTERVAL_S, sync_followups),
+        ('reports.rollups', ROLLUP_REFRESH_INTERVAL_S, refresh_report_rollups),
+        ('inventory.forecast', FORECAST_REFRESH_INTERVAL_S, forecast_reorders),
+    ]
+
+
+class JobScheduler(threading.Thread):
+    def __init__(self, jobs, config=None):
+        super().__init__(name='job-scheduler', daemon=True)
+        self.jobs = jobs
+        self.config = config
+        self.next_run = {name: 0.0 for name, _, _ in jobs}
+        self.last_result = {}
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+
+    def run_now(self, name):
+        """Runs a job at the next opportunity instead of waiting for its interval."""
+        if name not in self.next_run:
+            raise ValueError(f"Unknown job '{name}'")
+        self.next_run[name] = 0.0
+        self._wake.set()
+
+    def stop(self, timeout=5):
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive():
+            self.join(timeout)
+
+    def run(self):
+        try:
+            db = Database(raise_on_error=True, config=self.config)
+        except Exception as e:
+            logger.error(f"Job scheduler could not connect: {str(e)}")
+            return
+
+        try:
+            runners = {name: factory(db) for name, _, factory in self.jobs}
+            intervals = {name: interval for name, interval, _ in self.jobs}
+            while not self._stop_event.is_set():
+                for name, runner in runners.items():
+                    if self._stop_event.is_set():
+                        break
+                    if time.monotonic() < self.next_run[name]:
+                        continue
+                    started = time.perf_counter()
+                    try:
+                        self.last_result[name] = runner(self._stop_event)
+                    except Exception as e:
+                        logger.error(f"Job '{name}' failed: {str(e)}")
+                    finally:
+                        # End the read snapshot so the next run sees other terminals' writes
+                        db.commit()
+                    self.next_run[name] = time.monotonic() + intervals[name]
+                    logger.debug(f"Job '{name}' took {(time.perf_counter() - started) * 1000:.0f}ms")
+
+                delay = max(0.0, min(self.next_run.values()) - time.monotonic())
+                self._wake.wait(delay)
+                self._wake.clear()
+        finally:
+            db.close()
@@ -4,6 +4,8 @@ from utils.constants import *
 from utils.logger import setup_logging
 from utils.password_manager import PasswordManager
 from backend.base_manager import BaseManager
+from backend.rollups import refresh_rollups
+from backend.analytics import moving_average, reorder_forecast, sell_through
 
 logger = setup_logging(__name__)
 
@@ -32,13 +34,38 @@ class PatientManager(BaseManager):
         self.validate_input(surname=surname, firstname=firstname, gender=gender, age_group=age_group, contact=contact)
 
         q = "INSERT INTO patients (Surname, FirstName, MiddleInitial, Age, Gender, Age_Group, Address, Contact, Email, Medical_History, Registration_Date) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, CURDATE())"
-        return self.db.execute(q, (surname.strip(), firstname.strip(), middleinitial.strip(), age or None, gender.strip(), age_group.strip(), address.strip(), contact.strip(), email.strip(), medical_history.strip()))
+        result = self.db.execute(q, (surname.strip(), firstname.strip(), middleinitial.strip(), age or None, gender.strip(), age_group.strip(), address.strip(), contact.strip(), email.strip(), medical_history.strip()))
+        self.invalidate_cache()
+        return result
 
-    def list_patients(self):
+    def list_patients(self, limit=None):
         # Combine name parts for display, handling NULL values
         query = "SELECT *, CONCAT(COALESCE(Surname, ''), ', ', COALESCE(FirstName, ''), ' ', COALESCE(MiddleInitial, '')) AS Name FROM patients ORDER BY Patient_ID DESC"
+        if limit:
+            return self.cached(('list_patients', int(limit)), lambda: self.db.fetch(query + " LIMIT %s", (int(limit),)))
         return self.db.fetch(query)
 
+    def search_patients(self, term, limit=20):
+        """Prefix search on ID, surname and first name for the autocomplete pickers."""
+        tokens = [t for t in term.replace(',', ' ').split() if t]
+        if not tokens:
+            return []
+
+        conditions = []
+        params = []
+        for token in tokens:
+            if token.isdigit():
+                conditions.append("(Patient_ID = %s OR Surname LIKE %s OR FirstName LIKE %s)")
+                params.extend([int(token), f"{token}%", f"{token}%"])
+            else:
+                conditions.append("(Surname LIKE %s OR FirstName LIKE %s)")
+                params.extend([f"{token}%", f"{token}%"])
+
+        query = ("SELECT *, CONCAT(COALESCE(Surname, ''), ', ', COALESCE(FirstName, ''), ' ', COALESCE(MiddleInitial, '')) AS Name "
+                 f"FROM patients WHERE {' AND '.join(conditions)} ORDER BY Surname, FirstName LIMIT %s")
+        params.append(int(limit))
+        return self.db.fetch(query, tuple(params))
+
     def get_patient(self, patient_id):
         """Fetches a single patient by their ID, combining name parts for display."""
         query = "SELECT *, CONCAT(COALESCE(Surname, ''), ', ', COALESCE(FirstName, ''), ' ', COALESCE(MiddleInitial, '')) AS Name FROM patients WHERE Patient_ID = %s"
@@ -57,6 +84,20 @@ class PatientManager(BaseManager):
     def delete_patient(self, patient_id):
         return self.archive_patient(patient_id)
 
+    def _close_dependents(self, ids, placeholders):
+        # Archived patients get no more reminders or recalls
+        self.db.execute(f"""UPDATE appointment_reminders SET Status = 'Skipped'
+                            WHERE Patient_ID IN ({placeholders}) AND Status = 'Pending'""", tuple(ids))
+        self.db.execute(f"""UPDATE patient_recalls SET Status = 'Archived', Closed_At = NOW()
+                            WHERE Patient_ID IN ({placeholders}) AND Status = 'Pending'""", tuple(ids))
+
+    def archive_inactive(self, since, on_progress=None):
+        """Archives patients registered before ``since`` with no appointment on or after it."""
+        return self.archive_where("""Registration_Date < %s AND NOT EXISTS (
+                                         SELECT 1 FROM appointments a
+                                         WHERE a.Patient_ID = patients.Patient_ID AND a.Appointment_Date >= %s)""",
+                                  (since, since), on_progress=on_progress)
+
 class DoctorManager(BaseManager):
     def __init__(self, db: Database):
         super().__init__(db)
@@ -86,9 +127,15 @@ class DoctorManager(BaseManager):
             full_name = f"{surname.strip()}, {firstname.strip()}"
         
         q = 'INSERT INTO doctors (Surname, FirstName, MiddleInitial, Name, License_No, Specialization, Contact, Schedule) VALUES (%s,%s,%s,%s,%s,%s,%s,%s)'
-        return self.db.execute(q, (surname.strip(), firstname.strip(), middle_initial.strip() if middle_initial else '', full_name, license_no.strip(), specialization.strip(), contact.strip() if contact else '', schedule.strip() if schedule else ''))
+        result = self.db.execute(q, (surname.strip(), firstname.strip(), middle_initial.strip() if middle_initial else '', full_name, license_no.strip(), specialization.strip(), contact.strip() if contact else '', schedule.strip() if schedule else ''))
+        self.invalidate_cache()
+        return result
+    def count_doctors(self):
+        result = self.db.fetch("SELECT COUNT(*) AS count FROM doctors")
+        return result[0]['count'] if result else 0
+
     def list_doctors(self):
-        return self.db.fetch('SELECT * FROM doctors ORDER BY Doctor_ID DESC')
+        return self.cached('list_doctors', lambda: self.db.fetch('SELECT * FROM doctors ORDER BY Doctor_ID DESC'))
     
     def archive_doctor(self, doctor_id):
         """Polymorphic override - uses BaseManager's generic archive method"""
@@ -121,21 +168,69 @@ class AppointmentManager(BaseManager):
         self.validate_input(patient_id=patient_id, doctor_id=doctor_id, date=date, time=time)
         
         try:
-            existing = self.db.fetch('SELECT * FROM appointments WHERE Doctor_ID=%s AND Appointment_Date=%s AND Appointment_Time=%s AND Status=%s',
-                                     (doctor_id, date, time, 'Scheduled'))
-            if existing:
-                raise ValueError(ERROR_DUPLICATE_BOOKING)
-            
+            # uq_appointments_active_slot rejects a second Scheduled booking for the same doctor slot
             result = self.db.execute('INSERT INTO appointments (Patient_ID, Doctor_ID, Appointment_Date, Appointment_Time, Status) VALUES (%s,%s,%s,%s,%s)',
                                    (patient_id, doctor_id, date, time, 'Scheduled'))
             logger.info(f"Appointment scheduled: Patient {patient_id}, Doctor {doctor_id}, Date {date} {time}")
             return result
         except Exception as e:
+            if getattr(e, 'errno', None) == DB_ERROR_DUPLICATE_KEY:
+                logger.warning(f"Slot already booked: Doctor {doctor_id}, Date {date} {time}")
+                raise ValueError(ERROR_DUPLICATE_BOOKING)
             logger.error(f"Failed to schedule appointment: {str(e)}")
             raise
     def list_appointments(self):
         return self.db.fetch('SELECT * FROM appointments ORDER BY Appointment_Date DESC, Appointment_Time DESC')
 
+    def list_appointments_between(self, start_date, end_date):
+        """Appointments in [start_date, end_date] with patient names, in one indexed range query."""
+        query = """SELECT a.Appointment_ID, a.Patient_ID, a.Doctor_ID, a.Appointment_Date, a.Appointment_Time, a.Status,
+                          CONCAT(p.Surname, ', ', p.FirstName) AS Patient_Name
+                   FROM appointments a
+                   LEFT JOIN patients p ON a.Patient_ID = p.Patient_ID
+                   WHERE a.Appointment_Date BETWEEN %s AND %s
+                   ORDER BY a.Appointment_Date, a.Appointment_Time"""
+        return self.db.fetch(query, (start_date, end_date))
+
+    def changed_days_since(self, since):
+        """
+        Dates of the appointments written, restored or archived since the server time
+        ``since``, and the server time to pass in next call. ``since`` None (the first
+        call) only returns the time.
+        """
+        now = self.db.fetch("SELECT NOW(6) AS now")[0]['now']
+        if since is None:
+            return set(), now
+        # The margin catches writes stamped before ``since`` whose transaction committed after it
+        rows = self.db.fetch("""SELECT Appointment_Date FROM appointments
+                                WHERE Updated_At >= %s - INTERVAL %s SECOND
+                                UNION
+                                SELECT Appointment_Date FROM archived_appointments
+                                WHERE Deleted_On >= %s - INTERVAL %s SECOND""",
+                             (since, CHANGE_LAG_S, since, CHANGE_LAG_S))
+        return {row['Appointment_Date'] for row in rows}, now
+
+    def count_by_day(self, start_date, end_date):
+        """{date: active bookings} for the date picker's density shading."""
+        query = """SELECT Appointment_Date, COUNT(*) AS count FROM appointments
+                   WHERE Appointment_Date BETWEEN %s AND %s AND Status = 'Scheduled'
+                   GROUP BY Appointment_Date"""
+        return {row['Appointment_Date']: row['count'] for row in self.db.fetch(query, (start_date, end_date))}
+
+    def booked_slots(self, start_date, end_date, doctor_id=None):
+        """Active bookings in a date range; served by idx_appointments_date / uq_appointments_active_slot."""
+        query = """SELECT Doctor_ID, Appointment_Date, Appointment_Time FROM appointments
+                   WHERE Appointment_Date BETWEEN %s AND %s AND Status = 'Scheduled'"""
+        params = [start_date, end_date]
+        if doctor_id:
+            query += " AND Doctor_ID = %s"
+            params.append(doctor_id)
+        return self.db.fetch(query, tuple(params))
+
+    def count_appointments(self):
+        result = self.db.fetch("SELECT COUNT(*) AS count FROM appointments")
+        return result[0]['count'] if result else 0
+
     def mark_as_done(self, appointment_id):
         """Marks an appointment as 'Done' and then archives it."""
         try:
@@ -147,6 +242,98 @@ class AppointmentManager(BaseManager):
             logger.error(f"Failed to mark appointment as done: {str(e)}")
             raise
 
+    def _close_dependents(self, ids, placeholders):
+        self.db.execute(f"""UPDATE appointment_reminders SET Status = 'Skipped'
+                            WHERE Appointment_ID IN ({placeholders}) AND Status = 'Pending'""", tuple(ids))
+
+    def archive_finished_before(self, cutoff, on_progress=None):
+        """Archives done and cancelled appointments dated before ``cutoff``."""
+        return self.archive_where("Status IN ('Done', 'Cancelled') AND Appointment_Date < %s", (cutoff,),
+                                  on_progress=on_progress)
+
+class AvailabilityManager:
+    """
+    Weekly working hours and slot length per doctor. A doctor without rows works
+    the clinic defaults; the first edit writes the whole default week, so from then
+    on every day has an explicit row. A day off is a row whose end equals its start.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    @staticmethod
+    def _to_minutes(value):
+        if isinstance(value, timedelta):
+            return int(value.total_seconds()) // 60
+        hours, minutes = str(value).split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+
+    def set_availability(self, doctor_id, weekday, start_time, end_time, slot_minutes=DEFAULT_SLOT_MINUTES):
+        if not doctor_id:
+            raise ValueError('Doctor ID is required')
+        if int(weekday) not in range(7):
+            raise ValueError('Weekday must be between 0 (Monday) and 6 (Sunday)')
+        try:
+            start, end = self._to_minutes(start_time), self._to_minutes(end_time)
+        except ValueError:
+            raise ValueError('Times must be in HH:MM format')
+        if end <= start:
+            raise ValueError('End time must be after start time')
+        if int(slot_minutes) <= 0 or int(slot_minutes) > end - start:
+            raise ValueError('Slot length must fit within the working hours')
+
+        with self.db.transaction():
+            self._seed_defaults(doctor_id)
+            return self._upsert(doctor_id, weekday, start_time, end_time, slot_minutes)
+
+    def clear_day(self, doctor_id, weekday):
+        """Marks a weekday as not working, keeping the doctor's other days as they are."""
+        if int(weekday) not in range(7):
+            raise ValueError('Weekday must be between 0 (Monday) and 6 (Sunday)')
+        with self.db.transaction():
+            self._seed_defaults(doctor_id)
+            return self._upsert(doctor_id, weekday, DEFAULT_WORK_START, DEFAULT_WORK_START, DEFAULT_SLOT_MINUTES)
+
+    def _upsert(self, doctor_id, weekday, start_time, end_time, slot_minutes):
+        query = """INSERT INTO doctor_availability (Doctor_ID, Weekday, Start_Time, End_Time, Slot_Minutes)
+                   VALUES (%s, %s, %s, %s, %s)
+                   ON DUPLICATE KEY UPDATE Start_Time = VALUES(Start_Time), End_Time = VALUES(End_Time),
+                                           Slot_Minutes = VALUES(Slot_Minutes)"""
+        return self.db.execute(query, (doctor_id, int(weekday), start_time, end_time, int(slot_minutes)))
+
+    def _seed_defaults(self, doctor_id):
+        """Writes the clinic default week for a doctor still on defaults, days off included."""
+        if self.db.fetch("SELECT 1 FROM doctor_availability WHERE Doctor_ID = %s LIMIT 1 FOR UPDATE", (doctor_id,)):
+            return
+        rows = [(doctor_id, weekday, DEFAULT_WORK_START,
+                 DEFAULT_WORK_END if weekday in DEFAULT_WORK_DAYS else DEFAULT_WORK_START, DEFAULT_SLOT_MINUTES)
+                for weekday in range(7)]
+        self.db.execute_many("""INSERT IGNORE INTO doctor_availability (Doctor_ID, Weekday, Start_Time, End_Time, Slot_Minutes)
+                                VALUES (%s, %s, %s, %s, %s)""", rows)
+
+    def get_availability(self, doctor_id):
+        return self.db.fetch("""SELECT * FROM doctor_availability WHERE Doctor_ID = %s
+                                ORDER BY Weekday""", (doctor_id,))
+
+    def working_hours(self, doctor_ids):
+        """
+        {doctor_id: {weekday: (start_minutes, end_minutes, slot_minutes)}} for the days
+        each doctor works. Doctors with no rows get the clinic defaults; days off are left out.
+        """
+        hours = {doctor_id: {} for doctor_id in doctor_ids}
+        explicit = set()
+        for row in self.db.fetch("SELECT Doctor_ID, Weekday, Start_Time, End_Time, Slot_Minutes FROM doctor_availability"):
+            if row['Doctor_ID'] in hours:
+                explicit.add(row['Doctor_ID'])
+                start, end = self._to_minutes(row['Start_Time']), self._to_minutes(row['End_Time'])
+                if end > start:
+                    hours[row['Doctor_ID']][row['Weekday']] = (start, end, row['Slot_Minutes'])
+        default = (self._to_minutes(DEFAULT_WORK_START), self._to_minutes(DEFAULT_WORK_END), DEFAULT_SLOT_MINUTES)
+        for doctor_id in hours:
+            if doctor_id not in explicit:
+                hours[doctor_id] = {weekday: default for weekday in DEFAULT_WORK_DAYS}
+        return hours
+
 class InventoryManager(BaseManager):
     def __init__(self, db: Database):
         super().__init__(db)
@@ -167,14 +354,131 @@ class InventoryManager(BaseManager):
     def add_item(self, name, category, quantity, unit_price, supplier):
         self.validate_input(name=name, category=category, quantity=quantity)
         
-        return self.db.execute('INSERT INTO inventory (Item_Name, Category, Quantity_On_Hand, Unit_Price, Supplier) VALUES (%s,%s,%s,%s,%s)',
-                               (name.strip(), category.strip(), quantity, unit_price, supplier.strip()))
+        # Listed in the sales catalog under the same id, so the sales screens can sell it
+        result = SalesManager(self.db).add_product(name, category, f"{category.strip()} - {name.strip()}",
+                                                   unit_price, quantity, supplier)
+        self.invalidate_cache()
+        return result
+    def count_items(self):
+        result = self.db.fetch("SELECT COUNT(*) AS count FROM inventory")
+        return result[0]['count'] if result else 0
+
     def list_items(self):
-        return self.db.fetch('SELECT * FROM inventory ORDER BY Inventory_ID DESC')
+        # Stock is the sellable balance that sales draw down, where the item is in the catalog;
+        # the reorder point is the catalog's too, so low-stock flags match the dashboard alerts
+        return self.cached('list_items', lambda: self.db.fetch("""
+            SELECT i.Inventory_ID, i.Item_Name, i.Category, COALESCE(sp.quantity, i.Quantity_On_Hand) AS Quantity_On_Hand,
+                   i.Unit_Price, i.Supplier, COALESCE(sp.Reorder_Point, %s) AS Reorder_Point
+            FROM inventory i
+            LEFT JOIN sales_products sp ON sp.id = i.Inventory_ID
+            ORDER BY i.Inventory_ID DESC""", (DEFAULT_REORDER_POINT,)))
 
     def view_all_products(self):
         return self.list_items()
 
+    def set_reorder_point(self, item_id, reorder_point):
+        """Sets the stock level below which the item raises a low-stock alert."""
+        SalesManager(self.db).set_reorder_point(item_id, reorder_point)
+        self.invalidate_cache()
+
+    def list_low_stock(self):
+        return SalesManager(self.db).list_low_stock()
+
+    def refresh_forecast(self, item_ids=None, window_days=FORECAST_WINDOW_DAYS,
+                         lead_time_days=FORECAST_LEAD_TIME_DAYS, cover_days=FORECAST_COVER_DAYS):
+        """
+        Recomputes ``inventory_forecast`` for ``item_ids`` (every item when None) from the
+        per-product sales rollup: one grouped read of the window, one vectorized pass over
+        all items and one batched upsert. Stock is the sellable count in sales_products
+        where the item is listed there, else Quantity_On_Hand. Returns the items updated.
+        """
+        if item_ids is not None and not item_ids:
+            return 0
+        today = datetime.now().date()
+        try:
+            # The rollup must include the sales posted since its last refresh
+            refresh_rollups(self.db)
+            item_filter, demand_filter, ids = '', '', ()
+            if item_ids is not None:
+                ids = tuple(item_ids)
+                placeholders = ', '.join(['%s'] * len(ids))
+                item_filter = f" WHERE i.Inventory_ID IN ({placeholders})"
+                demand_filter = f" AND Product_ID IN ({placeholders})"
+            items = self.db.fetch(f"""SELECT i.Inventory_ID, COALESCE(sp.quantity, i.Quantity_On_Hand) AS Stock
+                                      FROM inventory i
+                                      LEFT JOIN sales_products sp ON sp.id = i.Inventory_ID{item_filter}""", ids)
+            demand = self.db.fetch(f"""SELECT Product_ID, SUM(Quantity) AS Quantity
+                                       FROM sales_daily_product
+                                       WHERE Day > %s AND Day <= %s{demand_filter}
+                                       GROUP BY Product_ID""",
+                                   (today - timedelta(days=int(window_days)), today, *ids))
+            forecast = reorder_forecast([row['Inventory_ID'] for row in items], [row['Stock'] for row in items],
+                                        [row['Product_ID'] for row in demand], [row['Quantity'] for row in demand],
+                                        window_days, lead_time_days, cover_days)
+            rows = []
+            for row, daily, days_left, reorder_qty in zip(items, forecast['daily_demand'], forecast['days_left'],
+                                                          forecast['reorder_qty']):
+                reorder_by = None
+                if days_left is not None:
+                    reorder_by = today + timedelta(days=max(0, int(days_left - lead_time_days)))
+                    days_left = round(min(days_left, 999999999.0), 1)
+                rows.append((row['Inventory_ID'], max(0, row['Stock'] or 0), round(daily, 3), days_left,
+                             reorder_qty, reorder_by))
+            if rows:
+                self.db.execute_many("""INSERT INTO inventory_forecast
+                                            (Inventory_ID, Stock_On_Hand, Daily_Demand, Days_Left, Reorder_Qty, Reorder_By, Updated_At)
+                                        VALUES (%s, %s, %s, %s, %s, %s, NOW())
+                                        ON DUPLICATE KEY UPDATE Stock_On_Hand = VALUES(Stock_On_Hand),
+                                                                Daily_Demand = VALUES(Daily_Demand),
+                                                                Days_Left = VALUES(Days_Left),
+                                                                Reorder_Qty = VALUES(Reorder_Qty),
+                                                                Reorder_By = VALUES(Reorder_By),
+                                                                Updated_At = VALUES(Updated_At)""", rows)
+            if item_ids is None:
+                self.db.execute("""DELETE f FROM inventory_forecast f
+                                   LEFT JOIN inventory i ON i.Inventory_ID = f.Inventory_ID
+                                   WHERE i.Inventory_ID IS NULL""")
+        except Exception as e:
+            logger.error(f"Inventory forecast failed: {str(e)}")
+            raise
+        return len(rows)
+
+    def sync_forecast(self):
+        """
+        Background refresh: the whole catalog on the first run of each day (the window
+        moves and restocks change stock), otherwise only the items sold since the previous
+        run, found by their sale_items id range. Returns the items updated.
+        """
+        today = datetime.now().date()
+        watermarks = RecallManager(self.db)
+        mark = watermarks.get_watermark('inventory_forecast')
+        max_id = self.db.fetch("SELECT COALESCE(MAX(id), 0) AS max_id FROM sale_items")[0]['max_id']
+        if mark is None or mark['Last_Date'] < today:
+            updated = self.refresh_forecast()
+            logger.info(f"Reorder forecast rebuilt for {updated} items")
+        elif max_id > mark['Last_ID']:
+            sold = self.db.fetch("SELECT DISTINCT product_id FROM sale_items WHERE id > %s AND id <= %s",
+                                 (mark['Last_ID'], max_id))
+            updated = self.refresh_forecast([row['product_id'] for row in sold])
+        else:
+            return 0
+        watermarks.set_watermark('inventory_forecast', today, max_id)
+        return updated
+
+    def reorder_list(self):
+        """Items due for reorder grouped by supplier: {supplier: [rows, soonest to run out first]}."""
+        rows = self.db.fetch("""SELECT i.Inventory_ID, i.Item_Name, i.Category, i.Unit_Price,
+                                       COALESCE(NULLIF(i.Supplier, ''), 'Unassigned') AS Supplier,
+                                       f.Stock_On_Hand, f.Daily_Demand, f.Days_Left, f.Reorder_Qty, f.Reorder_By
+                                FROM inventory_forecast f
+                                JOIN inventory i ON i.Inventory_ID = f.Inventory_ID
+                                WHERE f.Reorder_Qty > 0
+                                ORDER BY Supplier, f.Days_Left, i.Item_Name""")
+        suppliers = {}
+        for row in rows:
+            suppliers.setdefault(row['Supplier'], []).append(row)
+        return suppliers
+
 class BillingManager:
     def __init__(self, db: Database):
         self.db = db
@@ -199,6 +503,9 @@ class BillingManager:
     
     def list_bills(self):
         return self.db.fetch('SELECT * FROM billing ORDER BY Billing_Date DESC')
+
+    def list_patient_bills(self, patient_id):
+        return self.db.fetch('SELECT * FROM billing WHERE Patient_ID = %s ORDER BY Billing_Date DESC', (patient_id,))
     
     def mark_paid(self, bill_id):
         self.db.execute('UPDATE billing SET Status=%s WHERE Bill_ID=%s', ('Paid', bill_id))
@@ -280,10 +587,23 @@ class ProcedureManager:
 
 
 class SalesManager:
+    """
+    Sales and the stock they draw from. ``sales_products.quantity`` is the cached
+    on-hand balance, read in O(1); every change to it is also written to the
+    ``inventory_movements`` ledger in the same transaction, so replaying the
+    ledger reproduces the balance (see ``audit_stock``).
+
+    A stocked product's ``sales_products.id`` is its ``Inventory_ID``: both rows
+    are written together by ``add_product``, so the sales screens can sell what
+    they list from inventory. Made-to-order entries take ids from
+    ``MADE_TO_ORDER_ID_BASE`` up, clear of the inventory ids.
+    """
+
     def __init__(self, db: Database):
         self.db = db
 
-    def add_product(self, name, category, description, price, quantity):
+    def add_product(self, name, category, description, price, quantity, supplier=''):
+        """Adds a stocked product: the inventory item and its catalog entry, under one id."""
         if not name or not name.strip():
             raise ValueError('Product name is required')
         if not category or not category.strip():
@@ -293,8 +613,15 @@ class SalesManager:
         if quantity is None or quantity == '':
             raise ValueError('Quantity is required')
         
-        query = "INSERT INTO sales_products (name, category, description, price, quantity) VALUES (%s, %s, %s, %s, %s)"
-        return self.db.execute(query, (name.strip(), category.strip(), description.strip(), float(price), int(quantity)))
+        with self.db.transaction():
+            product_id = self.db.execute("INSERT INTO inventory (Item_Name, Category, Quantity_On_Hand, Unit_Price, Supplier) VALUES (%s, %s, %s, %s, %s)",
+                                         (name.strip(), category.strip(), int(quantity), float(price), (supplier or '').strip()))
+            self.db.execute("INSERT INTO sales_products (id, name, category, description, price, quantity) VALUES (%s, %s, %s, %s, %s, %s)",
+                            (product_id, name.strip(), category.strip(), (description or '').strip(), float(price), int(quantity)))
+            if int(quantity):
+                self._record_movements([(product_id, 'restock', int(quantity), None, 'Opening stock')])
+            self._refresh_alerts([product_id])
+        return product_id
 
     def get_all_products(self):
         return self.db.fetch("SELECT * FROM sales_products ORDER BY category, name")
@@ -312,37 +639,248 @@ class SalesManager:
         if not category or not category.strip():
             raise ValueError('Category is required')
         
-        query = "UPDATE sales_products SET name=%s, category=%s, description=%s, price=%s, quantity=%s WHERE id=%s"
-        return self.db.execute(query, (name.strip(), category.strip(), description.strip(), float(price), int(quantity), product_id))
+        query = "UPDATE sales_products SET name=%s, category=%s, description=%s, price=%s WHERE id=%s"
+        with self.db.transaction():
+            result = self.db.execute(query, (name.strip(), category.strip(), description.strip(), float(price), product_id))
+            self.adjust_stock(product_id, quantity, 'Product edited')
+        return result
 
     def delete_product(self, product_id):
         query = "DELETE FROM sales_products WHERE id=%s"
-        return self.db.execute(query, (product_id,))
+        with self.db.transaction():
+            result = self.db.execute(query, (product_id,))
+            self.db.execute("DELETE FROM low_stock_alerts WHERE Product_ID = %s", (product_id,))
+        return result
 
     def create_sale(self, customer_name, items):
+        """
+        Records a sale in one transaction: the sale, its lines, one conditional stock
+        decrement per product and the ledger rows. Fails without writing anything if
+        any product is short. Lines without a ``product_id`` (made-to-order glasses)
+        need a ``name`` and ``category`` and are sold from a catalog entry that holds
+        no stock.
+        """
         if not customer_name or not customer_name.strip():
             raise ValueError('Customer name is required')
         if not items:
             raise ValueError('Sale must have at least one item')
+        for item in items:
+            if int(item['quantity']) <= 0:
+                raise ValueError('Quantity must be greater than zero')
         
         total = sum(item['quantity'] * item['price'] for item in items)
         
-        query = "INSERT INTO sales (customer_name, total, sale_date) VALUES (%s, %s, NOW())"
-        sale_id = self.db.execute(query, (customer_name.strip(), total))
-        
-
-        for item in items:
-            item_query = "INSERT INTO sale_items (sale_id, product_id, quantity, price) VALUES (%s, %s, %s, %s)"
-            self.db.execute(item_query, (sale_id, item['product_id'], item['quantity'], item['price']))
-            
-            self.db.execute("UPDATE sales_products SET quantity = quantity - %s WHERE id = %s", 
-                          (item['quantity'], item['product_id']))
+        with self.db.transaction():
+            query = "INSERT INTO sales (customer_name, total, sale_date) VALUES (%s, %s, NOW())"
+            sale_id = self.db.execute(query, (customer_name.strip(), total))
+
+            lines, stocked = [], {}
+            for item in items:
+                product_id = item.get('product_id')
+                if product_id is None:
+                    product_id = self._made_to_order_product(item['name'], item['category'], item['price'])
+                else:
+                    stocked[product_id] = stocked.get(product_id, 0) + int(item['quantity'])
+                lines.append((sale_id, product_id, int(item['quantity']), item['price']))
+            self.db.execute_many("INSERT INTO sale_items (sale_id, product_id, quantity, price) VALUES (%s, %s, %s, %s)",
+                                 lines)
+
+            # Products in id order so concurrent sales lock them in the same order
+            for product_id in sorted(stocked):
+                self._take_stock(product_id, stocked[product_id],
+                                 next((i.get('name') for i in items if i.get('product_id') == product_id), None))
+            self._record_movements([(product_id, 'sale', -quantity, sale_id, f"Sale #{sale_id}")
+                                    for product_id, quantity in sorted(stocked.items())])
+            self._refresh_alerts(sorted(stocked))
         
         return sale_id
 
+    def _take_stock(self, product_id, quantity, name=None):
+        updated = self.db.execute_rowcount("UPDATE sales_products SET quantity = quantity - %s WHERE id = %s AND quantity >= %s",
+                                           (quantity, product_id, quantity))
+        if updated:
+            return
+        product = self.db.fetch("SELECT name, quantity FROM sales_products WHERE id = %s", (product_id,))
+        if not product:
+            raise ValueError(f"{name or f'Product #{product_id}'} is not in the sales catalog")
+        raise ValueError(f"Not enough stock for {product[0]['name']}: {product[0]['quantity']} left, {quantity} requested")
+
+    def _made_to_order_product(self, name, category, price):
+        """
+        Catalog entry for a custom configuration, created on first sale; it never holds
+        stock. Its id comes from the made-to-order range, whose top is locked until the
+        sale commits so concurrent sales cannot pick the same one.
+        """
+        existing = self.db.fetch("""SELECT id FROM sales_products
+                                    WHERE id >= %s AND name = %s AND category = %s AND description = %s LIMIT 1""",
+                                 (MADE_TO_ORDER_ID_BASE, name, category, 'Made to order'))
+        if existing:
+            return existing[0]['id']
+        product_id = self.db.fetch("""SELECT COALESCE(MAX(id) + 1, %s) AS id FROM sales_products
+                                      WHERE id >= %s FOR UPDATE""", (MADE_TO_ORDER_ID_BASE, MADE_TO_ORDER_ID_BASE))[0]['id']
+        self.db.execute("""INSERT INTO sales_products (id, name, category, description, price, quantity, Reorder_Point)
+                           VALUES (%s, %s, %s, %s, %s, 0, 0)""", (product_id, name, category, 'Made to order', price))
+        return product_id
+
+    def sync_catalog(self):
+        """
+        Lists every inventory item that has no catalog entry under its id (items added
+        before the two were written together), with an opening balance, and logs ids
+        where the two tables hold different products. Returns the items listed.
+        """
+        with self.db.transaction():
+            listed = self.db.execute_rowcount("""INSERT INTO sales_products (id, name, category, description, price, quantity)
+                                                SELECT i.Inventory_ID, i.Item_Name, i.Category, CONCAT(i.Category, ' - ', i.Item_Name),
+                                                       COALESCE(i.Unit_Price, 0), GREATEST(i.Quantity_On_Hand, 0)
+                                                FROM inventory i
+                                                WHERE NOT EXISTS (SELECT 1 FROM sales_products sp WHERE sp.id = i.Inventory_ID)""")
+            if listed:
+                self.record_opening_balances()
+                self.rebuild_low_stock_alerts()
+        for row in self.db.fetch("""SELECT i.Inventory_ID, i.Item_Name, sp.name FROM inventory i
+                                    JOIN sales_products sp ON sp.id = i.Inventory_ID
+                                    WHERE sp.name <> i.Item_Name"""):
+            logger.warning(f"Inventory item #{row['Inventory_ID']} ({row['Item_Name']}) shares its id with "
+                           f"catalog product '{row['name']}'; sales of it draw from that product")
+        return listed
+
+    def _record_movements(self, movements):
+        """Writes ledger rows (product_id, type, signed quantity, sale_id, reference) with the balances they left."""
+        if not movements:
+            return 0
+        product_ids = sorted({m[0] for m in movements})
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        balances = {row['id']: row['quantity'] for row in
+                    self.db.fetch(f"SELECT id, quantity FROM sales_products WHERE id IN ({placeholders})", tuple(product_ids))}
+        rows = [(product_id, movement_type, quantity, balances.get(product_id, 0), sale_id, reference)
+                for product_id, movement_type, quantity, sale_id, reference in movements]
+        return self.db.execute_many("""INSERT INTO inventory_movements
+                                           (Product_ID, Movement_Type, Quantity, Balance_After, Sale_ID, Reference)
+                                       VALUES (%s, %s, %s, %s, %s, %s)""", rows)
+
+    def restock(self, product_id, quantity, reference='Restock'):
+        quantity = int(quantity)
+        if quantity <= 0:
+            raise ValueError('Restock quantity must be greater than zero')
+        with self.db.transaction():
+            if not self.db.execute_rowcount("UPDATE sales_products SET quantity = quantity + %s WHERE id = %s",
+                                            (quantity, product_id)):
+                raise ValueError(f"Product #{product_id} not found")
+            self._record_movements([(product_id, 'restock', quantity, None, reference)])
+            self._refresh_alerts([product_id])
+
+    def return_items(self, sale_id, product_id, quantity):
+        """Puts returned units of a sold product back on hand."""
+        quantity = int(quantity)
+        with self.db.transaction():
+            sold = self.db.fetch("""SELECT COALESCE(SUM(quantity), 0) AS quantity FROM sale_items
+                                    WHERE sale_id = %s AND product_id = %s""", (sale_id, product_id))[0]['quantity']
+            returned = self.db.fetch("""SELECT COALESCE(SUM(Quantity), 0) AS quantity FROM inventory_movements
+                                        WHERE Sale_ID = %s AND Product_ID = %s AND Movement_Type = 'return'""",
+                                     (sale_id, product_id))[0]['quantity']
+            if quantity <= 0 or quantity > sold - returned:
+                raise ValueError(f"Sale #{sale_id} has {sold - returned} of this product left to return")
+            self.db.execute("UPDATE sales_products SET quantity = quantity + %s WHERE id = %s", (quantity, product_id))
+            self._record_movements([(product_id, 'return', quantity, sale_id, f"Return on sale #{sale_id}")])
+            self._refresh_alerts([product_id])
+
+    def adjust_stock(self, product_id, new_quantity, reason='Stock count'):
+        """Sets the on-hand count (e.g. after a physical count), recording the difference."""
+        new_quantity = int(new_quantity)
+        if new_quantity < 0:
+            raise ValueError('Quantity cannot be negative')
+        with self.db.transaction():
+            current = self.db.fetch("SELECT quantity FROM sales_products WHERE id = %s FOR UPDATE", (product_id,))
+            if not current:
+                raise ValueError(f"Product #{product_id} not found")
+            delta = new_quantity - current[0]['quantity']
+            if delta:
+                self.db.execute("UPDATE sales_products SET quantity = %s WHERE id = %s", (new_quantity, product_id))
+                self._record_movements([(product_id, 'adjustment', delta, None, reason)])
+                self._refresh_alerts([product_id])
+        return delta
+
+    def set_reorder_point(self, product_id, reorder_point):
+        reorder_point = int(reorder_point)
+        if reorder_point < 0:
+            raise ValueError('Reorder point cannot be negative')
+        with self.db.transaction():
+            if not self.db.fetch("SELECT id FROM sales_products WHERE id = %s FOR UPDATE", (product_id,)):
+                raise ValueError(f"Product #{product_id} not found")
+            self.db.execute("UPDATE sales_products SET Reorder_Point = %s WHERE id = %s", (reorder_point, product_id))
+            self._refresh_alerts([product_id])
+
+    def _refresh_alerts(self, product_ids):
+        """
+        Re-evaluates the low-stock alert set for just ``product_ids``: raises alerts for
+        those now below their reorder point and clears the ones back above it.
+        """
+        if not product_ids:
+            return
+        placeholders = ', '.join(['%s'] * len(product_ids))
+        ids = tuple(product_ids)
+        self.db.execute(f"""INSERT INTO low_stock_alerts (Product_ID, Quantity, Reorder_Point, Raised_At)
+                             SELECT id, quantity, Reorder_Point, NOW() FROM sales_products
+                             WHERE id IN ({placeholders}) AND Below_Reorder = 1
+                             ON DUPLICATE KEY UPDATE Quantity = VALUES(Quantity), Reorder_Point = VALUES(Reorder_Point)""", ids)
+        self.db.execute(f"""DELETE a FROM low_stock_alerts a
+                             LEFT JOIN sales_products sp ON sp.id = a.Product_ID
+                             WHERE a.Product_ID IN ({placeholders}) AND COALESCE(sp.Below_Reorder, 0) = 0""", ids)
+
+    def rebuild_low_stock_alerts(self):
+        """Recomputes the whole alert set from the Below_Reorder index, e.g. after a bulk load."""
+        with self.db.transaction():
+            self.db.execute("""DELETE a FROM low_stock_alerts a
+                               LEFT JOIN sales_products sp ON sp.id = a.Product_ID
+                               WHERE COALESCE(sp.Below_Reorder, 0) = 0""")
+            self.db.execute("""INSERT INTO low_stock_alerts (Product_ID, Quantity, Reorder_Point, Raised_At)
+                               SELECT id, quantity, Reorder_Point, NOW() FROM sales_products WHERE Below_Reorder = 1
+                               ON DUPLICATE KEY UPDATE Quantity = VALUES(Quantity), Reorder_Point = VALUES(Reorder_Point)""")
+
+    def list_low_stock(self):
+        return self.db.fetch("""SELECT a.Product_ID, sp.name, sp.category, a.Quantity, a.Reorder_Point, a.Raised_At
+                                FROM low_stock_alerts a
+                                JOIN sales_products sp ON sp.id = a.Product_ID
+                                ORDER BY a.Quantity - a.Reorder_Point, sp.name""")
+
+    def count_low_stock(self):
+        result = self.db.fetch("SELECT COUNT(*) AS count FROM low_stock_alerts")
+        return result[0]['count'] if result else 0
+
+    def stock_on_hand(self, product_id):
+        result = self.db.fetch("SELECT quantity FROM sales_products WHERE id = %s", (product_id,))
+        return result[0]['quantity'] if result else 0
+
+    def stock_history(self, product_id, limit=100):
+        return self.db.fetch("""SELECT * FROM inventory_movements WHERE Product_ID = %s
+                                ORDER BY Movement_ID DESC LIMIT %s""", (product_id, int(limit)))
+
+    def record_opening_balances(self):
+        """Gives every product without ledger history an opening row, so the ledger can be replayed from day one."""
+        return self.db.execute_rowcount("""INSERT INTO inventory_movements
+                                               (Product_ID, Movement_Type, Quantity, Balance_After, Reference)
+                                           SELECT sp.id, 'adjustment', sp.quantity, sp.quantity, 'Opening balance'
+                                           FROM sales_products sp
+                                           WHERE NOT EXISTS (SELECT 1 FROM inventory_movements m WHERE m.Product_ID = sp.id)""")
+
+    def audit_stock(self):
+        """Products whose cached quantity differs from the replayed ledger; empty when consistent."""
+        return self.db.fetch("""SELECT sp.id, sp.name, sp.quantity, COALESCE(SUM(m.Quantity), 0) AS Ledger_Quantity
+                                FROM sales_products sp
+                                LEFT JOIN inventory_movements m ON m.Product_ID = sp.id
+                                GROUP BY sp.id, sp.name, sp.quantity
+                                HAVING sp.quantity <> Ledger_Quantity""")
+
     def get_all_sales(self):
         return self.db.fetch("SELECT * FROM sales ORDER BY sale_date DESC")
 
+    def get_sales_by_customer(self, customer_name):
+        return self.db.fetch("SELECT * FROM sales WHERE customer_name = %s ORDER BY sale_date DESC", (customer_name,))
+
+    def count_sales(self):
+        result = self.db.fetch("SELECT COUNT(*) AS count FROM sales")
+        return result[0]['count'] if result else 0
+
     def get_sale_details(self, sale_id):
         return self.db.fetch("SELECT si.*, sp.name FROM sale_items si JOIN sales_products sp ON si.product_id = sp.id WHERE si.sale_id = %s", (sale_id,))
 
@@ -411,13 +949,14 @@ class PrescriptionManager:
                                        os_sph, os_cyl, os_axis, os_add, notes, prescription_id))
 
     def delete_prescription(self, prescription_id):
+        RecallManager(self.db).delete_for_source('prescription', prescription_id)
         return self.db.execute("DELETE FROM prescriptions WHERE Prescription_ID = %s", (prescription_id,))
 
     def check_expiring_prescriptions(self):
         query = """SELECT * FROM prescriptions 
-                   WHERE Expiry_Date BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL 30 DAY)
+                   WHERE Expiry_Date BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL %s DAY)
                    ORDER BY Expiry_Date ASC"""
-        return self.db.fetch(query)
+        return self.db.fetch(query, (PRESCRIPTION_EXPIRY_WARNING_DAYS,))
 
 
 class MedicalRecordsManager:
@@ -434,8 +973,14 @@ class MedicalRecordsManager:
                    (Patient_ID, Doctor_ID, Appointment_ID, Diagnosis, Severity,
                     Clinical_Notes, Recommendations, Follow_up_Days)
                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)"""
-        return self.db.execute(query, (patient_id, doctor_id, appointment_id, diagnosis, severity,
-                                       clinical_notes, recommendations, followup_days))
+        record_id = self.db.execute(query, (patient_id, doctor_id, appointment_id, diagnosis, severity,
+                                            clinical_notes, recommendations, followup_days))
+        try:
+            RecallManager(self.db).sync_followups()
+        except Exception as e:
+            # The background job picks the record up on its next run
+            logger.warning(f"Follow-up recall sync after record {record_id} failed: {str(e)}")
+        return record_id
 
     def get_patient_records(self, patient_id):
         """Get all medical records for patient"""
@@ -464,14 +1009,16 @@ class MedicalRecordsManager:
 
     def delete_record(self, record_id):
         """Delete medical record"""
+        RecallManager(self.db).delete_for_source('followup', record_id)
         return self.db.execute("DELETE FROM medical_records WHERE Record_ID = %s", (record_id,))
 
     def check_due_followups(self):
-        """Get patients due for follow-up"""
-        query = """SELECT mr.*, pa.Contact, pa.Email, CONCAT(pa.Surname, ', ', pa.FirstName) as Name
-                   FROM medical_records mr
+        """Get patients due for follow-up, read from the recall queue"""
+        query = """SELECT mr.*, r.Due_Date, pa.Contact, pa.Email, CONCAT(pa.Surname, ', ', pa.FirstName) as Name
+                   FROM patient_recalls r
+                   JOIN medical_records mr ON mr.Record_ID = r.Source_ID
                    JOIN patients pa ON mr.Patient_ID = pa.Patient_ID
-                   WHERE DATE_ADD(mr.Recorded_Date, INTERVAL mr.Follow_up_Days DAY) <= CURDATE()
+                   WHERE r.Source = 'followup' AND r.Status = 'Pending' AND r.Due_Date <= CURDATE()
                    ORDER BY mr.Recorded_Date ASC"""
         return self.db.fetch(query)
 
@@ -498,12 +1045,115 @@ class ReminderManager:
                    ORDER BY ar.Reminder_Date ASC"""
         return self.db.fetch(query)
 
+    def count_pending_reminders(self):
+        query = """SELECT COUNT(*) AS count
+                   FROM appointment_reminders ar
+                   JOIN patients pa ON ar.Patient_ID = pa.Patient_ID
+                   JOIN appointments ap ON ar.Appointment_ID = ap.Appointment_ID
+                   WHERE ar.Status = 'Pending' AND ar.Reminder_Date <= CURDATE()"""
+        result = self.db.fetch(query)
+        return result[0]['count'] if result else 0
+
     def mark_sent(self, reminder_id):
         query = """UPDATE appointment_reminders 
                    SET Status = 'Sent', Sent_Date = NOW()
                    WHERE Reminder_ID = %s"""
         return self.db.execute(query, (reminder_id,))
 
+    def generate_for_upcoming(self, lookahead_days=REMINDER_LOOKAHEAD_DAYS, lead_days=REMINDER_LEAD_DAYS,
+                              reminder_time=REMINDER_DEFAULT_TIME, contact_method=REMINDER_DEFAULT_METHOD):
+        """
+        Creates the missing reminders for every scheduled appointment in the next
+        ``lookahead_days`` in one INSERT ... SELECT. The unique key on
+        (Appointment_ID, Reminder_Date) makes re-runs no-ops. Returns rows added.
+        """
+        query = """INSERT IGNORE INTO appointment_reminders
+                       (Appointment_ID, Patient_ID, Reminder_Date, Reminder_Time, Contact_Method)
+                   SELECT a.Appointment_ID, a.Patient_ID, DATE_SUB(a.Appointment_Date, INTERVAL %s DAY), %s, %s
+                   FROM appointments a
+                   WHERE a.Status = 'Scheduled'
+                     AND a.Appointment_Date BETWEEN CURDATE() AND DATE_ADD(CURDATE(), INTERVAL %s DAY)"""
+        added = self.db.execute_rowcount(query, (int(lead_days), reminder_time, contact_method, int(lookahead_days)))
+        logger.info(f"Generated {added} reminders for appointments in the next {lookahead_days} days")
+        return added
+
+    def claim_due(self, token, limit=REMINDER_BATCH_SIZE):
+        """
+        Atomically marks up to ``limit`` due reminders as being sent by ``token`` and
+        returns them, so terminals running the dispatcher never pick the same rows.
+        Only reminders for a scheduled appointment of an existing patient are claimed,
+        and failed ones only once their retry time has passed; ``skip_orphaned``
+        retires the rest.
+        """
+        claimed = self.db.execute_rowcount("""UPDATE appointment_reminders
+                                             SET Status = 'Sending', Claim_Token = %s, Claimed_At = NOW()
+                                             WHERE Status = 'Pending' AND Reminder_Date <= CURDATE()
+                                               AND (Retry_After IS NULL OR Retry_After <= NOW())
+                                               AND EXISTS (SELECT 1 FROM appointments ap
+                                                           WHERE ap.Appointment_ID = appointment_reminders.Appointment_ID
+                                                             AND ap.Status = 'Scheduled')
+                                               AND EXISTS (SELECT 1 FROM patients pa
+                                                           WHERE pa.Patient_ID = appointment_reminders.Patient_ID)
+                                             ORDER BY Reminder_Date, Reminder_ID
+                                             LIMIT %s""", (token, int(limit)))
+        if not claimed:
+            return []
+        query = """SELECT ar.*, pa.Contact, pa.Email, CONCAT(pa.Surname, ', ', pa.FirstName) AS Name,
+                          ap.Appointment_Date, ap.Appointment_Time
+                   FROM appointment_reminders ar
+                   JOIN patients pa ON ar.Patient_ID = pa.Patient_ID
+                   JOIN appointments ap ON ar.Appointment_ID = ap.Appointment_ID
+                   WHERE ar.Claim_Token = %s"""
+        return self.db.fetch(query, (token,))
+
+    def skip_orphaned(self):
+        """
+        Marks due reminders 'Skipped' when their appointment is no longer scheduled
+        (cancelled or done) or their appointment or patient has been archived, so they
+        leave the queue instead of being claimed and released forever.
+        """
+        return self.db.execute_rowcount("""UPDATE appointment_reminders ar
+                                           LEFT JOIN appointments ap
+                                                  ON ap.Appointment_ID = ar.Appointment_ID AND ap.Status = 'Scheduled'
+                                           LEFT JOIN patients pa ON pa.Patient_ID = ar.Patient_ID
+                                           SET ar.Status = 'Skipped', ar.Claim_Token = NULL, ar.Claimed_At = NULL
+                                           WHERE ar.Status = 'Pending' AND ar.Reminder_Date <= CURDATE()
+                                             AND (ap.Appointment_ID IS NULL OR pa.Patient_ID IS NULL)""")
+
+    def release_stale_claims(self, timeout_minutes=REMINDER_CLAIM_TIMEOUT_MINUTES):
+        """Returns reminders left in 'Sending' by a dispatcher that died to the pending queue."""
+        return self.db.execute_rowcount("""UPDATE appointment_reminders
+                                           SET Status = 'Pending', Claim_Token = NULL, Claimed_At = NULL
+                                           WHERE Status = 'Sending' AND Claimed_At < NOW() - INTERVAL %s MINUTE""",
+                                        (int(timeout_minutes),))
+
+    def mark_sent_many(self, reminder_ids):
+        if not reminder_ids:
+            return 0
+        placeholders = ', '.join(['%s'] * len(reminder_ids))
+        query = f"""UPDATE appointment_reminders
+                    SET Status = 'Sent', Sent_Date = NOW(), Claim_Token = NULL
+                    WHERE Reminder_ID IN ({placeholders})"""
+        return self.db.execute_rowcount(query, tuple(reminder_ids))
+
+    def mark_failed_many(self, reminder_ids, max_attempts=REMINDER_MAX_ATTEMPTS,
+                         backoff_minutes=REMINDER_RETRY_BACKOFF_MINUTES):
+        """
+        Puts failed reminders back in the queue until they run out of attempts, each
+        held back for ``backoff_minutes``, doubled per earlier attempt, so a broken
+        recipient does not use up its attempts and the send budget in one pass.
+        """
+        if not reminder_ids:
+            return 0
+        placeholders = ', '.join(['%s'] * len(reminder_ids))
+        # Assignments run left to right: Retry_After sees the attempts before this one
+        query = f"""UPDATE appointment_reminders
+                    SET Status = IF(Attempts + 1 >= %s, 'Failed', 'Pending'),
+                        Retry_After = NOW() + INTERVAL (%s << Attempts) MINUTE, Attempts = Attempts + 1,
+                        Claim_Token = NULL, Claimed_At = NULL
+                    WHERE Reminder_ID IN ({placeholders})"""
+        return self.db.execute_rowcount(query, (int(max_attempts), int(backoff_minutes), *reminder_ids))
+
     def get_appointment_reminders(self, appointment_id):
         query = """SELECT * FROM appointment_reminders 
                    WHERE Appointment_ID = %s 
@@ -514,6 +1164,141 @@ class ReminderManager:
         return self.db.execute("DELETE FROM appointment_reminders WHERE Reminder_ID = %s", (reminder_id,))
 
 
+class RecallManager:
+    """
+    Queue of patients to call back, fed by background scanners. Each scanner keeps
+    a watermark in ``scan_watermarks`` so a run only reads the rows that entered
+    its window since the previous run, and the unique key on (Source, Source_ID)
+    makes overlapping runs from several terminals harmless.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def get_watermark(self, scanner):
+        result = self.db.fetch("SELECT Last_Date, Last_ID, Last_Changed FROM scan_watermarks WHERE Scanner = %s",
+                               (scanner,))
+        return result[0] if result else None
+
+    def set_watermark(self, scanner, last_date, last_id, last_changed=None):
+        # Never move backwards when two terminals finish a scan out of order
+        query = """INSERT INTO scan_watermarks (Scanner, Last_Date, Last_ID, Last_Changed, Updated_At)
+                   VALUES (%s, %s, %s, %s, NOW())
+                   ON DUPLICATE KEY UPDATE Last_Date = GREATEST(Last_Date, VALUES(Last_Date)),
+                                           Last_ID = GREATEST(Last_ID, VALUES(Last_ID)),
+                                           Last_Changed = COALESCE(GREATEST(Last_Changed, VALUES(Last_Changed)),
+                                                                   VALUES(Last_Changed), Last_Changed),
+                                           Updated_At = NOW()"""
+        return self.db.execute(query, (scanner, last_date, last_id, last_changed))
+
+    def scan_expiring_prescriptions(self, warning_days=PRESCRIPTION_EXPIRY_WARNING_DAYS):
+        """
+        Queues a recall for every prescription that expires within ``warning_days``
+        and has not been queued yet. Two indexed range reads per run: expiry dates
+        past the previous horizon, and prescriptions written since the previous run.
+        Returns the number of recalls added.
+        """
+        today = datetime.now().date()
+        horizon = today + timedelta(days=int(warning_days))
+        mark = self.get_watermark('prescription_expiry')
+        last_date = mark['Last_Date'] if mark else today - timedelta(days=1)
+        last_id = mark['Last_ID'] if mark else 0
+        max_id = self.db.fetch("SELECT COALESCE(MAX(Prescription_ID), 0) AS max_id FROM prescriptions")[0]['max_id']
+
+        insert = """INSERT IGNORE INTO patient_recalls (Patient_ID, Source, Source_ID, Due_Date, Reason)
+                    SELECT Patient_ID, 'prescription', Prescription_ID, Expiry_Date, 'Prescription expiring'
+                    FROM prescriptions"""
+        try:
+            # Expiry dates that moved into the window as the calendar advanced
+            added = self.db.execute_rowcount(insert + " WHERE Expiry_Date > %s AND Expiry_Date <= %s",
+                                             (last_date, horizon))
+            # New prescriptions that were already inside the window when written
+            added += self.db.execute_rowcount(insert + """ WHERE Prescription_ID > %s AND Prescription_ID <= %s
+                                                           AND Expiry_Date BETWEEN %s AND %s""",
+                                              (last_id, max_id, today, horizon))
+            self.set_watermark('prescription_expiry', max(last_date, horizon), max_id)
+        except Exception as e:
+            logger.error(f"Prescription expiry scan failed: {str(e)}")
+            raise
+        logger.info(f"Queued {added} prescription recalls expiring by {horizon}")
+        return added
+
+    def sync_followups(self, default_days=DEFAULT_FOLLOWUP_DAYS):
+        """
+        Materializes the follow-up date of every medical record written or edited
+        since the last sync, for all patients at once, with one INSERT ... SELECT
+        over the Updated_At range; a pending recall whose record changed gets the
+        new date. The first run backfills every existing record. Returns MySQL's
+        affected-row count: 1 per recall added, 2 per recall whose date moved.
+        """
+        mark = self.get_watermark('followup')
+        since = mark['Last_Changed'] if mark else None
+        now = self.db.fetch("SELECT NOW(6) AS now")[0]['now']
+
+        query = """INSERT INTO patient_recalls (Patient_ID, Source, Source_ID, Due_Date, Reason)
+                   SELECT Patient_ID, 'followup', Record_ID,
+                          DATE(DATE_ADD(COALESCE(Recorded_Date, NOW()), INTERVAL COALESCE(Follow_up_Days, %s) DAY)),
+                          LEFT(CONCAT('Follow-up: ', COALESCE(Diagnosis, 'check-up')), 255)
+                   FROM medical_records"""
+        params = [int(default_days)]
+        if since is not None:
+            # The margin catches records stamped before ``since`` whose transaction committed after it
+            query += " WHERE Updated_At >= %s - INTERVAL %s SECOND"
+            params += [since, CHANGE_LAG_S]
+        query += """ ON DUPLICATE KEY UPDATE Due_Date = IF(Status = 'Pending', VALUES(Due_Date), Due_Date),
+                                             Reason = IF(Status = 'Pending', VALUES(Reason), Reason)"""
+        try:
+            changed = self.db.execute_rowcount(query, tuple(params))
+            self.set_watermark('followup', now.date(), 0, now)
+        except Exception as e:
+            logger.error(f"Follow-up recall sync failed: {str(e)}")
+            raise
+        logger.info(f"Follow-up recalls synced from records changed since {since or 'the start'} ({changed} rows)")
+        return changed
+
+    def get_patient_recalls(self, patient_id, source=None, due_only=False):
+        """Pending recalls of one patient, soonest first (served by idx_recalls_patient)."""
+        query = "SELECT * FROM patient_recalls WHERE Patient_ID = %s AND Status = 'Pending'"
+        params = [patient_id]
+        if source:
+            query += " AND Source = %s"
+            params.append(source)
+        if due_only:
+            query += " AND Due_Date <= CURDATE()"
+        query += " ORDER BY Due_Date ASC"
+        return self.db.fetch(query, tuple(params))
+
+    def list_due(self, source=None, limit=200, within_days=0):
+        """
+        Pending recalls due today or overdue (or due within ``within_days``, e.g. to call
+        before a prescription expires), with patient contact details.
+        """
+        query = """SELECT r.*, pa.Contact, pa.Email, CONCAT(pa.Surname, ', ', pa.FirstName) AS Name
+                   FROM patient_recalls r
+                   JOIN patients pa ON r.Patient_ID = pa.Patient_ID
+                   WHERE r.Status = 'Pending' AND r.Due_Date <= CURDATE() + INTERVAL %s DAY"""
+        params = [int(within_days)]
+        if source:
+            query += " AND r.Source = %s"
+            params.append(source)
+        query += " ORDER BY r.Due_Date ASC LIMIT %s"
+        params.append(int(limit))
+        return self.db.fetch(query, tuple(params))
+
+    def close(self, recall_id, status='Contacted'):
+        """Closes one pending recall, e.g. once the patient has been called."""
+        return self.db.execute_rowcount("""UPDATE patient_recalls SET Status = %s, Closed_At = NOW()
+                                           WHERE Recall_ID = %s AND Status = 'Pending'""", (status, recall_id))
+
+    def delete_for_source(self, source, source_id):
+        return self.db.execute("DELETE FROM patient_recalls WHERE Source = %s AND Source_ID = %s", (source, source_id))
+
+    def count_pending(self):
+        """Pending recalls that are due; future follow-ups are not counted until their day."""
+        result = self.db.fetch("SELECT COUNT(*) AS count FROM patient_recalls WHERE Status = 'Pending' AND Due_Date <= CURDATE()")
+        return result[0]['count'] if result else 0
+
+
 class InvoiceManager:
     def __init__(self, db: Database):
         self.db = db
@@ -568,3 +1353,183 @@ class InvoiceManager:
                    WHERE Patient_ID = %s 
                    ORDER BY Invoice_Date DESC"""
         return self.db.fetch(query, (patient_id,))
+
+
+class ReportManager:
+    """Date-range reports read from the daily rollup tables maintained by backend.rollups."""
+
+    # Period -> SQL grouping key over the rollup Day column
+    PERIODS = {
+        'day': "Day",
+        'week': "DATE_SUB(Day, INTERVAL WEEKDAY(Day) DAY)",
+        'month': "DATE_FORMAT(Day, '%%Y-%%m')",
+        'year': "YEAR(Day)",
+    }
+
+    # Demographic dimension -> SQL over patients_daily
+    DEMOGRAPHICS = {
+        'age_group': "Age_Group",
+        'gender': "Gender",
+        'city': "IF(City = '', 'Unknown', City)",
+        'month': "CONCAT(YEAR(Day), '-', LPAD(MONTH(Day), 2, '0'))",
+    }
+    # The same dimensions over patients without a Registration_Date, which patients_daily cannot hold
+    UNDATED_DEMOGRAPHICS = {
+        'age_group': "Age_Group",
+        'gender': "Gender",
+        'city': "IF(COALESCE(City, '') = '', 'Unknown', City)",
+        'month': "'Unknown'",
+    }
+
+    def __init__(self, db: Database):
+        self.db = db
+
+    def refresh(self):
+        """Rebuilds the days changed since the last refresh so reports include the latest writes."""
+        return refresh_rollups(self.db)
+
+    def first_day(self):
+        """Earliest day in the sales, billing and invoice rollups (today when they are empty)."""
+        return self.db.fetch("""SELECT LEAST(COALESCE((SELECT MIN(Day) FROM sales_daily), CURDATE()),
+                                             COALESCE((SELECT MIN(Day) FROM billing_daily), CURDATE()),
+                                             COALESCE((SELECT MIN(Day) FROM invoices_daily), CURDATE())) AS Day""")[0]['Day']
+
+    def _range(self, start, end):
+        """(start, end) with an open end running to today and an open start from the earliest data."""
+        if not end:
+            end = datetime.now().date()
+        if not start:
+            start = self.first_day()
+            if str(start) > str(end):
+                start = end
+        if str(start) > str(end):
+            raise ValueError('Start date must be on or before the end date')
+        return start, end
+
+    def _period(self, period):
+        if period not in self.PERIODS:
+            raise ValueError(f"Unknown period '{period}' (expected one of {', '.join(self.PERIODS)})")
+        return self.PERIODS[period]
+
+    def revenue(self, start, end, period='day'):
+        """Sales count and revenue per period."""
+        query = f"""SELECT {self._period(period)} AS Period, SUM(Sales) AS Sales, SUM(Revenue) AS Revenue
+                    FROM sales_daily
+                    WHERE Day BETWEEN %s AND %s
+                    GROUP BY Period ORDER BY Period"""
+        return self.db.fetch(query, self._range(start, end))
+
+    def sales_by_category(self, start, end):
+        query = """SELECT COALESCE(sp.category, 'Deleted products') AS Category, COUNT(DISTINCT r.Product_ID) AS Products,
+                          SUM(r.Quantity) AS Quantity, SUM(r.Revenue) AS Revenue
+                   FROM sales_daily_product r
+                   LEFT JOIN sales_products sp ON sp.id = r.Product_ID
+                   WHERE r.Day BETWEEN %s AND %s
+                   GROUP BY Category ORDER BY Revenue DESC"""
+        return self.db.fetch(query, self._range(start, end))
+
+    def sales_by_product(self, start, end, limit=50):
+        query = """SELECT r.Product_ID, COALESCE(sp.name, CONCAT('#', r.Product_ID)) AS Product, sp.category AS Category,
+                          SUM(r.Sales) AS Sales, SUM(r.Quantity) AS Quantity, SUM(r.Revenue) AS Revenue
+                   FROM sales_daily_product r
+                   LEFT JOIN sales_products sp ON sp.id = r.Product_ID
+                   WHERE r.Day BETWEEN %s AND %s
+                   GROUP BY r.Product_ID, Product, Category ORDER BY Revenue DESC LIMIT %s"""
+        return self.db.fetch(query, (*self._range(start, end), int(limit)))
+
+    def billing_by_method(self, start, end):
+        query = """SELECT IF(Payment_Method = '', 'Unspecified', Payment_Method) AS Payment_Method,
+                          SUM(Bills) AS Bills, SUM(Amount) AS Amount,
+                          SUM(IF(Status = 'Paid', Amount, 0)) AS Paid
+                   FROM billing_daily
+                   WHERE Day BETWEEN %s AND %s
+                   GROUP BY Payment_Method ORDER BY Amount DESC"""
+        return self.db.fetch(query, self._range(start, end))
+
+    def invoices_by_status(self, start, end):
+        query = """SELECT IF(Status = '', 'Unknown', Status) AS Status, SUM(Invoices) AS Invoices,
+                          SUM(Total_Amount) AS Total_Amount, SUM(Tax) AS Tax, SUM(Grand_Total) AS Grand_Total
+                   FROM invoices_daily
+                   WHERE Day BETWEEN %s AND %s
+                   GROUP BY Status ORDER BY Grand_Total DESC"""
+        return self.db.fetch(query, self._range(start, end))
+
+    def demographics(self, group_by, start=None, end=None):
+        """
+        Patient counts grouped by one or more of age_group, gender, city and
+        (registration) month, optionally limited to patients registered in
+        [start, end]. Reads patients_daily, so the cost follows the number of
+        groups and days rather than the number of patients. Without a range,
+        patients with no registration date are added from the patients table
+        (month 'Unknown'), so the totals match the patient count.
+        """
+        if isinstance(group_by, str):
+            group_by = [group_by]
+        unknown = [g for g in group_by if g not in self.DEMOGRAPHICS]
+        if not group_by or unknown:
+            raise ValueError(f"Unknown demographic group(s) {', '.join(unknown)} (expected {', '.join(self.DEMOGRAPHICS)})")
+
+        groups = ', '.join(group_by)
+        columns = ', '.join(f"{self.DEMOGRAPHICS[g]} AS {g}" for g in group_by)
+        rows = f"SELECT {columns}, Patients FROM patients_daily"
+        conditions, params = [], []
+        if start:
+            conditions.append("Day >= %s")
+            params.append(start)
+        if end:
+            conditions.append("Day <= %s")
+            params.append(end)
+        if conditions:
+            rows += " WHERE " + " AND ".join(conditions)
+        else:
+            undated = ', '.join(f"{self.UNDATED_DEMOGRAPHICS[g]} AS {g}" for g in group_by)
+            rows += f""" UNION ALL SELECT {undated}, COUNT(*) FROM patients
+                         WHERE Registration_Date IS NULL GROUP BY {groups}"""
+        query = f"SELECT {groups}, SUM(Patients) AS Patients FROM ({rows}) r GROUP BY {groups} ORDER BY "
+        query += groups if group_by == ['month'] else "Patients DESC"
+        return self.db.fetch(query, tuple(params))
+
+    def period_summary(self, start, end, period='month'):
+        """Sales revenue, billed amount and invoiced total side by side for each period."""
+        key = self._period(period)
+        params = self._range(start, end)
+        summary = {}
+        for table, columns in (('sales_daily', "SUM(Revenue) AS Sales_Revenue"),
+                               ('billing_daily', "SUM(Amount) AS Billed"),
+                               ('invoices_daily', "SUM(Grand_Total) AS Invoiced")):
+            rows = self.db.fetch(f"""SELECT {key} AS Period, {columns} FROM {table}
+                                     WHERE Day BETWEEN %s AND %s GROUP BY Period""", params)
+            for row in rows:
+                summary.setdefault(row['Period'], {'Period': row['Period'], 'Sales_Revenue': 0, 'Billed': 0, 'Invoiced': 0}).update(
+                    {k: v or 0 for k, v in row.items() if k != 'Period'})
+        return [summary[p] for p in sorted(summary)]
+
+    def revenue_trend(self, start, end, window=REPORT_TREND_WINDOW_DAYS):
+        """Revenue per day with its trailing ``window``-day average; days without sales count as zero."""
+        start, end = self._range(start, end)
+        by_day = {str(row['Period']): row for row in self.revenue(start, end, 'day')}
+        day = datetime.strptime(str(start)[:10], '%Y-%m-%d').date()
+        last = datetime.strptime(str(end)[:10], '%Y-%m-%d').date()
+        rows = []
+        while day <= last:
+            row = by_day.get(day.isoformat(), {})
+            rows.append({'Period': day, 'Sales': row.get('Sales') or 0, 'Revenue': float(row.get('Revenue') or 0)})
+            day += timedelta(days=1)
+        for row, average in zip(rows, moving_average([row['Revenue'] for row in rows], window)):
+            row['Average'] = average
+        return rows
+
+    def sell_through_by_product(self, start, end, limit=50):
+        """Units sold in the range against units still on hand, per stocked product, fastest sellers first."""
+        sold = self.db.fetch("""SELECT r.Product_ID, sp.name AS Product, sp.category AS Category,
+                                       sp.quantity AS On_Hand, SUM(r.Quantity) AS Sold
+                                FROM sales_daily_product r
+                                JOIN sales_products sp ON sp.id = r.Product_ID
+                                WHERE r.Day BETWEEN %s AND %s AND sp.id < %s
+                                GROUP BY r.Product_ID, Product, Category, On_Hand""",
+                             (*self._range(start, end), MADE_TO_ORDER_ID_BASE))
+        rates = sell_through([row['Product_ID'] for row in sold], [row['Sold'] for row in sold],
+                             {row['Product_ID']: row['On_Hand'] for row in sold})
+        for row in sold:
+            row['Rate'] = rates.get(row['Product_ID'], 0.0)
+        return sorted(sold, key=lambda row: -row['Rate'])[:int(limit)]
@@ -0,0 +1,44 @@
+"""
+Background warm-up of the session while the login screen is open.
+
+The login window starts a ``SessionPrewarmer`` as soon as it is shown, so the
+connection round-trip and the lists every screen loads at build time (doctors,
+products, the patient picker preload) are already cached by the managers when
+the password check finishes.
+"""
+import threading
+import time
+from utils.logger import setup_logging
+from utils.ui_constants import AUTOCOMPLETE_PRELOAD_LIMIT
+
+logger = setup_logging(__name__)
+
+
+def default_warmup_tasks(db, managers):
+    """Reads the main window issues while it builds its frames."""
+    return [
+        ('connection', db.ping),
+        ('doctors', managers['dm'].list_doctors),
+        ('products', managers['im'].list_items),
+        ('patients', lambda: managers['pm'].list_patients(limit=AUTOCOMPLETE_PRELOAD_LIMIT)),
+    ]
+
+
+class SessionPrewarmer(threading.Thread):
+    """Runs the warm-up tasks once on a daemon thread; failures are only logged."""
+
+    def __init__(self, tasks):
+        super().__init__(name='session-prewarm', daemon=True)
+        self.tasks = tasks
+        self.timings = {}
+
+    def run(self):
+        for name, task in self.tasks:
+            started = time.perf_counter()
+            try:
+                task()
+            except Exception as e:
+                logger.warning(f"Prewarm task '{name}' failed: {str(e)}")
+                continue
+            self.timings[name] = (time.perf_counter() - started) * 1000
+        logger.info("Session prewarm finished: " + ", ".join(f"{k}={v:.0f}ms" for k, v in self.timings.items()))
@@ -0,0 +1,137 @@
+"""
+Reminder delivery.
+
+``ReminderDispatcher`` claims due reminders in batches, hands each one to the
+sender registered for its contact method, and records the outcome with one
+bulk UPDATE per batch. Sends are rate limited. A reminder is only marked sent
+after its sender returned; a failed one is retried after
+REMINDER_RETRY_BACKOFF_MINUTES, doubling per attempt, rather than in the same
+pass. Claims left behind by a crashed dispatcher are released after
+REMINDER_CLAIM_TIMEOUT_MINUTES, so restarts never lose a reminder.
+"""
+import json
+import os
+import smtplib
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime
+from email.message import EmailMessage
+from utils.constants import (REMINDER_BATCH_SIZE, REMINDER_RATE_PER_MINUTE, REMINDER_OUTBOX_DIR,
+                             REMINDER_SMTP_HOST, REMINDER_SMTP_PORT, REMINDER_SMTP_FROM)
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+
+def reminder_text(reminder):
+    return (f"Hi {reminder['Name']}, this is a reminder of your appointment on "
+            f"{reminder['Appointment_Date']} at {str(reminder['Appointment_Time'])[:5]}.")
+
+
+class ReminderSender(ABC):
+    """Delivers one reminder; raise to report a failed delivery."""
+
+    @abstractmethod
+    def send(self, reminder):
+        pass
+
+
+class OutboxSender(ReminderSender):
+    """Appends messages to a JSON-lines file, standing in for an SMS gateway or mail server."""
+
+    def __init__(self, directory=REMINDER_OUTBOX_DIR, channel='sms'):
+        self.path = os.path.join(directory, f"{channel}.jsonl")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def send(self, reminder):
+        entry = {
+            'reminder_id': reminder['Reminder_ID'],
+            'to': reminder.get('Email') if reminder.get('Contact_Method') == 'Email' else reminder.get('Contact'),
+            'method': reminder.get('Contact_Method'),
+            'message': reminder_text(reminder),
+            'queued_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._lock, open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, default=str) + '\n')
+
+
+class SmtpSender(ReminderSender):
+    """Sends e-mail reminders through an SMTP server (a local debugging server in tests)."""
+
+    def __init__(self, host=REMINDER_SMTP_HOST, port=REMINDER_SMTP_PORT, sender=REMINDER_SMTP_FROM):
+        self.host = host
+        self.port = port
+        self.sender = sender
+
+    def send(self, reminder):
+        if not reminder.get('Email'):
+            raise ValueError(f"Patient {reminder['Patient_ID']} has no e-mail address")
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = reminder['Email']
+        message['Subject'] = 'Appointment reminder'
+        message.set_content(reminder_text(reminder))
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(message)
+
+
+def default_senders():
+    """Outbox files for every method; real e-mail when an SMTP host is configured."""
+    senders = {method: OutboxSender(channel=method.lower()) for method in ('SMS', 'Call', 'Email')}
+    if REMINDER_SMTP_HOST:
+        senders['Email'] = SmtpSender()
+    return senders
+
+
+class ReminderDispatcher:
+    def __init__(self, reminder_manager, senders=None, batch_size=REMINDER_BATCH_SIZE,
+                 rate_per_minute=REMINDER_RATE_PER_MINUTE):
+        self.reminders = reminder_manager
+        self.senders = senders or default_senders()
+        self.batch_size = batch_size
+        self.interval = 60.0 / rate_per_minute if rate_per_minute else 0.0
+        self._next_send = 0.0
+
+    def _throttle(self):
+        now = time.monotonic()
+        if now < self._next_send:
+            time.sleep(self._next_send - now)
+        self._next_send = max(now, self._next_send) + self.interval
+
+    def run_once(self, max_batches=None, stop_event=None):
+        """Drains due reminders batch by batch. Returns (sent, failed)."""
+        self.reminders.release_stale_claims()
+        skipped = self.reminders.skip_orphaned()
+        if skipped:
+            logger.info(f"Skipped {skipped} reminders for appointments that are no longer scheduled")
+        sent_total = failed_total = batches = 0
+        while max_batches is None or batches < max_batches:
+            if stop_event is not None and stop_event.is_set():
+                break
+            batch = self.reminders.claim_due(uuid.uuid4().hex, self.batch_size)
+            if not batch:
+                break
+            batches += 1
+
+            sent, failed = [], []
+            for reminder in batch:
+                sender = self.senders.get(reminder.get('Contact_Method')) or self.senders.get('SMS')
+                self._throttle()
+                try:
+                    sender.send(reminder)
+                    sent.append(reminder['Reminder_ID'])
+                except Exception as e:
+                    logger.warning(f"Reminder {reminder['Reminder_ID']} not delivered: {str(e)}")
+                    failed.append(reminder['Reminder_ID'])
+
+            self.reminders.mark_sent_many(sent)
+            self.reminders.mark_failed_many(failed)
+            sent_total += len(sent)
+            failed_total += len(failed)
+
+        if sent_total or failed_total:
+            logger.info(f"Reminder dispatch: {sent_total} sent, {failed_total} failed")
+        return sent_total, failed_total
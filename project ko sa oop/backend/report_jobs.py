@@ -0,0 +1,259 @@
+"""
+Report jobs.
+
+Reports run on a small worker pool, each worker with its own connection, so a
+long report never blocks the UI. Results are cached on disk under a key made
+of the report name, its parameters and the ``table_versions`` counters of the
+tables it reads: re-opening a report whose data has not changed is a file
+read, and any write to those tables makes the old entry unreachable. Where the
+version triggers are missing the counters never move, so the cache is bypassed.
+"""
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.change_feed import change_triggers_installed
+from database.db_connection import Database
+from utils.constants import REPORT_WORKERS, REPORT_CACHE_DIR, REPORT_CACHE_TTL_S, REPORT_CACHE_MAX_FILES
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+SALES_TABLES = ('sales', 'sale_items', 'sales_products')
+MONEY = ',.2f'
+
+# Report -> (tables keying the cache, [(section title, columns, loader(rm, start, end), columns to total)])
+# Columns are (row key, heading, width, format spec) as rendered by ReportsFrame.
+REPORT_DEFINITIONS = {
+    "Sales Report": (SALES_TABLES, [
+        ("Sales by Category",
+         [('Category', 'Category', 24, ''), ('Products', 'Products', 10, ''),
+          ('Quantity', 'Quantity', 12, ''), ('Revenue', 'Revenue (₱)', 16, MONEY)],
+         lambda rm, start, end: rm.sales_by_category(start, end), ('Quantity', 'Revenue')),
+    ]),
+    "Sales by Product": (SALES_TABLES, [
+        ("Top Products",
+         [('Product', 'Product', 28, ''), ('Category', 'Category', 18, ''), ('Sales', 'Sales', 8, ''),
+          ('Quantity', 'Quantity', 10, ''), ('Revenue', 'Revenue (₱)', 16, MONEY)],
+         lambda rm, start, end: rm.sales_by_product(start, end), ()),
+    ]),
+    "Revenue by Day": (('sales',), [
+        ("Revenue by Day",
+         [('Period', 'Period', 14, ''), ('Sales', 'Sales', 10, ''), ('Revenue', 'Revenue (₱)', 16, MONEY)],
+         lambda rm, start, end: rm.revenue(start, end, 'day'), ('Sales', 'Revenue')),
+    ]),
+    "Revenue by Month": (('sales',), [
+        ("Revenue by Month",
+         [('Period', 'Period', 14, ''), ('Sales', 'Sales', 10, ''), ('Revenue', 'Revenue (₱)', 16, MONEY)],
+         lambda rm, start, end: rm.revenue(start, end, 'month'), ('Sales', 'Revenue')),
+    ]),
+    "Revenue Trend": (('sales',), [
+        ("Daily Revenue and Trailing Average",
+         [('Period', 'Day', 14, ''), ('Sales', 'Sales', 10, ''), ('Revenue', 'Revenue (₱)', 16, MONEY),
+          ('Average', 'Average (₱)', 16, MONEY)],
+         lambda rm, start, end: rm.revenue_trend(start, end), ('Sales', 'Revenue')),
+    ]),
+    "Sell-Through": (SALES_TABLES, [
+        ("Sell-Through by Product",
+         [('Product', 'Product', 28, ''), ('Category', 'Category', 18, ''), ('Sold', 'Sold', 8, ''),
+          ('On_Hand', 'On Hand', 9, ''), ('Rate', 'Sell-Through', 13, '.1%')],
+         lambda rm, start, end: rm.sell_through_by_product(start, end), ()),
+    ]),
+    "Period Summary": (('sales', 'billing', 'invoices'), [
+        ("Monthly Summary",
+         [('Period', 'Month', 10, ''), ('Sales_Revenue', 'Sales (₱)', 16, MONEY),
+          ('Billed', 'Billed (₱)', 16, MONEY), ('Invoiced', 'Invoiced (₱)', 16, MONEY)],
+         lambda rm, start, end: rm.period_summary(start, end, 'month'), ('Sales_Revenue', 'Billed', 'Invoiced')),
+    ]),
+    "Billing by Payment Method": (('billing',), [
+        ("Billing by Payment Method",
+         [('Payment_Method', 'Method', 18, ''), ('Bills', 'Bills', 8, ''),
+          ('Amount', 'Amount (₱)', 16, MONEY), ('Paid', 'Paid (₱)', 16, MONEY)],
+         lambda rm, start, end: rm.billing_by_method(start, end), ('Bills', 'Amount', 'Paid')),
+    ]),
+    "Invoices by Status": (('invoices',), [
+        ("Invoices by Status",
+         [('Status', 'Status', 12, ''), ('Invoices', 'Invoices', 10, ''), ('Total_Amount', 'Net (₱)', 16, MONEY),
+          ('Tax', 'Tax (₱)', 14, MONEY), ('Grand_Total', 'Total (₱)', 16, MONEY)],
+         lambda rm, start, end: rm.invoices_by_status(start, end), ('Invoices', 'Total_Amount', 'Tax', 'Grand_Total')),
+    ]),
+    # Counts patients registered within the range (those without a Registration_Date are never in it)
+    "Patient Demographics": (('patients',), [
+        (f"Registrations by {label}", [(group, label, 24, ''), ('Patients', 'Registered', 10, '')],
+         lambda rm, start, end, group=group: rm.demographics(group, start, end), ('Patients',))
+        for label, group in (('Age Group', 'age_group'), ('Gender', 'gender'), ('City', 'city'),
+                             ('Registration Month', 'month'))
+    ]),
+}
+
+
+def data_versions(db: Database, tables):
+    """Current change-feed counters of ``tables`` (0 for tables without one)."""
+    placeholders = ', '.join(['%s'] * len(tables))
+    db.commit()
+    rows = db.fetch(f"""SELECT Table_Name, SUM(Version) AS Version FROM table_versions
+                        WHERE Table_Name IN ({placeholders}) GROUP BY Table_Name""", tuple(tables))
+    db.commit()
+    versions = {table: 0 for table in tables}
+    versions.update({row['Table_Name']: int(row['Version']) for row in rows})
+    return versions
+
+
+class ReportCache:
+    """Pickled report results on disk, oldest files pruned beyond ``max_files``."""
+
+    def __init__(self, directory=REPORT_CACHE_DIR, ttl_s=REPORT_CACHE_TTL_S, max_files=REPORT_CACHE_MAX_FILES):
+        self.directory = directory
+        self.ttl_s = ttl_s
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(name, params, versions):
+        payload = json.dumps([name, list(params), sorted(versions.items())], default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.pickle")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_s:
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Discarding unreadable report cache entry {key}: {str(e)}")
+            return None
+
+    def put(self, key, value):
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._prune()
+
+    def _prune(self):
+        entries = [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith('.pickle')]
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_files]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        for name in os.listdir(self.directory):
+            if name.endswith('.pickle'):
+                os.remove(os.path.join(self.directory, name))
+
+
+class ReportJob:
+    """One submitted report; poll ``done``, ``progress`` and ``status`` from the UI thread."""
+
+    def __init__(self, name, params, refresh=False):
+        self.name = name
+        self.params = tuple(params)
+        self.refresh = refresh
+        self.status = 'Queued'
+        self.progress = 0.0
+        self.sections = None
+        self.cached = False
+        self.error = None
+        self.done = False
+        self.future = None
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        self._cancel.set()
+        if self.future is not None and self.future.cancel():
+            self.status = 'Cancelled'
+            self.done = True
+
+
+class ReportJobQueue:
+    def __init__(self, workers=REPORT_WORKERS, cache=None, config=None):
+        self.cache = cache or ReportCache()
+        self.config = config
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='report-worker')
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _db(self):
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = Database(raise_on_error=True, config=self.config)
+            self._local.db = db
+            with self._lock:
+                self._connections.append(db)
+        return db
+
+    def submit(self, name, params, refresh=False):
+        """Queues a report; ``refresh`` recomputes it even when a cached result exists."""
+        if name not in REPORT_DEFINITIONS:
+            raise ValueError(f"Unknown report '{name}'")
+        job = ReportJob(name, params, refresh)
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def _run(self, job):
+        from backend.managers import ReportManager
+        try:
+            if job.cancelled:
+                job.status = 'Cancelled'
+                return
+            db = self._db()
+            tables, sections = REPORT_DEFINITIONS[job.name]
+            job.status = 'Checking cache'
+            # Without the triggers every version stays 0 and a cached entry would never go stale
+            key = None
+            if change_triggers_installed(db, tables):
+                key = self.cache.key(job.name, job.params, data_versions(db, tables))
+            cached = self.cache.get(key) if key and not job.refresh else None
+            if cached is not None:
+                job.sections, job.cached, job.progress, job.status = cached, True, 1.0, 'Done'
+                return
+
+            manager = ReportManager(db)
+            job.status = 'Updating rollups'
+            manager.refresh()
+            results = []
+            for index, (title, columns, loader, totals) in enumerate(sections):
+                if job.cancelled:
+                    job.status = 'Cancelled'
+                    return
+                job.status = f"Running {title}"
+                results.append({'title': title, 'columns': columns, 'totals': totals,
+                                'rows': loader(manager, *job.params)})
+                job.progress = (index + 1) / len(sections)
+            if key:
+                self.cache.put(key, results)
+            job.sections, job.status = results, 'Done'
+        except Exception as e:
+            job.error = e
+            job.status = 'Failed'
+            logger.error(f"Report '{job.name}' failed: {str(e)}")
+        finally:
+            job.done = True
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            for db in self._connections:
+                db.close()
+            self._connections = []
@@ -0,0 +1,169 @@
+"""
+Daily rollups for the reports.
+
+Sales, sale lines, bills, invoices and patient registrations are summarized per day into small rollup
+tables. Triggers record which (source, day) pairs a write touched in
+``report_dirty_days``; ``refresh_rollups`` rebuilds only those days from the
+base tables with one indexed range query per source, so a year of revenue is
+read from about 365 rows however many sales it holds.
+"""
+from datetime import timedelta
+from database.db_connection import Database
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+_TRIGGER_EVENTS = {'INSERT': ('NEW',), 'UPDATE': ('OLD', 'NEW'), 'DELETE': ('OLD',)}
+
+# Base table -> (rollup source, SQL for the day a row belongs to, with {row} as OLD/NEW)
+ROLLUP_SOURCES = {
+    'sales': ('sales', 'DATE({row}.sale_date)'),
+    'sale_items': ('sales', '(SELECT DATE(sale_date) FROM sales WHERE id = {row}.sale_id)'),
+    'billing': ('billing', '{row}.Billing_Date'),
+    'invoices': ('invoices', '{row}.Invoice_Date'),
+    'patients': ('patients', '{row}.Registration_Date'),
+}
+
+# Rollup source -> [(rollup table, INSERT ... SELECT rebuilding the days in [%s, %s))]
+ROLLUP_QUERIES = {
+    'sales': [
+        ('sales_daily', """INSERT INTO sales_daily (Day, Sales, Revenue)
+                           SELECT DATE(sale_date), COUNT(*), SUM(total)
+                           FROM sales
+                           WHERE sale_date >= %s AND sale_date < %s
+                           GROUP BY DATE(sale_date)
+                           ON DUPLICATE KEY UPDATE Sales = VALUES(Sales), Revenue = VALUES(Revenue)"""),
+        ('sales_daily_product', """INSERT INTO sales_daily_product (Day, Product_ID, Sales, Quantity, Revenue)
+                                   SELECT DATE(s.sale_date), si.product_id, COUNT(DISTINCT si.sale_id),
+                                          SUM(si.quantity), SUM(si.quantity * si.price)
+                                   FROM sales s
+                                   JOIN sale_items si ON si.sale_id = s.id
+                                   WHERE s.sale_date >= %s AND s.sale_date < %s
+                                   GROUP BY DATE(s.sale_date), si.product_id
+                                   ON DUPLICATE KEY UPDATE Sales = VALUES(Sales), Quantity = VALUES(Quantity),
+                                                           Revenue = VALUES(Revenue)"""),
+    ],
+    'billing': [
+        ('billing_daily', """INSERT INTO billing_daily (Day, Payment_Method, Status, Bills, Amount)
+                             SELECT Billing_Date, COALESCE(Payment_Method, ''), Status, COUNT(*), SUM(Amount)
+                             FROM billing
+                             WHERE Billing_Date >= %s AND Billing_Date < %s
+                             GROUP BY Billing_Date, COALESCE(Payment_Method, ''), Status
+                             ON DUPLICATE KEY UPDATE Bills = VALUES(Bills), Amount = VALUES(Amount)"""),
+    ],
+    'invoices': [
+        ('invoices_daily', """INSERT INTO invoices_daily (Day, Status, Invoices, Total_Amount, Tax, Grand_Total)
+                              SELECT Invoice_Date, COALESCE(Status, ''), COUNT(*), SUM(Total_Amount), SUM(Tax), SUM(Grand_Total)
+                              FROM invoices
+                              WHERE Invoice_Date >= %s AND Invoice_Date < %s
+                              GROUP BY Invoice_Date, COALESCE(Status, '')
+                              ON DUPLICATE KEY UPDATE Invoices = VALUES(Invoices), Total_Amount = VALUES(Total_Amount),
+                                                      Tax = VALUES(Tax), Grand_Total = VALUES(Grand_Total)"""),
+    ],
+    'patients': [
+        ('patients_daily', """INSERT INTO patients_daily (Day, Age_Group, Gender, City, Patients)
+                              SELECT Registration_Date, Age_Group, Gender, COALESCE(City, ''), COUNT(*)
+                              FROM patients
+                              WHERE Registration_Date >= %s AND Registration_Date < %s
+                              GROUP BY Registration_Date, Age_Group, Gender, COALESCE(City, '')
+                              ON DUPLICATE KEY UPDATE Patients = VALUES(Patients)"""),
+    ],
+}
+
+# Rollup source -> (base table, date column) used to mark every existing day for a rebuild
+_BACKFILL = {
+    'sales': ('sales', 'DATE(sale_date)'),
+    'billing': ('billing', 'Billing_Date'),
+    'invoices': ('invoices', 'Invoice_Date'),
+    'patients': ('patients', 'Registration_Date'),
+}
+
+
+def install_rollup_triggers(db: Database, tables=tuple(ROLLUP_SOURCES)):
+    """Create the dirty-day triggers that are missing. Safe to run on every start."""
+    existing = {row['Trigger'] for row in db.fetch('SHOW TRIGGERS')}
+    for table in tables:
+        source, day_sql = ROLLUP_SOURCES[table]
+        for event, rows in _TRIGGER_EVENTS.items():
+            name = f"trg_{table}_{event.lower()}_rollup"
+            if name in existing:
+                continue
+            days = ' UNION '.join(f"SELECT {day_sql.format(row=row)} AS Day" for row in rows)
+            try:
+                db.execute(f"""
+                    CREATE TRIGGER `{name}` AFTER {event} ON `{table}`
+                    FOR EACH ROW
+                    INSERT IGNORE INTO report_dirty_days (Source, Day)
+                    SELECT '{source}', Day FROM ({days}) AS changed WHERE Day IS NOT NULL
+                """)
+                logger.info(f"Trigger '{name}' created")
+            except Exception as e:
+                logger.warning(f"Could not create trigger '{name}': {str(e)}")
+
+
+def drop_rollup_triggers(db: Database, tables=tuple(ROLLUP_SOURCES)):
+    for table in tables:
+        for event in _TRIGGER_EVENTS:
+            db.execute(f"DROP TRIGGER IF EXISTS `trg_{table}_{event.lower()}_rollup`")
+
+
+def mark_all_dirty(db: Database, sources=tuple(_BACKFILL)):
+    """Queue every day that has data for a rebuild, e.g. after a bulk load or on first install."""
+    for source in sources:
+        table, day_sql = _BACKFILL[source]
+        db.execute(f"""INSERT IGNORE INTO report_dirty_days (Source, Day)
+                       SELECT DISTINCT '{source}', {day_sql} FROM {table} WHERE {day_sql} IS NOT NULL""")
+
+
+def _day_ranges(days):
+    """Collapses sorted dates into [start, end) runs of consecutive days."""
+    ranges = []
+    for day in days:
+        if ranges and ranges[-1][1] == day:
+            ranges[-1][1] = day + timedelta(days=1)
+        else:
+            ranges.append([day, day + timedelta(days=1)])
+    return ranges
+
+
+def rebuild_days(db: Database, source, days):
+    """
+    Recomputes the rollup rows of ``source`` for ``days`` from the base tables. Each
+    run of days is deleted and re-inserted in one transaction, so readers never see
+    it missing and a failed insert leaves the old rows in place.
+    """
+    for start, end in _day_ranges(sorted(days)):
+        with db.transaction():
+            for table, query in ROLLUP_QUERIES[source]:
+                db.execute(f"DELETE FROM {table} WHERE Day >= %s AND Day < %s", (start, end))
+                db.execute(query, (start, end))
+
+
+def refresh_rollups(db: Database, batch_size=500):
+    """
+    Rebuilds the days queued in ``report_dirty_days``. The flags of a source are
+    cleared in the same transaction as its rebuild: if the rebuild fails they come
+    back with it, and a write landing mid-rebuild waits on the cleared flag and
+    queues its day again once the rebuild commits. Returns the number of days rebuilt.
+    """
+    rebuilt = 0
+    while True:
+        dirty = db.fetch("SELECT Source, Day FROM report_dirty_days ORDER BY Source, Day LIMIT %s", (int(batch_size),))
+        db.commit()
+        if not dirty:
+            break
+        by_source = {}
+        for row in dirty:
+            by_source.setdefault(row['Source'], []).append(row['Day'])
+        for source, days in by_source.items():
+            placeholders = ', '.join(['%s'] * len(days))
+            with db.transaction():
+                db.execute(f"DELETE FROM report_dirty_days WHERE Source = %s AND Day IN ({placeholders})", (source, *days))
+                if source in ROLLUP_QUERIES:
+                    rebuild_days(db, source, days)
+        rebuilt += len(dirty)
+        if len(dirty) < batch_size:
+            break
+    if rebuilt:
+        logger.info(f"Rebuilt {rebuilt} rollup days")
+    return rebuilt
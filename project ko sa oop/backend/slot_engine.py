@@ -0,0 +1,119 @@
+"""
+Free-slot search over doctor availability.
+
+Each (doctor, day) is an integer bitmap with one bit per slot of that day's
+working hours; a set bit means the slot is taken. Bookings for the whole search
+window come from one indexed range query, so after loading, "next N free slots"
+is a scan over a handful of integers.
+"""
+from datetime import datetime, timedelta
+from utils.constants import SLOT_SEARCH_HORIZON_DAYS
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+
+def _minutes(value):
+    """Minutes since midnight for a TIME column (timedelta), a time or an 'HH:MM[:SS]' string."""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    if isinstance(value, str):
+        parts = value.split(':')
+        return int(parts[0]) * 60 + int(parts[1])
+    return value.hour * 60 + value.minute
+
+
+class DaySlots:
+    """Working hours of one doctor on one day, with the booked slots as a bitmap."""
+
+    __slots__ = ('start', 'length', 'count', 'booked')
+
+    def __init__(self, start, end, length):
+        self.start = start
+        self.length = length
+        self.count = max(0, (end - start) // length)
+        self.booked = 0
+
+    def book(self, minutes):
+        index = (minutes - self.start) // self.length
+        if 0 <= index < self.count:
+            self.booked |= 1 << index
+
+    def free_mask(self, after_minutes=None):
+        mask = ~self.booked & ((1 << self.count) - 1)
+        if after_minutes is not None and after_minutes > self.start:
+            first = -(-(after_minutes - self.start) // self.length)
+            mask &= ~((1 << min(first, self.count)) - 1)
+        return mask
+
+    def free_times(self, after_minutes=None):
+        """Yields free slot start times as minutes since midnight, earliest first."""
+        mask = self.free_mask(after_minutes)
+        while mask:
+            low = mask & -mask
+            yield self.start + (low.bit_length() - 1) * self.length
+            mask ^= low
+
+
+class SlotEngine:
+    def __init__(self, appointment_manager, availability_manager, doctor_manager):
+        self.appointments = appointment_manager
+        self.availability = availability_manager
+        self.doctors = doctor_manager
+        self._days = {}
+        self._loaded = None
+
+    def invalidate(self):
+        """Drop the loaded window; call after bookings or working hours change."""
+        self._days = {}
+        self._loaded = None
+
+    def load(self, start, end):
+        """Build the bitmaps for every doctor and day in [start, end] unless already loaded."""
+        if self._loaded and self._loaded[0] <= start and end <= self._loaded[1]:
+            return
+        doctor_ids = [d['Doctor_ID'] for d in self.doctors.list_doctors()]
+        hours = self.availability.working_hours(doctor_ids)
+
+        days = {}
+        current = start
+        while current <= end:
+            for doctor_id in doctor_ids:
+                window = hours[doctor_id].get(current.weekday())
+                if window:
+                    days[(doctor_id, current)] = DaySlots(*window)
+            current += timedelta(days=1)
+
+        for row in self.appointments.booked_slots(start, end):
+            day = days.get((row['Doctor_ID'], row['Appointment_Date']))
+            if day:
+                day.book(_minutes(row['Appointment_Time']))
+
+        self._days = days
+        self._loaded = (start, end)
+
+    def next_free_slots(self, doctor_id=None, count=5, after=None, horizon_days=SLOT_SEARCH_HORIZON_DAYS):
+        """
+        The earliest ``count`` free slots from ``after`` (default now) for one doctor,
+        or for any doctor when ``doctor_id`` is None, as (doctor_id, date, 'HH:MM') tuples.
+        """
+        after = after or datetime.now()
+        start = after.date() if isinstance(after, datetime) else after
+        end = start + timedelta(days=horizon_days)
+        self.load(start, end)
+
+        now_minutes = after.hour * 60 + after.minute if isinstance(after, datetime) else None
+        doctor_ids = [int(doctor_id)] if doctor_id else sorted({d for d, _ in self._days})
+        results = []
+        current = start
+        while current <= end and len(results) < count:
+            cutoff = now_minutes if current == start else None
+            candidates = []
+            for d in doctor_ids:
+                day = self._days.get((d, current))
+                if day:
+                    candidates.extend((minutes, d) for minutes in day.free_times(cutoff))
+            for minutes, d in sorted(candidates)[:count - len(results)]:
+                results.append((d, current, f"{minutes // 60:02d}:{minutes % 60:02d}"))
+            current += timedelta(days=1)
+        return results
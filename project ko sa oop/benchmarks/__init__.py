@@ -0,0 +1,10 @@
+"""
+Benchmarks for the manager layer.
+
+Every benchmark runs against a dedicated database on the local MySQL server
+(``optical_clinic_bench_<scale>`` by default), seeded with
+``database.data_generator``, so nothing touches the clinic's real data and no
+network hop is involved. Run them from the project folder, e.g.::
+
+    python -m benchmarks.bench_managers --scales 1k 100k
+"""
@@ -0,0 +1,93 @@
+"""
+Vectorized analytics benchmark.
+
+Times the functions in ``backend.analytics`` with NumPy against the same
+functions running their pure-Python fallback, over synthetic sale lines and
+stock levels. Both sides are handed the plain lists the managers fetch, so the
+NumPy timings include turning rows into arrays.
+
+    python -m benchmarks.bench_analytics --lines 1000000
+"""
+import argparse
+import random
+import time
+from backend import analytics
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+CATEGORIES = ['Frames', 'Lenses', 'Contact Lenses', 'Sunglasses', 'Accessories', 'Solutions']
+
+
+def synthetic_lines(lines, products, rng):
+    return {
+        'product_id': [rng.randint(1, products) for _ in range(lines)],
+        'quantity': [rng.randint(1, 4) for _ in range(lines)],
+    }
+
+
+def synthetic_stock(products, rng):
+    return {
+        'quantity': [rng.randint(0, 200) for _ in range(products)],
+        'price': [round(rng.uniform(150, 9000), 2) for _ in range(products)],
+        'category': [rng.choice(CATEGORIES) for _ in range(products)],
+        'reorder_point': [rng.randint(0, 20) for _ in range(products)],
+    }
+
+
+def timed(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def cases(lines, stock, daily):
+    stock_on_hand = {i + 1: qty for i, qty in enumerate(stock['quantity'])}
+    item_ids = list(range(1, len(stock['quantity']) + 1))
+    return [
+        ('inventory_valuation', lambda: analytics.inventory_valuation(stock['quantity'], stock['price'],
+                                                                      stock['category'], stock['reorder_point'])),
+        ('sell_through', lambda: analytics.sell_through(lines['product_id'], lines['quantity'], stock_on_hand)),
+        ('reorder_forecast', lambda: analytics.reorder_forecast(item_ids, stock['quantity'], lines['product_id'],
+                                                                lines['quantity'], 90, 14, 30)),
+        ('moving_average 7', lambda: analytics.moving_average(daily, 7)),
+        ('moving_average 30', lambda: analytics.moving_average(daily, 30)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark NumPy analytics against the pure-Python fallback.')
+    parser.add_argument('--lines', type=int, default=1000000, help='synthetic sale lines')
+    parser.add_argument('--products', type=int, default=5000)
+    parser.add_argument('--days', type=int, default=730, help='days of revenue for the moving averages')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args(argv)
+
+    if analytics.np is None:
+        parser.error('NumPy is not installed; there is nothing to compare the fallback against')
+    numpy = analytics.np
+    rng = random.Random(args.seed)
+    lines = synthetic_lines(args.lines, args.products, rng)
+    stock = synthetic_stock(args.products, rng)
+    daily = [round(rng.uniform(0, 250000), 2) for _ in range(args.days)]
+
+    vector_ms = [(name, timed(fn, args.repeat)) for name, fn in cases(lines, stock, daily)]
+    analytics.np = None
+    try:
+        python_ms = [(name, timed(fn, args.repeat)) for name, fn in cases(lines, stock, daily)]
+    finally:
+        analytics.np = numpy
+
+    print(f"\n== analytics, {args.lines:,} sale lines, {args.products:,} products, {args.days:,} days ==")
+    print(f"{'function':<26}{'python ms':>12}{'numpy ms':>12}{'speedup':>10}")
+    for (name, py), (_, vec) in zip(python_ms, vector_ms):
+        print(f"{name:<26}{py:>12.1f}{vec:>12.1f}{py / vec if vec else float('inf'):>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,449 @@
+"""
+Per-method benchmarks for backend/managers.py.
+
+Each public manager method runs against the seeded benchmark database for every
+requested scale. Wall time (median of ``--repeat`` runs), query count, rows
+transferred, commits and peak Python memory are compared with the stored
+baselines; the run exits non-zero when any method regresses past the threshold,
+raises, has no baseline yet, or has a baseline but no case any more. A public
+method with no case and no entry in ``NOT_BENCHMARKED`` also fails the run.
+Record the baselines on the reference machine with ``--update-baselines`` and
+commit benchmarks/baselines.json.
+
+    python -m benchmarks.bench_managers --scales 1k 100k
+    python -m benchmarks.bench_managers --scales 1k --update-baselines
+"""
+import argparse
+import inspect
+import itertools
+import json
+import os
+import sys
+import uuid
+from datetime import date, datetime, timedelta
+from backend import managers
+from backend.base_manager import BaseManager
+from benchmarks.harness import InstrumentedDatabase, measure, prepare_database
+from database.data_generator import SCALES
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+BASELINES_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_THRESHOLD = 0.25
+# Timings this small are dominated by scheduler noise; never flag below it.
+MIN_WALL_MS = 2.0
+# Argument checks with no queries; they run inside the add/schedule cases
+NOT_BENCHMARKED = {
+    'PatientManager.validate_input',
+    'DoctorManager.validate_input',
+    'AppointmentManager.validate_input',
+    'InventoryManager.validate_input',
+}
+# Cut-off older than any seeded row, so the bulk archivers time their scan without emptying the data
+ARCHIVE_CUTOFF = date(2000, 1, 1)
+
+
+class BenchContext:
+    """Managers plus sample ids picked from the seeded data so lookups hit real rows."""
+
+    def __init__(self, db):
+        from main import build_managers  # pulls in the GUI toolkit
+        self.db = db
+        self.m = build_managers(db)
+        self.users = managers.UserManager(db)
+        row = db.fetch("""SELECT mr.Patient_ID, mr.Doctor_ID FROM medical_records mr
+                          JOIN prescriptions p ON p.Patient_ID = mr.Patient_ID LIMIT 1""")[0]
+        self.patient_id, self.doctor_id = row['Patient_ID'], row['Doctor_ID']
+        sale = db.fetch("""SELECT i.Invoice_ID, i.Sale_ID, s.customer_name FROM invoices i
+                           JOIN sales s ON s.id = i.Sale_ID ORDER BY i.Invoice_ID DESC LIMIT 1""")[0]
+        self.invoice_id, self.sale_id, self.customer = sale['Invoice_ID'], sale['Sale_ID'], sale['customer_name']
+        self.appointment_id = db.fetch("SELECT MAX(Appointment_ID) AS id FROM appointments")[0]['id']
+        self.product = db.fetch("""SELECT id, price, category, Reorder_Point FROM sales_products
+                                   ORDER BY quantity DESC LIMIT 1""")[0]
+        self.surname = db.fetch("SELECT Surname FROM patients WHERE Patient_ID = %s", (self.patient_id,))[0]['Surname']
+        self.username = db.fetch("SELECT Username FROM users ORDER BY User_ID LIMIT 1")[0]['Username']
+        self.doctor_ids = [row['Doctor_ID'] for row in db.fetch("SELECT Doctor_ID FROM doctors")]
+        db.commit()
+        self.today = date.today()
+        self.report_start, self.report_end = (self.today - timedelta(days=365)).isoformat(), self.today.isoformat()
+        # Far-future slots so benchmark bookings never collide with seeded or earlier ones
+        self._slots = itertools.count()
+        self._days = itertools.count()
+
+    def next_slot(self):
+        n = next(self._slots)
+        day = date(2099, 1, 1) + timedelta(days=n // 40)
+        minutes = 8 * 60 + (n % 40) * 15
+        return day.isoformat(), f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+    def next_day(self):
+        """A far-future date not used before in this run, for rows unique per day."""
+        return date(2199, 1, 1) + timedelta(days=next(self._days))
+
+    @staticmethod
+    def unique(prefix):
+        return f"{prefix}-{uuid.uuid4().hex[:12]}"
+
+    def clear_caches(self):
+        for manager in self.m.values():
+            if isinstance(manager, BaseManager):
+                manager.invalidate_cache()
+
+    # Rows made outside the timing for the cases that change or remove one
+    def new_patient(self):
+        return self.m['pm'].add_patient('Bench', 'Mark', 'B', 30, 'Male', 'Adult', 'Benchmark St.',
+                                        '09000000000', 'bench@example.com', '')
+
+    def new_doctor(self):
+        return self.m['dm'].add_doctor('Bench', 'Mark', 'B', self.unique('BENCH'), 'Optometry', '', '')
+
+    def new_appointment(self):
+        day, slot = self.next_slot()
+        return self.m['am'].schedule(self.patient_id, self.doctor_id, day, slot)
+
+    def new_product(self):
+        return self.m['sm'].add_product(self.unique('Bench Frame'), 'Frames', 'Benchmark', 1000, 10)
+
+    def new_sale(self):
+        item = {'product_id': self.product['id'], 'quantity': 1, 'price': float(self.product['price'])}
+        return self.m['sm'].create_sale('Benchmark Customer', [item])
+
+    def new_prescription(self):
+        return self.m['pres_m'].create_prescription(self.patient_id, self.doctor_id, None, '-1.00', '-0.50', '90',
+                                                    None, '-1.25', '-0.50', '85', None, '')
+
+    def new_record(self):
+        return self.m['mr_m'].add_record(self.patient_id, self.doctor_id, None, 'Myopia', 'Mild', 'Benchmark', 'None', 90)
+
+    def new_reminder(self):
+        return self.m['rem_m'].create_reminder(self.appointment_id, self.patient_id, self.next_day(), '09:00')
+
+    def new_recall(self):
+        """A pending recall from the 'benchmark' source: {'Recall_ID', 'Source_ID'}."""
+        recall_id = self.db.execute("""INSERT INTO patient_recalls (Patient_ID, Source, Source_ID, Due_Date, Reason)
+                                       SELECT %s, 'benchmark', COALESCE(MAX(Source_ID), 0) + 1, CURDATE(), 'Benchmark'
+                                       FROM patient_recalls WHERE Source = 'benchmark'""", (self.patient_id,))
+        return self.db.fetch("SELECT Recall_ID, Source_ID FROM patient_recalls WHERE Recall_ID = %s", (recall_id,))[0]
+
+
+def staged(prepare, func):
+    """
+    Case for a method that changes or removes one row: ``prepare`` makes a fresh
+    row outside the timing and ``func`` gets its id.
+    """
+    made = []
+    return (lambda: made.append(prepare())), (lambda: func(made.pop()))
+
+
+def manager_methods():
+    """'Class.method' for every public method defined in backend/managers.py."""
+    names = set()
+    for cls in vars(managers).values():
+        if inspect.isclass(cls) and cls.__module__ == managers.__name__:
+            names.update(f"{cls.__name__}.{name}" for name, attr in vars(cls).items()
+                         if not name.startswith('_') and inspect.isfunction(attr))
+    return names
+
+
+def uncovered_methods(case_names):
+    covered = {name.split('(')[0] for name in case_names}
+    return sorted(manager_methods() - covered - NOT_BENCHMARKED)
+
+
+def read_cases(ctx):
+    m = ctx.m
+    start, end = ctx.report_start, ctx.report_end
+    week = ctx.today - timedelta(days=ctx.today.weekday())
+    return {
+        'PatientManager.list_patients': lambda: m['pm'].list_patients(),
+        'PatientManager.list_patients(limit)': lambda: m['pm'].list_patients(limit=200),
+        'PatientManager.search_patients': lambda: m['pm'].search_patients(ctx.surname[:3]),
+        'PatientManager.get_patient': lambda: m['pm'].get_patient(ctx.patient_id),
+        'PatientManager.count_patients_today': lambda: m['pm'].count_patients_today(),
+        'DoctorManager.list_doctors': lambda: m['dm'].list_doctors(),
+        'DoctorManager.count_doctors': lambda: m['dm'].count_doctors(),
+        'AppointmentManager.list_appointments': lambda: m['am'].list_appointments(),
+        'AppointmentManager.list_appointments_between': lambda: m['am'].list_appointments_between(
+            week, week + timedelta(days=6)),
+        'AppointmentManager.changed_days_since': lambda: m['am'].changed_days_since(
+            datetime.now() - timedelta(hours=1)),
+        'AppointmentManager.count_by_day': lambda: m['am'].count_by_day(ctx.today, ctx.today + timedelta(days=41)),
+        'AppointmentManager.booked_slots': lambda: m['am'].booked_slots(ctx.today, ctx.today + timedelta(days=14)),
+        'AppointmentManager.booked_slots(doctor)': lambda: m['am'].booked_slots(
+            ctx.today, ctx.today + timedelta(days=14), ctx.doctor_id),
+        'AppointmentManager.count_appointments': lambda: m['am'].count_appointments(),
+        'AvailabilityManager.get_availability': lambda: m['avail_m'].get_availability(ctx.doctor_id),
+        'AvailabilityManager.working_hours': lambda: m['avail_m'].working_hours(ctx.doctor_ids),
+        'InventoryManager.list_items': lambda: m['im'].list_items(),
+        'InventoryManager.view_all_products': lambda: m['im'].view_all_products(),
+        'InventoryManager.count_items': lambda: m['im'].count_items(),
+        'InventoryManager.list_low_stock': lambda: m['im'].list_low_stock(),
+        'InventoryManager.reorder_list': lambda: m['im'].reorder_list(),
+        'BillingManager.list_bills': lambda: m['bm'].list_bills(),
+        'BillingManager.list_patient_bills': lambda: m['bm'].list_patient_bills(ctx.patient_id),
+        'UserManager.find_user': lambda: ctx.users.find_user(ctx.username),
+        'UserManager.verify_user': lambda: ctx.users.verify_user(ctx.username, 'not-the-password'),
+        'ProcedureManager.get_all_procedures': lambda: m['proc_m'].get_all_procedures(),
+        'SalesManager.get_all_products': lambda: m['sm'].get_all_products(),
+        'SalesManager.list_products': lambda: m['sm'].list_products(),
+        'SalesManager.get_products_by_category': lambda: m['sm'].get_products_by_category(ctx.product['category']),
+        'SalesManager.list_low_stock': lambda: m['sm'].list_low_stock(),
+        'SalesManager.count_low_stock': lambda: m['sm'].count_low_stock(),
+        'SalesManager.stock_on_hand': lambda: m['sm'].stock_on_hand(ctx.product['id']),
+        'SalesManager.stock_history': lambda: m['sm'].stock_history(ctx.product['id']),
+        'SalesManager.audit_stock': lambda: m['sm'].audit_stock(),
+        'SalesManager.get_all_sales': lambda: m['sm'].get_all_sales(),
+        'SalesManager.get_sales_by_customer': lambda: m['sm'].get_sales_by_customer(ctx.customer),
+        'SalesManager.count_sales': lambda: m['sm'].count_sales(),
+        'SalesManager.get_sale_details': lambda: m['sm'].get_sale_details(ctx.sale_id),
+        'SalesManager.get_sales_report': lambda: m['sm'].get_sales_report(),
+        'PrescriptionManager.get_patient_prescriptions': lambda: m['pres_m'].get_patient_prescriptions(ctx.patient_id),
+        'PrescriptionManager.get_latest_prescription': lambda: m['pres_m'].get_latest_prescription(ctx.patient_id),
+        'PrescriptionManager.get_all_prescriptions': lambda: m['pres_m'].get_all_prescriptions(),
+        'PrescriptionManager.check_expiring_prescriptions': lambda: m['pres_m'].check_expiring_prescriptions(),
+        'MedicalRecordsManager.get_patient_records': lambda: m['mr_m'].get_patient_records(ctx.patient_id),
+        'MedicalRecordsManager.get_all_records': lambda: m['mr_m'].get_all_records(),
+        'MedicalRecordsManager.check_due_followups': lambda: m['mr_m'].check_due_followups(),
+        'ReminderManager.get_pending_reminders': lambda: m['rem_m'].get_pending_reminders(),
+        'ReminderManager.count_pending_reminders': lambda: m['rem_m'].count_pending_reminders(),
+        'ReminderManager.get_appointment_reminders': lambda: m['rem_m'].get_appointment_reminders(ctx.appointment_id),
+        'RecallManager.get_watermark': lambda: m['recall_m'].get_watermark('followup'),
+        'RecallManager.get_patient_recalls': lambda: m['recall_m'].get_patient_recalls(ctx.patient_id),
+        'RecallManager.list_due': lambda: m['recall_m'].list_due(),
+        'RecallManager.list_due(within)': lambda: m['recall_m'].list_due(within_days=30),
+        'RecallManager.count_pending': lambda: m['recall_m'].count_pending(),
+        'InvoiceManager.get_all_invoices': lambda: m['inv_m'].get_all_invoices(),
+        'InvoiceManager.get_invoice_details': lambda: m['inv_m'].get_invoice_details(ctx.invoice_id),
+        'InvoiceManager.get_invoice_items': lambda: m['inv_m'].get_invoice_items(ctx.sale_id),
+        'InvoiceManager.get_invoices_by_patient': lambda: m['inv_m'].get_invoices_by_patient(ctx.patient_id),
+        'ReportManager.first_day': lambda: m['rep_m'].first_day(),
+        'ReportManager.revenue(open)': lambda: m['rep_m'].revenue(None, None),
+        'ReportManager.revenue': lambda: m['rep_m'].revenue(start, end),
+        'ReportManager.revenue(month)': lambda: m['rep_m'].revenue(start, end, 'month'),
+        'ReportManager.sales_by_category': lambda: m['rep_m'].sales_by_category(start, end),
+        'ReportManager.sales_by_product': lambda: m['rep_m'].sales_by_product(start, end),
+        'ReportManager.billing_by_method': lambda: m['rep_m'].billing_by_method(start, end),
+        'ReportManager.invoices_by_status': lambda: m['rep_m'].invoices_by_status(start, end),
+        'ReportManager.demographics': lambda: m['rep_m'].demographics(['age_group', 'gender']),
+        'ReportManager.demographics(range)': lambda: m['rep_m'].demographics('city', start, end),
+        'ReportManager.period_summary': lambda: m['rep_m'].period_summary(start, end),
+        'ReportManager.revenue_trend': lambda: m['rep_m'].revenue_trend(start, end),
+        'ReportManager.sell_through_by_product': lambda: m['rep_m'].sell_through_by_product(start, end),
+    }
+
+
+def write_cases(ctx):
+    m = ctx.m
+
+    def schedule():
+        day, slot = ctx.next_slot()
+        return m['am'].schedule(ctx.patient_id, ctx.doctor_id, day, slot)
+
+    def create_sale():
+        item = {'product_id': ctx.product['id'], 'quantity': 1, 'price': float(ctx.product['price'])}
+        return m['sm'].create_sale('Benchmark Customer', [item, dict(item)])
+
+    def mark_sent_many(reminder_id):
+        return m['rem_m'].mark_sent_many([reminder_id])
+
+    def mark_failed_many(reminder_id):
+        return m['rem_m'].mark_failed_many([reminder_id])
+
+    return {
+        'PatientManager.add_patient': ctx.new_patient,
+        'PatientManager.archive_patient': staged(ctx.new_patient, m['pm'].archive_patient),
+        'PatientManager.delete_patient': staged(ctx.new_patient, m['pm'].delete_patient),
+        'PatientManager.archive_inactive': lambda: m['pm'].archive_inactive(ARCHIVE_CUTOFF),
+        'DoctorManager.add_doctor': ctx.new_doctor,
+        'DoctorManager.archive_doctor': staged(ctx.new_doctor, m['dm'].archive_doctor),
+        'DoctorManager.delete_doctor': staged(ctx.new_doctor, m['dm'].delete_doctor),
+        'AppointmentManager.schedule': schedule,
+        'AppointmentManager.mark_as_done': staged(ctx.new_appointment, m['am'].mark_as_done),
+        'AppointmentManager.archive_finished_before': lambda: m['am'].archive_finished_before(ARCHIVE_CUTOFF),
+        'AvailabilityManager.set_availability': lambda: m['avail_m'].set_availability(ctx.doctor_id, 6, '09:00', '12:00'),
+        'AvailabilityManager.clear_day': lambda: m['avail_m'].clear_day(ctx.doctor_id, 6),
+        'InventoryManager.add_item': lambda: m['im'].add_item('Bench Frame', 'Frames', 10, 1000, 'Bench Supplier'),
+        'InventoryManager.set_reorder_point': lambda: m['im'].set_reorder_point(ctx.product['id'],
+                                                                                ctx.product['Reorder_Point']),
+        'InventoryManager.refresh_forecast': lambda: m['im'].refresh_forecast(),
+        'InventoryManager.refresh_forecast(items)': lambda: m['im'].refresh_forecast([ctx.product['id']]),
+        'InventoryManager.sync_forecast': lambda: m['im'].sync_forecast(),
+        'BillingManager.create_bill': lambda: m['bm'].create_bill(ctx.patient_id, 500, 'Cash'),
+        'BillingManager.add_billing': lambda: m['bm'].add_billing(ctx.patient_id, 500, 'Eye Exam', 'Cash', 'Paid'),
+        'BillingManager.mark_paid': staged(lambda: m['bm'].create_bill(ctx.patient_id, 500, 'Cash'), m['bm'].mark_paid),
+        'UserManager.create_user': lambda: ctx.users.create_user(ctx.unique('bench'), 'benchmark-pass'),
+        'ProcedureManager.add_procedure': lambda: m['proc_m'].add_procedure('Bench Procedure', 'Benchmark', 100),
+        'ProcedureManager.update_procedure': staged(
+            lambda: m['proc_m'].add_procedure('Bench Procedure', 'Benchmark', 100),
+            lambda proc_id: m['proc_m'].update_procedure(proc_id, 'Bench Procedure', 'Edited', 120)),
+        'ProcedureManager.delete_procedure': staged(
+            lambda: m['proc_m'].add_procedure('Bench Procedure', 'Benchmark', 100), m['proc_m'].delete_procedure),
+        'SalesManager.add_product': ctx.new_product,
+        'SalesManager.update_product': staged(ctx.new_product, lambda product_id: m['sm'].update_product(
+            product_id, ctx.unique('Bench Frame'), 'Frames', 'Edited', 1100, 9)),
+        'SalesManager.delete_product': staged(ctx.new_product, m['sm'].delete_product),
+        'SalesManager.create_sale': create_sale,
+        'SalesManager.sync_catalog': lambda: m['sm'].sync_catalog(),
+        'SalesManager.restock': lambda: m['sm'].restock(ctx.product['id'], 1, 'Benchmark'),
+        'SalesManager.return_items': staged(ctx.new_sale, lambda sale_id: m['sm'].return_items(
+            sale_id, ctx.product['id'], 1)),
+        'SalesManager.adjust_stock': staged(ctx.new_product, lambda product_id: m['sm'].adjust_stock(product_id, 9)),
+        'SalesManager.set_reorder_point': lambda: m['sm'].set_reorder_point(ctx.product['id'],
+                                                                            ctx.product['Reorder_Point']),
+        'SalesManager.rebuild_low_stock_alerts': lambda: m['sm'].rebuild_low_stock_alerts(),
+        'SalesManager.record_opening_balances': lambda: m['sm'].record_opening_balances(),
+        'PrescriptionManager.create_prescription': ctx.new_prescription,
+        'PrescriptionManager.update_prescription': staged(ctx.new_prescription, lambda prescription_id: m['pres_m'].update_prescription(
+            prescription_id, '-1.25', '-0.50', '90', None, '-1.25', '-0.75', '85', None, 'Edited')),
+        'PrescriptionManager.delete_prescription': staged(ctx.new_prescription, m['pres_m'].delete_prescription),
+        'MedicalRecordsManager.add_record': ctx.new_record,
+        'MedicalRecordsManager.update_record': staged(ctx.new_record, lambda record_id: m['mr_m'].update_record(
+            record_id, 'Myopia', 'Moderate', 'Edited', 'None')),
+        'MedicalRecordsManager.delete_record': staged(ctx.new_record, m['mr_m'].delete_record),
+        'ReminderManager.create_reminder': ctx.new_reminder,
+        'ReminderManager.mark_sent': staged(ctx.new_reminder, m['rem_m'].mark_sent),
+        'ReminderManager.mark_sent_many': staged(ctx.new_reminder, mark_sent_many),
+        'ReminderManager.mark_failed_many': staged(ctx.new_reminder, mark_failed_many),
+        'ReminderManager.delete_reminder': staged(ctx.new_reminder, m['rem_m'].delete_reminder),
+        'ReminderManager.generate_for_upcoming': lambda: m['rem_m'].generate_for_upcoming(),
+        'ReminderManager.claim_due': lambda: m['rem_m'].claim_due(ctx.unique('bench')),
+        'ReminderManager.skip_orphaned': lambda: m['rem_m'].skip_orphaned(),
+        'ReminderManager.release_stale_claims': lambda: m['rem_m'].release_stale_claims(),
+        'RecallManager.set_watermark': lambda: m['recall_m'].set_watermark('benchmark', ctx.today, 0),
+        'RecallManager.scan_expiring_prescriptions': lambda: m['recall_m'].scan_expiring_prescriptions(),
+        'RecallManager.sync_followups': lambda: m['recall_m'].sync_followups(),
+        'RecallManager.close': staged(ctx.new_recall, lambda recall: m['recall_m'].close(recall['Recall_ID'])),
+        'RecallManager.delete_for_source': staged(ctx.new_recall, lambda recall: m['recall_m'].delete_for_source(
+            'benchmark', recall['Source_ID'])),
+        'InvoiceManager.create_invoice': lambda: m['inv_m'].create_invoice(ctx.sale_id, ctx.patient_id, 'benchmark'),
+        'InvoiceManager.mark_invoice_paid': staged(
+            lambda: m['inv_m'].create_invoice(ctx.sale_id, ctx.patient_id, 'benchmark'), m['inv_m'].mark_invoice_paid),
+        'ReportManager.refresh': lambda: m['rep_m'].refresh(),
+    }
+
+
+def run_scale(scale, repeat, include_writes=True, database=None):
+    """
+    Returns ({case: Measurement, or the error text if it raised}, cases left out
+    by ``include_writes``, public methods with no case).
+    """
+    cfg = prepare_database(scale, database)
+    db = InstrumentedDatabase(config=cfg)
+    try:
+        ctx = BenchContext(db)
+        cases = read_cases(ctx)
+        writes = write_cases(ctx)
+        uncovered = uncovered_methods(list(cases) + list(writes))
+        skipped = set()
+        if include_writes:
+            cases.update(writes)
+        else:
+            skipped = set(writes)
+        results = {}
+        for name, case in cases.items():
+            prepare, func = case if isinstance(case, tuple) else (None, case)
+
+            def before(prepare=prepare):
+                ctx.clear_caches()
+                if prepare:
+                    prepare()
+            try:
+                results[name] = measure(name, db, func, repeat=repeat, before=before)
+            except Exception as e:
+                logger.error(f"Benchmark '{name}' failed at scale {scale}: {str(e)}")
+                results[name] = f"{type(e).__name__}: {e}"
+        return results, skipped, uncovered
+    finally:
+        db.close()
+
+
+def load_baselines(path=BASELINES_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(baselines, path=BASELINES_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+
+
+def compare(result, baseline, threshold):
+    """Returns the list of metrics in ``result`` that regressed against ``baseline``."""
+    problems = []
+    if result['queries'] > baseline['queries']:
+        problems.append(f"queries {baseline['queries']} -> {result['queries']}")
+    if result['commits'] > baseline.get('commits', result['commits']):
+        problems.append(f"commits {baseline['commits']} -> {result['commits']}")
+    if result['rows'] > baseline['rows'] * (1 + threshold):
+        problems.append(f"rows {baseline['rows']} -> {result['rows']}")
+    budget = max(baseline['wall_ms'] * (1 + threshold), MIN_WALL_MS)
+    if result['wall_ms'] > budget:
+        problems.append(f"wall {baseline['wall_ms']:.2f}ms -> {result['wall_ms']:.2f}ms")
+    if result['peak_kb'] > max(baseline['peak_kb'] * (1 + threshold), 64):
+        problems.append(f"peak {baseline['peak_kb']:.0f}KB -> {result['peak_kb']:.0f}KB")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the manager layer against seeded data.')
+    parser.add_argument('--scales', nargs='+', choices=sorted(SCALES), default=['1k'])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed relative slowdown before a method counts as regressed')
+    parser.add_argument('--reads-only', action='store_true', help='skip the methods that write rows')
+    parser.add_argument('--baselines', default=BASELINES_FILE)
+    parser.add_argument('--update-baselines', action='store_true')
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines(args.baselines)
+    regressions, missing, failed, uncovered = [], [], [], set()
+    for scale in args.scales:
+        results, skipped, no_case = run_scale(scale, args.repeat, include_writes=not args.reads_only)
+        uncovered.update(no_case)
+        # Every baselined case is expected, so one that vanished or raised cannot pass quietly
+        prefix = f"{scale}/"
+        expected = list(results) + sorted(key[len(prefix):] for key in baselines
+                                          if key.startswith(prefix) and key[len(prefix):] not in results
+                                          and key[len(prefix):] not in skipped)
+        print(f"\n== scale {scale} ==")
+        print(f"{'method':<52}{'median ms':>11}{'p95 ms':>9}{'queries':>9}{'rows':>10}{'commits':>9}{'peak KB':>10}")
+        for name in expected:
+            key = prefix + name
+            m = results.get(name)
+            if not hasattr(m, 'as_dict'):
+                print(f"{name:<52}  FAILED: {m or 'no case ran'}")
+                failed.append(key)
+                continue
+            current = m.as_dict()
+            problems = compare(current, baselines[key], args.threshold) if key in baselines else []
+            flag = '  REGRESSED: ' + '; '.join(problems) if problems else ''
+            if key not in baselines:
+                flag = '  NO BASELINE'
+                missing.append(key)
+            print(f"{name:<52}{m.median_ms:>11.2f}{m.p95_ms:>9.2f}{m.queries:>9}{m.rows:>10}{m.commits:>9}{m.peak_kb:>10.0f}{flag}")
+            if problems:
+                regressions.append(key)
+            if args.update_baselines:
+                baselines[key] = current
+
+    if uncovered:
+        print(f"\n{len(uncovered)} public method(s) have no benchmark case:")
+        for name in sorted(uncovered):
+            print(f"  {name}")
+    if failed:
+        print(f"\n{len(failed)} method(s) failed or no longer have a case")
+    if args.update_baselines:
+        save_baselines(baselines, args.baselines)
+        print(f"\nBaselines written to {args.baselines}")
+        return 1 if failed or uncovered else 0
+    if regressions:
+        print(f"\n{len(regressions)} method(s) regressed beyond {args.threshold:.0%}")
+    if missing:
+        print(f"\n{len(missing)} method(s) have no baseline in {args.baselines}; record them with --update-baselines")
+    return 1 if regressions or missing or failed or uncovered else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
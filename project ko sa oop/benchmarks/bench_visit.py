@@ -0,0 +1,188 @@
+"""
+End-to-end patient visit benchmark.
+
+Replays what one terminal does for a walk-in through the workflow screen, without
+the GUI: register the patient, complete the examination (medical record,
+prescription and exam fee), add an extra charge, sell glasses and check out with
+an invoice. The refresh reads the workflow screen issues after each step are
+replayed too, since they are part of the real cost of a visit. Before timing,
+it checks that an item just added to inventory can be sold.
+
+Reports queries, commits, rows and latency per visit and per step, and
+extrapolates the visits/hour one terminal can push through the database.
+
+    python -m benchmarks.bench_visit --scale 100k --visits 200
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import defaultdict
+from benchmarks.harness import InstrumentedDatabase, prepare_database
+from database.data_generator import SCALES
+from utils.input_validator import InputValidator
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+EXAM_FEE = 500
+EXTRA_CHARGES = [('Contact Lens Fitting', 800), ('Tonometry', 300), ('Retinal Imaging', 1200)]
+
+
+class VisitScript:
+    """One scripted visit, step by step, through the same manager calls WorkflowFrame makes."""
+
+    STEPS = ('register', 'examination', 'charges', 'sale', 'checkout')
+
+    def __init__(self, db, managers, rng, refresh_reads=True):
+        self.db = db
+        self.m = managers
+        self.rng = rng
+        self.refresh_reads = refresh_reads
+        self.doctors = managers['dm'].list_doctors()
+        # The workflow lists products from inventory and sells them under their Inventory_ID
+        self.products = [p for p in managers['im'].list_items() if p['Quantity_On_Hand'] and p['Quantity_On_Hand'] > 10]
+        db.commit()
+        if not self.doctors or not self.products:
+            raise RuntimeError('Benchmark database has no doctors or stocked products')
+
+    def register(self, visit):
+        age = self.rng.randint(5, 80)
+        patient_id = self.m['pm'].add_patient(
+            'Visit', f'Bench{visit}', 'V', age, 'Female', InputValidator.get_age_group(age),
+            'Benchmark St.', '09171234567', f'visit{visit}@example.com', '')
+        if self.refresh_reads:
+            # register_patient picks the newest patient, then load_patients refills the pickers
+            self.m['pm'].list_patients()
+            self.m['pm'].list_patients()
+        return {'Patient_ID': patient_id, 'Surname': 'Visit', 'FirstName': f'Bench{visit}'}
+
+    def examination(self, patient):
+        doctor = self.rng.choice(self.doctors)
+        self.m['mr_m'].add_record(
+            patient_id=patient['Patient_ID'], doctor_id=doctor['Doctor_ID'], appointment_id=None,
+            diagnosis='Myopia', severity='Normal', clinical_notes='Scripted visit', recommendations='Follow prescription',
+            followup_days=90)
+        self.m['pres_m'].create_prescription(
+            patient_id=patient['Patient_ID'], doctor_id=doctor['Doctor_ID'], appointment_id=None,
+            od_sph='-1.50', od_cyl='-0.50', od_axis='0', od_add='0.00',
+            os_sph='-1.25', os_cyl='0.00', os_axis='0', os_add='0.00', notes='')
+        self.m['bm'].add_billing(patient_id=patient['Patient_ID'], amount=EXAM_FEE, service='Eye Examination',
+                                 method='Direct', status='Pending')
+
+    def charges(self, patient):
+        service, amount = self.rng.choice(EXTRA_CHARGES)
+        self.m['bm'].add_billing(patient_id=patient['Patient_ID'], amount=amount, service=service,
+                                 method='Direct', status='Pending')
+        if self.refresh_reads:
+            self.m['bm'].list_bills()
+
+    def sale(self, patient):
+        product = self.rng.choice(self.products)
+        item = {'product_id': product['Inventory_ID'], 'quantity': 1, 'price': float(product['Unit_Price'] or 0)}
+        name = f"{patient['Surname']}, {patient['FirstName']}"
+        sale_id = self.m['sm'].create_sale(name, [item])
+        self.m['bm'].add_billing(patient_id=patient['Patient_ID'], amount=item['price'],
+                                 service=f"{product['Item_Name']} (Sales)", method='Sales', status='Pending')
+        if self.refresh_reads:
+            self.m['bm'].list_bills()
+            self.m['sm'].get_all_sales()
+        return sale_id
+
+    def checkout(self, patient, sale_id):
+        invoice_id = self.m['inv_m'].create_invoice(sale_id, patient['Patient_ID'], 'benchmark')
+        if self.refresh_reads:
+            self.m['inv_m'].get_invoice_details(invoice_id)
+            self.m['inv_m'].get_invoice_items(sale_id)
+
+    def run(self, visit):
+        """Runs one visit and returns {step: (ms, queries, commits, rows)}."""
+        steps = {}
+        state = {}
+
+        def timed(step, func):
+            self.db.reset_stats()
+            started = time.perf_counter()
+            result = func()
+            stats = self.db.snapshot()
+            steps[step] = ((time.perf_counter() - started) * 1000, stats['queries'], stats['commits'], stats['rows'])
+            return result
+
+        state['patient'] = timed('register', lambda: self.register(visit))
+        timed('examination', lambda: self.examination(state['patient']))
+        timed('charges', lambda: self.charges(state['patient']))
+        state['sale_id'] = timed('sale', lambda: self.sale(state['patient']))
+        timed('checkout', lambda: self.checkout(state['patient'], state['sale_id']))
+        return steps
+
+
+def check_new_item_sellable(managers):
+    """Regression check: an item added on the Inventory screen can be sold from the sales screens."""
+    item_id = managers['im'].add_item('Visit Check Frame', 'Frames', 2, 1500, 'Bench Supplier')
+    item = next((i for i in managers['im'].list_items() if i['Inventory_ID'] == item_id), None)
+    if item is None:
+        raise RuntimeError(f"Inventory item #{item_id} is missing from the product list")
+    managers['sm'].create_sale('Visit Check', [{'product_id': item['Inventory_ID'], 'quantity': 1,
+                                                'price': float(item['Unit_Price'])}])
+    left = managers['sm'].stock_on_hand(item_id)
+    if left != 1:
+        raise RuntimeError(f"Selling inventory item #{item_id} left {left} on hand instead of 1")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark a full patient visit through the managers.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--visits', type=int, default=100)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--no-refresh-reads', action='store_true',
+                        help='only the writes, without the reads the screen issues to refresh itself')
+    args = parser.parse_args(argv)
+
+    from main import build_managers  # pulls in the GUI toolkit
+
+    cfg = prepare_database(args.scale)
+    db = InstrumentedDatabase(config=cfg)
+    try:
+        managers = build_managers(db)
+        check_new_item_sellable(managers)
+        script = VisitScript(db, managers, random.Random(args.seed), refresh_reads=not args.no_refresh_reads)
+        for i in range(args.warmup):
+            script.run(f"w{i}")
+
+        per_step = defaultdict(list)
+        totals = []
+        for i in range(args.visits):
+            steps = script.run(i)
+            for step, values in steps.items():
+                per_step[step].append(values)
+            totals.append(tuple(sum(v[k] for v in steps.values()) for k in range(4)))
+    finally:
+        db.close()
+
+    print(f"\n== patient visit, scale {args.scale}, {args.visits} visits ==")
+    print(f"{'step':<14}{'mean ms':>10}{'p95 ms':>10}{'queries':>9}{'commits':>9}{'rows':>10}")
+    for step in VisitScript.STEPS:
+        values = per_step[step]
+        ms = [v[0] for v in values]
+        print(f"{step:<14}{statistics.mean(ms):>10.2f}{percentile(ms, 0.95):>10.2f}"
+              f"{statistics.mean(v[1] for v in values):>9.1f}{statistics.mean(v[2] for v in values):>9.1f}"
+              f"{statistics.mean(v[3] for v in values):>10.0f}")
+
+    ms = [t[0] for t in totals]
+    mean_ms = statistics.mean(ms)
+    print(f"{'visit':<14}{mean_ms:>10.2f}{percentile(ms, 0.95):>10.2f}"
+          f"{statistics.mean(t[1] for t in totals):>9.1f}{statistics.mean(t[2] for t in totals):>9.1f}"
+          f"{statistics.mean(t[3] for t in totals):>10.0f}")
+    print(f"\nDatabase-bound capacity: {3600 * 1000 / mean_ms:,.0f} visits/hour per terminal "
+          f"(p95 visit {percentile(ms, 0.95):.1f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    main()
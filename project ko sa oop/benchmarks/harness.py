@@ -0,0 +1,191 @@
+"""
+Shared plumbing for the benchmarks: an instrumented connection, seeded
+benchmark databases and a small measurement helper.
+"""
+import statistics
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+import mysql.connector
+from database.db_config import DB_CONFIG
+from database.db_connection import Database
+from database.data_generator import SCALES, ClinicDataGenerator
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+BENCH_DATABASE_PREFIX = 'optical_clinic_bench'
+BENCH_SEED = 1234
+
+
+class InstrumentedDatabase(Database):
+    """Database that counts queries, rows transferred and commits, and the time spent waiting on MySQL."""
+
+    def __init__(self, raise_on_error=True, config=None):
+        super().__init__(raise_on_error=raise_on_error, config=config)
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.queries = 0
+        self.rows = 0
+        self.commits = 0
+        self.db_time = 0.0
+
+    def snapshot(self):
+        return {'queries': self.queries, 'rows': self.rows, 'commits': self.commits, 'db_ms': self.db_time * 1000}
+
+    def _record(self, started, rows, commits=None):
+        # Writes commit on their own unless they run inside transaction(), which commits once at the end
+        if commits is None:
+            commits = 0 if self._in_transaction else 1
+        with self._stats_lock:
+            self.queries += 1
+            self.rows += rows
+            self.commits += commits
+            self.db_time += time.perf_counter() - started
+
+    def execute(self, query, params=None):
+        started = time.perf_counter()
+        try:
+            return super().execute(query, params)
+        finally:
+            self._record(started, 1)
+
+    def execute_rowcount(self, query, params=None):
+        started = time.perf_counter()
+        affected = 0
+        try:
+            affected = super().execute_rowcount(query, params)
+            return affected
+        finally:
+            self._record(started, max(affected, 0))
+
+    def execute_many(self, query, rows):
+        started = time.perf_counter()
+        try:
+            return super().execute_many(query, rows)
+        finally:
+            self._record(started, len(rows))
+
+    def fetch(self, query, params=None):
+        started = time.perf_counter()
+        result = []
+        try:
+            result = super().fetch(query, params)
+            return result
+        finally:
+            self._record(started, len(result), commits=0)
+
+    @contextmanager
+    def transaction(self):
+        outermost = not self._in_transaction
+        with super().transaction() as db:
+            yield db
+            started = time.perf_counter()
+        # Only reached when the block committed; nested blocks join the outer commit
+        if outermost:
+            with self._stats_lock:
+                self.commits += 1
+                self.db_time += time.perf_counter() - started
+
+    def commit(self):
+        counted = not self._in_transaction
+        super().commit()
+        if counted:
+            with self._stats_lock:
+                self.commits += 1
+
+
+def bench_config(scale, database=None):
+    cfg = dict(DB_CONFIG)
+    cfg['database'] = database or f"{BENCH_DATABASE_PREFIX}_{scale}"
+    return cfg
+
+
+def prepare_database(scale, database=None, seed=BENCH_SEED):
+    """Creates and seeds the benchmark database for ``scale`` unless it already holds that many patients."""
+    from main import ensure_sample_data  # pulls in the GUI toolkit
+    from backend.change_feed import drop_change_triggers, install_change_triggers, bump_versions
+
+    cfg = bench_config(scale, database)
+    server = dict(cfg)
+    name = server.pop('database')
+    conn = mysql.connector.connect(**server)
+    try:
+        cur = conn.cursor()
+        cur.execute(f"CREATE DATABASE IF NOT EXISTS `{name}`")
+        cur.close()
+    finally:
+        conn.close()
+
+    db = Database(raise_on_error=True, config=cfg)
+    try:
+        ensure_sample_data(db)
+        patients = db.fetch("SELECT COUNT(*) AS count FROM patients")[0]['count']
+        target = SCALES[scale]
+        if patients < target:
+            logger.info(f"Seeding {name} with {target - patients} patients")
+            drop_change_triggers(db)
+            try:
+                ClinicDataGenerator(db, patients=target - patients, seed=seed).generate()
+            finally:
+                install_change_triggers(db)
+                bump_versions(db)
+    finally:
+        db.close()
+    return cfg
+
+
+class Measurement:
+    def __init__(self, name):
+        self.name = name
+        self.wall_ms = []
+        self.queries = 0
+        self.rows = 0
+        self.commits = 0
+        self.peak_kb = 0.0
+
+    @property
+    def median_ms(self):
+        return statistics.median(self.wall_ms) if self.wall_ms else 0.0
+
+    @property
+    def p95_ms(self):
+        if not self.wall_ms:
+            return 0.0
+        ordered = sorted(self.wall_ms)
+        return ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+
+    def as_dict(self):
+        return {'wall_ms': round(self.median_ms, 3), 'queries': self.queries, 'rows': self.rows,
+                'commits': self.commits, 'peak_kb': round(self.peak_kb, 1)}
+
+
+def measure(name, db: InstrumentedDatabase, func, repeat=5, before=None):
+    """
+    Runs ``func`` ``repeat`` times for timing, then once more under tracemalloc
+    for peak memory. ``before`` runs ahead of every call, outside the timing.
+    Query, row and commit counts come from the last timed run.
+    """
+    m = Measurement(name)
+    for _ in range(repeat):
+        if before:
+            before()
+        db.reset_stats()
+        started = time.perf_counter()
+        func()
+        m.wall_ms.append((time.perf_counter() - started) * 1000)
+        stats = db.snapshot()
+        m.queries, m.rows, m.commits = stats['queries'], stats['rows'], stats['commits']
+
+    if before:
+        before()
+    tracemalloc.start()
+    try:
+        func()
+        m.peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+    return m
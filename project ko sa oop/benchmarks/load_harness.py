@@ -0,0 +1,231 @@
+"""
+Multi-terminal load harness.
+
+Simulates N terminals hitting the same database at once, each on its own
+connection and thread: receptionists booking through AppointmentManager.schedule,
+cashiers running SalesManager.create_sale and doctors writing medical records.
+Bookings contend for a small pool of slots and sales for a few hot products with
+limited stock, so races show up quickly.
+
+Reports throughput and tail latency per action, deadlocks (1213), lock wait
+timeouts (1205), InnoDB row lock waits, and correctness violations found
+afterwards: double-booked slots, negative stock and stock that no longer matches
+the movement ledger. ``--without-change-feed`` drops the version triggers for
+the run, so the row lock cost of the change feed shows up as the difference.
+
+    python -m benchmarks.load_harness --scale 100k --clients 8 --duration 60 --mix book=5,sell=3,record=2
+    python -m benchmarks.load_harness --scale 100k --clients 8 --duration 60 --without-change-feed
+"""
+import argparse
+import random
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from benchmarks.harness import InstrumentedDatabase, prepare_database
+from backend.change_feed import drop_change_triggers, install_change_triggers
+from backend.managers import SalesManager
+from database.data_generator import SCALES
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+ER_LOCK_DEADLOCK = 1213
+ER_LOCK_WAIT_TIMEOUT = 1205
+# Bookings made by the harness live in this far-future window and are cleared before each run
+LOAD_START_DATE = date(2098, 1, 1)
+HOT_PRODUCT_STOCK = 50
+DEFAULT_MIX = 'book=5,sell=3,record=2'
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        action, _, weight = part.partition('=')
+        action = action.strip()
+        if action not in LoadClient.ACTIONS:
+            raise ValueError(f"Unknown action '{action}' (expected one of {', '.join(LoadClient.ACTIONS)})")
+        mix[action] = float(weight or 1)
+    return mix
+
+
+class SharedState:
+    """Fixture data every client draws from, set up once before the run."""
+
+    def __init__(self, db, slots, hot_products, rng):
+        self.patients = [r['Patient_ID'] for r in db.fetch("SELECT Patient_ID FROM patients ORDER BY RAND(%s) LIMIT 500", (rng.randrange(1 << 30),))]
+        doctors = [r['Doctor_ID'] for r in db.fetch("SELECT Doctor_ID FROM doctors")]
+        products = db.fetch("SELECT id, price FROM sales_products ORDER BY id LIMIT %s", (hot_products,))
+        if not self.patients or not doctors or not products:
+            raise RuntimeError('Benchmark database is missing patients, doctors or products')
+
+        self.slots = []
+        for n in range(slots):
+            doctor = doctors[n % len(doctors)]
+            position = n // len(doctors)
+            minutes = 8 * 60 + (position % 40) * 15
+            self.slots.append((doctor, (LOAD_START_DATE + timedelta(days=position // 40)).isoformat(),
+                               f"{minutes // 60:02d}:{minutes % 60:02d}:00"))
+
+        self.products = [{'product_id': p['id'], 'price': float(p['price'])} for p in products]
+        db.execute("DELETE FROM appointments WHERE Appointment_Date >= %s", (LOAD_START_DATE,))
+        sales = SalesManager(db)
+        for p in self.products:
+            sales.adjust_stock(p['product_id'], HOT_PRODUCT_STOCK, 'Load test reset')
+
+
+class LoadClient(threading.Thread):
+    """One simulated terminal with its own connection."""
+
+    ACTIONS = ('book', 'sell', 'record')
+
+    def __init__(self, index, config, state, mix, stop_at, seed):
+        super().__init__(name=f'load-client-{index}', daemon=True)
+        self.config = config
+        self.state = state
+        self.actions = list(mix)
+        self.weights = [mix[a] for a in self.actions]
+        self.stop_at = stop_at
+        self.rng = random.Random(seed)
+        self.latencies = defaultdict(list)
+        self.outcomes = defaultdict(int)
+
+    def run(self):
+        from main import build_managers  # pulls in the GUI toolkit
+        db = InstrumentedDatabase(config=self.config)
+        try:
+            managers = build_managers(db)
+            while time.perf_counter() < self.stop_at:
+                action = self.rng.choices(self.actions, weights=self.weights)[0]
+                started = time.perf_counter()
+                outcome = self.attempt(action, managers)
+                self.latencies[action].append((time.perf_counter() - started) * 1000)
+                self.outcomes[(action, outcome)] += 1
+        finally:
+            db.close()
+
+    def attempt(self, action, managers):
+        try:
+            if action == 'book':
+                doctor, day, slot = self.rng.choice(self.state.slots)
+                managers['am'].schedule(self.rng.choice(self.state.patients), doctor, day, slot)
+            elif action == 'sell':
+                item = dict(self.rng.choice(self.state.products), quantity=self.rng.randint(1, 2))
+                managers['sm'].create_sale('Load Test', [item])
+            else:
+                doctor = self.state.slots[self.rng.randrange(len(self.state.slots))][0]
+                managers['mr_m'].add_record(self.rng.choice(self.state.patients), doctor, None,
+                                            'Myopia', 'Mild', 'Load test', 'None', 90)
+            return 'ok'
+        except ValueError:
+            return 'rejected'
+        except Exception as e:
+            errno = getattr(e, 'errno', None)
+            if errno == ER_LOCK_DEADLOCK:
+                return 'deadlock'
+            if errno == ER_LOCK_WAIT_TIMEOUT:
+                return 'lock_wait_timeout'
+            logger.error(f"{self.name} {action} failed: {str(e)}")
+            return 'error'
+
+
+def row_lock_status(db):
+    rows = db.fetch("SHOW GLOBAL STATUS LIKE %s", ('Innodb_row_lock%',))
+    db.commit()
+    return {r['Variable_name']: int(r['Value']) for r in rows}
+
+
+def find_violations(db):
+    double_booked = db.fetch("""SELECT Doctor_ID, Appointment_Date, Appointment_Time, COUNT(*) AS bookings
+                                FROM appointments
+                                WHERE Status = 'Scheduled' AND Appointment_Date >= %s
+                                GROUP BY Doctor_ID, Appointment_Date, Appointment_Time
+                                HAVING COUNT(*) > 1""", (LOAD_START_DATE,))
+    negative_stock = db.fetch("SELECT id, name, quantity FROM sales_products WHERE quantity < 0")
+    negative_inventory = db.fetch("SELECT Inventory_ID, Item_Name, Quantity_On_Hand FROM inventory WHERE Quantity_On_Hand < 0")
+    return double_booked, negative_stock + negative_inventory, SalesManager(db).audit_stock()
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct * (len(ordered) - 1))))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Simulate concurrent terminals against the clinic database.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k')
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30, help='seconds')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='action weights, e.g. book=5,sell=3,record=2')
+    parser.add_argument('--slots', type=int, default=200, help='distinct appointment slots the clients contend for')
+    parser.add_argument('--hot-products', type=int, default=5, help='products the cashiers sell from')
+    parser.add_argument('--seed', type=int, default=11)
+    parser.add_argument('--without-change-feed', action='store_true',
+                        help='run without the table_versions triggers to measure what they cost')
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    cfg = prepare_database(args.scale)
+    db = InstrumentedDatabase(config=cfg)
+    if args.without_change_feed:
+        drop_change_triggers(db)
+    try:
+        state = SharedState(db, args.slots, args.hot_products, rng)
+        locks_before = row_lock_status(db)
+
+        stop_at = time.perf_counter() + args.duration
+        clients = [LoadClient(i, cfg, state, mix, stop_at, rng.randrange(1 << 30)) for i in range(args.clients)]
+        started = time.perf_counter()
+        for client in clients:
+            client.start()
+        for client in clients:
+            client.join()
+        elapsed = time.perf_counter() - started
+
+        locks_after = row_lock_status(db)
+        double_booked, negative_stock, ledger_drift = find_violations(db)
+    finally:
+        if args.without_change_feed:
+            install_change_triggers(db)
+        db.close()
+
+    latencies = defaultdict(list)
+    outcomes = defaultdict(int)
+    for client in clients:
+        for action, values in client.latencies.items():
+            latencies[action].extend(values)
+        for key, count in client.outcomes.items():
+            outcomes[key] += count
+
+    feed = 'off' if args.without_change_feed else 'on'
+    print(f"\n== {args.clients} clients, {elapsed:.1f}s, scale {args.scale}, mix {args.mix}, change feed {feed} ==")
+    print(f"{'action':<8}{'ok':>8}{'rejected':>10}{'deadlock':>10}{'lock wait':>11}{'error':>7}"
+          f"{'ops/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    total_ok = 0
+    for action in LoadClient.ACTIONS:
+        values = latencies.get(action)
+        if not values:
+            continue
+        ok = outcomes[(action, 'ok')]
+        total_ok += ok
+        print(f"{action:<8}{ok:>8}{outcomes[(action, 'rejected')]:>10}{outcomes[(action, 'deadlock')]:>10}"
+              f"{outcomes[(action, 'lock_wait_timeout')]:>11}{outcomes[(action, 'error')]:>7}"
+              f"{len(values) / elapsed:>9.1f}{statistics.median(values):>9.1f}"
+              f"{percentile(values, 0.95):>9.1f}{percentile(values, 0.99):>9.1f}")
+    print(f"\nThroughput: {total_ok / elapsed:.1f} successful actions/s")
+    waits = locks_after.get('Innodb_row_lock_waits', 0) - locks_before.get('Innodb_row_lock_waits', 0)
+    wait_ms = locks_after.get('Innodb_row_lock_time', 0) - locks_before.get('Innodb_row_lock_time', 0)
+    print(f"InnoDB row lock waits: {waits} ({wait_ms} ms total)")
+    print(f"Double-booked slots: {len(double_booked)}")
+    for row in double_booked[:10]:
+        print(f"  doctor {row['Doctor_ID']} {row['Appointment_Date']} {row['Appointment_Time']}: {row['bookings']} bookings")
+    print(f"Items with negative stock: {len(negative_stock)}")
+    print(f"Products out of step with the stock ledger: {len(ledger_drift)}")
+    return 1 if double_booked or negative_stock or ledger_drift else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
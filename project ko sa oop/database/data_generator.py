@@ -0,0 +1,380 @@
+"""
+Synthetic clinic data for load and scale testing.
+
+Generates referentially consistent patients, doctors, inventory, appointments,
+reminders, medical records, prescriptions, billing, sales with items and invoices
+on top of the schema created by main.ensure_sample_data. The output is fully
+determined by the seed and the anchor date, and rows are written with batched
+multi-row INSERTs so even the 1M-patient profile loads in minutes.
+
+Usage:
+    python generate_data.py --scale 100k --seed 7
+"""
+import argparse
+import random
+import time
+from array import array
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from database.db_connection import Database
+from backend.managers import SalesManager
+from utils.constants import INVOICE_TAX_RATE, MADE_TO_ORDER_ID_BASE, PRESCRIPTION_VALIDITY_DAYS
+from utils.ui_constants import PAYMENT_METHODS
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+SCALES = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+DEFAULT_BATCH_SIZE = 5000
+
+# Rows per patient for the dependent tables
+APPOINTMENTS_PER_PATIENT = 3
+RECORDS_PER_PATIENT = 0.8
+PRESCRIPTIONS_PER_PATIENT = 0.6
+SALES_PER_PATIENT = 0.5
+PATIENTS_PER_DOCTOR = 2000
+SLOTS_PER_DAY = 40  # 08:00-18:00 in 15 minute steps
+
+SURNAMES = ['Santos', 'Reyes', 'Cruz', 'Bautista', 'Ocampo', 'Garcia', 'Mendoza', 'Torres', 'Tomas', 'Andrada',
+            'Castillo', 'Flores', 'Villanueva', 'Ramos', 'Castro', 'Rivera', 'Aquino', 'Navarro', 'Salazar', 'Mercado',
+            'Aguilar', 'Pascual', 'Dela Cruz', 'Gonzales', 'Lopez', 'Hernandez', 'Perez', 'Domingo', 'Manalo', 'Soriano',
+            'Marquez', 'Valdez', 'Gutierrez', 'Fernandez', 'Robles', 'Lim', 'Tan', 'Sy', 'Co', 'Uy']
+FIRST_NAMES = {
+    'Male': ['Juan', 'Jose', 'Mark', 'John', 'Paolo', 'Miguel', 'Carlo', 'Rafael', 'Angelo', 'Joshua',
+             'Christian', 'Daniel', 'Gabriel', 'Luis', 'Ramon', 'Antonio', 'Emmanuel', 'Francis', 'Noel', 'Renato'],
+    'Female': ['Maria', 'Ana', 'Kristine', 'Angelica', 'Jasmine', 'Nicole', 'Patricia', 'Camille', 'Andrea', 'Bea',
+               'Grace', 'Joy', 'Liza', 'Rosa', 'Carmela', 'Teresa', 'Isabel', 'Lorna', 'Marites', 'Erlinda'],
+}
+FIRST_NAMES['Other'] = FIRST_NAMES['Male'][:10] + FIRST_NAMES['Female'][:10]
+STREETS = ['Rizal St.', 'Mabini St.', 'Bonifacio Ave.', 'Luna St.', 'Del Pilar St.', 'Quezon Ave.', 'Aguinaldo Hwy.', 'Burgos St.']
+CITIES = ['Quezon City', 'Manila', 'Makati', 'Pasig', 'Taguig', 'Caloocan', 'Marikina', 'Antipolo', 'Cebu City', 'Davao City']
+SPECIALIZATIONS = ['Optometry', 'Ophthalmology', 'Pediatric Optometry', 'Contact Lens Specialist', 'Low Vision']
+DIAGNOSES = ['Myopia', 'Hyperopia', 'Astigmatism', 'Presbyopia', 'Cataract', 'Glaucoma', 'Dry Eye', 'Conjunctivitis', 'Normal Vision']
+SEVERITIES = ['Mild', 'Moderate', 'Severe']
+FOLLOWUP_DAYS = [30, 60, 90, 180, 365]
+CONTACT_METHODS = ['SMS', 'Email', 'Call']
+SUPPLIERS = ['EssilorLuxottica', 'Hoya Vision', 'Zeiss PH', 'Bausch + Lomb', 'Johnson & Johnson Vision', 'CooperVision']
+PRODUCT_CATALOG = {
+    'Frames': (['Classic', 'Titanium', 'Acetate', 'Flex', 'Aviator'], 800, 6000),
+    'Lenses': (['Single Vision', 'Bifocal', 'Progressive', 'Blue Cut', 'Photochromic'], 500, 8000),
+    'Glasses': (['Complete Set', 'Kids Set', 'Sports Set', 'Office Set'], 1500, 9000),
+    'Contact Lenses': (['Daily', 'Monthly', 'Toric', 'Colored'], 300, 3500),
+    'Eye Care Products': (['Lubricating Drops', 'Allergy Drops', 'Eye Vitamins'], 150, 900),
+    'Cleaning Solutions': (['Multipurpose Solution', 'Lens Spray', 'Cleaning Kit'], 100, 600),
+    'Cases & Accessories': (['Hard Case', 'Soft Pouch', 'Chain Strap', 'Microfiber Cloth'], 50, 500),
+    'Reading Glasses': (['+1.00 Reader', '+1.50 Reader', '+2.00 Reader', '+2.50 Reader'], 250, 1200),
+    'Sunglasses': (['Polarized', 'Wayfarer', 'Sport Wrap', 'Clip-On'], 900, 7000),
+    'Blue Light Glasses': (['Computer Glasses', 'Gaming Glasses'], 700, 3000),
+}
+
+COLUMNS = {
+    'patients': ('Patient_ID', 'Surname', 'FirstName', 'MiddleInitial', 'Age', 'Gender', 'Age_Group', 'Address',
+                 'Contact', 'Email', 'Medical_History', 'Registration_Date'),
+    'doctors': ('Doctor_ID', 'Surname', 'FirstName', 'MiddleInitial', 'Name', 'License_No', 'Specialization',
+                'Contact', 'Schedule'),
+    'inventory': ('Inventory_ID', 'Item_Name', 'Category', 'Quantity_On_Hand', 'Unit_Price', 'Supplier'),
+    'sales_products': ('id', 'name', 'category', 'description', 'price', 'quantity'),
+    'inventory_movements': ('Product_ID', 'Movement_Type', 'Quantity', 'Balance_After', 'Sale_ID', 'Reference'),
+    'appointments': ('Appointment_ID', 'Patient_ID', 'Doctor_ID', 'Appointment_Date', 'Appointment_Time', 'Status'),
+    'appointment_reminders': ('Appointment_ID', 'Patient_ID', 'Reminder_Date', 'Reminder_Time', 'Contact_Method',
+                              'Status', 'Sent_Date'),
+    'medical_records': ('Patient_ID', 'Doctor_ID', 'Recorded_Date', 'Diagnosis', 'Severity', 'Clinical_Notes',
+                        'Recommendations', 'Follow_up_Days'),
+    'prescriptions': ('Patient_ID', 'Doctor_ID', 'Issued_Date', 'Expiry_Date', 'OD_Sphere', 'OD_Cylinder', 'OD_Axis',
+                      'OD_Add', 'OS_Sphere', 'OS_Cylinder', 'OS_Axis', 'OS_Add', 'Notes'),
+    'billing': ('Patient_ID', 'Amount', 'Billing_Date', 'Payment_Method', 'Status'),
+    'sales': ('id', 'customer_name', 'total', 'sale_date'),
+    'sale_items': ('sale_id', 'product_id', 'quantity', 'price'),
+    'invoices': ('Sale_ID', 'Patient_ID', 'Invoice_Number', 'Invoice_Date', 'Total_Amount', 'Tax', 'Grand_Total',
+                 'Status', 'Generated_By'),
+}
+
+
+class BatchWriter:
+    """Buffers rows per table and writes them with executemany in fixed-size batches."""
+
+    def __init__(self, db: Database, batch_size=DEFAULT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.buffers = defaultdict(list)
+        self.counts = defaultdict(int)
+
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= self.batch_size:
+            self.flush(table)
+
+    def flush(self, table=None):
+        for name in ([table] if table else list(self.buffers)):
+            rows = self.buffers[name]
+            if not rows:
+                continue
+            columns = COLUMNS[name]
+            query = (f"INSERT INTO {name} ({', '.join(columns)}) "
+                     f"VALUES ({', '.join(['%s'] * len(columns))})")
+            self.db.execute_many(query, rows)
+            self.counts[name] += len(rows)
+            self.buffers[name] = []
+
+
+class ClinicDataGenerator:
+    def __init__(self, db: Database, patients=SCALES['1k'], seed=42, anchor=None, batch_size=DEFAULT_BATCH_SIZE):
+        if patients <= 0:
+            raise ValueError('Number of patients must be positive')
+        self.db = db
+        self.n_patients = patients
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.anchor = anchor or date.today()
+        self.writer = BatchWriter(db, batch_size)
+        self.n_doctors = max(5, patients // PATIENTS_PER_DOCTOR)
+        self.n_items = min(500, max(50, patients // 200))
+        # Compact per-patient name indexes so sales can name their customers at 1M scale
+        self.surname_idx = array('H')
+        self.first_idx = array('H')
+        self.first_gender = array('B')
+
+    def _next_id(self, table, column, below=None):
+        where = f" WHERE {column} < {int(below)}" if below is not None else ''
+        row = self.db.fetch(f"SELECT COALESCE(MAX({column}), 0) + 1 AS next_id FROM {table}{where}")
+        return int(row[0]['next_id'])
+
+    def _random_date(self, days_back, days_forward=0):
+        return self.anchor + timedelta(days=self.rng.randint(-days_back, days_forward))
+
+    def _power(self, low, high, step=0.25):
+        value = self.rng.randint(int(low / step), int(high / step)) * step
+        return f"{value:+.2f}"
+
+    def generate(self):
+        started = time.perf_counter()
+        logger.info(f"Generating clinic data: patients={self.n_patients}, seed={self.seed}, anchor={self.anchor}")
+
+        self.patient_base = self._next_id('patients', 'Patient_ID')
+        self.doctor_base = self._next_id('doctors', 'Doctor_ID')
+        self.item_base = max(self._next_id('inventory', 'Inventory_ID'),
+                             self._next_id('sales_products', 'id', below=MADE_TO_ORDER_ID_BASE))
+        self.appointment_base = self._next_id('appointments', 'Appointment_ID')
+        self.sale_base = self._next_id('sales', 'id')
+
+        self.generate_patients()
+        self.generate_doctors()
+        self.generate_inventory()
+        self.generate_appointments()
+        self.generate_clinical()
+        self.generate_sales()
+        self.writer.flush()
+        # Bulk-loaded stock bypasses the checkout path that maintains the alert set
+        SalesManager(self.db).rebuild_low_stock_alerts()
+
+        elapsed = time.perf_counter() - started
+        total = sum(self.writer.counts.values())
+        logger.info(f"Inserted {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s)")
+        return dict(self.writer.counts)
+
+    def generate_patients(self):
+        genders = list(FIRST_NAMES)
+        for i in range(self.n_patients):
+            gender = self.rng.choices(genders, weights=(48, 48, 4))[0]
+            s_idx = self.rng.randrange(len(SURNAMES))
+            f_idx = self.rng.randrange(len(FIRST_NAMES[gender]))
+            self.surname_idx.append(s_idx)
+            self.first_idx.append(f_idx)
+            self.first_gender.append(genders.index(gender))
+
+            surname, firstname = SURNAMES[s_idx], FIRST_NAMES[gender][f_idx]
+            age = self.rng.randint(3, 90)
+            patient_id = self.patient_base + i
+            address = f"{self.rng.randint(1, 999)} {self.rng.choice(STREETS)}, {self.rng.choice(CITIES)}"
+            email = f"{firstname}.{surname}{patient_id}@example.com".lower().replace(' ', '')
+            self.writer.add('patients', (
+                patient_id, surname, firstname, chr(65 + self.rng.randrange(26)), age, gender,
+                'Kids' if age < 18 else 'Adult', address, f"09{self.rng.randint(0, 999999999):09d}", email,
+                self.rng.choice(['', '', 'Diabetes', 'Hypertension', 'Previous eye surgery']),
+                self._random_date(3 * 365),
+            ))
+
+    def patient_name(self, patient_id):
+        i = patient_id - self.patient_base
+        gender = list(FIRST_NAMES)[self.first_gender[i]]
+        return f"{SURNAMES[self.surname_idx[i]]}, {FIRST_NAMES[gender][self.first_idx[i]]}"
+
+    def random_patient(self):
+        return self.patient_base + self.rng.randrange(self.n_patients)
+
+    def random_doctor(self):
+        return self.doctor_base + self.rng.randrange(self.n_doctors)
+
+    def generate_doctors(self):
+        for i in range(self.n_doctors):
+            gender = self.rng.choice(['Male', 'Female'])
+            surname, firstname = self.rng.choice(SURNAMES), self.rng.choice(FIRST_NAMES[gender])
+            middle = chr(65 + self.rng.randrange(26))
+            self.writer.add('doctors', (
+                self.doctor_base + i, surname, firstname, middle, f"{surname}, {firstname} {middle}.",
+                f"PRC-{self.rng.randint(0, 9999999):07d}", self.rng.choice(SPECIALIZATIONS),
+                f"09{self.rng.randint(0, 999999999):09d}", 'Mon-Sat 8:00-18:00',
+            ))
+
+    def generate_inventory(self):
+        """Inventory items, mirrored into sales_products under the same ids as the sales screen expects.
+        Their quantities are the stock left after the generated sales; generate_sales writes the ledger."""
+        self.products = []
+        self.stock = {}
+        categories = list(PRODUCT_CATALOG)
+        for i in range(self.n_items):
+            category = categories[i % len(categories)]
+            models, low, high = PRODUCT_CATALOG[category]
+            item_id = self.item_base + i
+            name = f"{self.rng.choice(SUPPLIERS).split()[0]} {self.rng.choice(models)} {item_id}"
+            price = round(self.rng.uniform(low, high), -1)
+            quantity = self.rng.randint(5, 300)
+            self.products.append((item_id, price))
+            self.stock[item_id] = quantity
+            self.writer.add('inventory', (item_id, name, category, quantity, price, self.rng.choice(SUPPLIERS)))
+            self.writer.add('sales_products', (item_id, name, category, f"{category} - {name}", price, quantity))
+
+    def generate_appointments(self):
+        """Walks (doctor, day, slot) in order so no doctor is ever double booked."""
+        total = self.n_patients * APPOINTMENTS_PER_PATIENT
+        days_needed = int(total * 1.5 / (self.n_doctors * SLOTS_PER_DAY)) + 1
+        start_day = self.anchor - timedelta(days=int(days_needed * 0.85))
+
+        slot = 0
+        for i in range(total):
+            slot += self.rng.randint(1, 2)
+            doctor_offset, position = slot % self.n_doctors, slot // self.n_doctors
+            appt_date = start_day + timedelta(days=position // SLOTS_PER_DAY)
+            minutes = 8 * 60 + (position % SLOTS_PER_DAY) * 15
+            appt_time = f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+            if appt_date >= self.anchor:
+                status = 'Scheduled'
+            else:
+                status = 'Done' if self.rng.random() < 0.9 else 'Cancelled'
+
+            appointment_id = self.appointment_base + i
+            patient_id = self.random_patient()
+            self.writer.add('appointments', (appointment_id, patient_id, self.doctor_base + doctor_offset,
+                                             appt_date, appt_time, status))
+
+            if status == 'Scheduled' or self.rng.random() < 0.5:
+                reminder_date = appt_date - timedelta(days=1)
+                sent = reminder_date < self.anchor
+                self.writer.add('appointment_reminders', (
+                    appointment_id, patient_id, reminder_date, '09:00:00', self.rng.choice(CONTACT_METHODS),
+                    'Sent' if sent else 'Pending',
+                    datetime.combine(reminder_date, datetime.min.time()) + timedelta(hours=9) if sent else None,
+                ))
+
+    def generate_clinical(self):
+        for _ in range(int(self.n_patients * RECORDS_PER_PATIENT)):
+            patient_id, doctor_id = self.random_patient(), self.random_doctor()
+            recorded = self._random_date(2 * 365)
+            diagnosis = self.rng.choice(DIAGNOSES)
+            self.writer.add('medical_records', (
+                patient_id, doctor_id, datetime.combine(recorded, datetime.min.time()) + timedelta(hours=self.rng.randint(8, 17)),
+                diagnosis, self.rng.choice(SEVERITIES), f"Routine examination. Findings consistent with {diagnosis.lower()}.",
+                'Follow prescribed correction; return for review.', self.rng.choice(FOLLOWUP_DAYS),
+            ))
+            self.writer.add('billing', (
+                patient_id, self.rng.randint(50, 200) * 10, recorded, self.rng.choice(PAYMENT_METHODS),
+                'Paid' if self.rng.random() < 0.85 else 'Pending',
+            ))
+
+        for _ in range(int(self.n_patients * PRESCRIPTIONS_PER_PATIENT)):
+            issued = self._random_date(2 * 365)
+            add = self._power(0.75, 2.5) if self.rng.random() < 0.3 else None
+            self.writer.add('prescriptions', (
+                self.random_patient(), self.random_doctor(), issued, issued + timedelta(days=PRESCRIPTION_VALIDITY_DAYS),
+                self._power(-6, 4), self._power(-2.5, 0), str(self.rng.randint(1, 180)), add,
+                self._power(-6, 4), self._power(-2.5, 0), str(self.rng.randint(1, 180)), add, '',
+            ))
+
+    def _sales(self):
+        """Yields (sale_id, patient_id, sale_day, sold_at, [(product_id, quantity, price)], paid)."""
+        for i in range(int(self.n_patients * SALES_PER_PATIENT)):
+            patient_id = self.random_patient()
+            sale_day = self._random_date(365)
+            sold_at = datetime.combine(sale_day, datetime.min.time()) + timedelta(minutes=self.rng.randint(8 * 60, 18 * 60))
+            lines = [(product_id, self.rng.choice((1, 1, 1, 2)), price)
+                     for product_id, price in self.rng.sample(self.products, self.rng.randint(1, 3))]
+            yield self.sale_base + i, patient_id, sale_day, sold_at, lines, self.rng.random() < 0.9
+
+    def generate_sales(self):
+        """
+        Sales with their items, invoices and 'sale' ledger rows. A first pass over the
+        same random stream totals the units sold, so each product opens the ledger with
+        its final stock plus its sales and replaying the ledger gives the stock on hand.
+        """
+        state = self.rng.getstate()
+        sold = defaultdict(int)
+        for *_, lines, _ in self._sales():
+            for product_id, quantity, _ in lines:
+                sold[product_id] += quantity
+        self.rng.setstate(state)
+
+        balance = {}
+        for product_id, _ in self.products:
+            balance[product_id] = self.stock[product_id] + sold[product_id]
+            self.writer.add('inventory_movements', (product_id, 'adjustment', balance[product_id], balance[product_id],
+                                                    None, 'Opening balance'))
+
+        for sale_id, patient_id, sale_day, sold_at, lines, paid in self._sales():
+            total = 0
+            for product_id, quantity, price in lines:
+                total += quantity * price
+                balance[product_id] -= quantity
+                self.writer.add('sale_items', (sale_id, product_id, quantity, price))
+                self.writer.add('inventory_movements', (product_id, 'sale', -quantity, balance[product_id],
+                                                        sale_id, f"Sale #{sale_id}"))
+
+            total = round(total, 2)
+            tax = round(total * INVOICE_TAX_RATE, 2)
+            self.writer.add('sales', (sale_id, self.patient_name(patient_id), total, sold_at))
+            self.writer.add('invoices', (
+                sale_id, patient_id, f"INV-{sale_day.strftime('%Y%m%d')}-{sale_id}", sale_day, total, tax,
+                round(total + tax, 2), 'Paid' if paid else 'Unpaid', 'generator',
+            ))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Populate the clinic database with synthetic data.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='1k', help='patient profile size')
+    parser.add_argument('--patients', type=int, help='exact number of patients (overrides --scale)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--anchor-date', type=date.fromisoformat, help='"today" for generated dates (YYYY-MM-DD)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--keep-triggers', action='store_true',
+                        help='leave the change-feed and rollup triggers on during the load (much slower)')
+    args = parser.parse_args(argv)
+
+    # Imported lazily: main pulls in the GUI toolkit
+    from main import ensure_sample_data
+    from backend.change_feed import drop_change_triggers, install_change_triggers, bump_versions
+    from backend.rollups import drop_rollup_triggers, install_rollup_triggers, mark_all_dirty
+
+    db = Database(raise_on_error=True)
+    try:
+        ensure_sample_data(db)
+        if not args.keep_triggers:
+            drop_change_triggers(db)
+            drop_rollup_triggers(db)
+        try:
+            generator = ClinicDataGenerator(db, patients=args.patients or SCALES[args.scale], seed=args.seed,
+                                            anchor=args.anchor_date, batch_size=args.batch_size)
+            counts = generator.generate()
+        finally:
+            if not args.keep_triggers:
+                install_change_triggers(db)
+                bump_versions(db)
+                install_rollup_triggers(db)
+                mark_all_dirty(db)
+        for table, count in sorted(counts.items()):
+            print(f"{table:<24}{count:>12,}")
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,5 @@
+import threading
+from contextlib import contextmanager
 import mysql.connector
 from mysql.connector import Error
 from database.db_config import DB_CONFIG
@@ -7,11 +9,16 @@ logger = setup_logging(__name__)
 
 
 class Database:
-    def __init__(self, raise_on_error=False):
+    def __init__(self, raise_on_error=False, config=None):
         self.last_error = None
         self.raise_on_error = raise_on_error
+        # One connection is shared by the UI and background warmers; serialize its use.
+        self.lock = threading.RLock()
+        self._in_transaction = False
         tried_alternate = False
-        cfg = dict(DB_CONFIG)
+        cfg = dict(config or DB_CONFIG)
+        # Schema name from the config; connection.database would ask the server each time
+        self.database = cfg.get('database')
         tried_hosts = []
         while True:
             host = cfg.get('host')
@@ -52,24 +59,131 @@ class Database:
         if not self.connection:
             err = f'No DB connection. Last error: {self.last_error}'
             raise RuntimeError(err)
-        cur = self.connection.cursor()
-        try:
-            cur.execute(query, params or ())
+        with self.lock:
+            cur = self.connection.cursor()
+            try:
+                cur.execute(query, params or ())
+                self._commit()
+                return cur.lastrowid
+            finally:
+                cur.close()
+
+    def execute_rowcount(self, query, params=None):
+        """Like execute, but returns the number of affected rows (for set-based UPDATE/INSERT ... SELECT)."""
+        if not self.connection:
+            err = f'No DB connection. Last error: {self.last_error}'
+            raise RuntimeError(err)
+        with self.lock:
+            cur = self.connection.cursor()
+            try:
+                cur.execute(query, params or ())
+                self._commit()
+                return cur.rowcount
+            finally:
+                cur.close()
+
+    def execute_many(self, query, rows):
+        """Bulk insert/update in a single round of batched statements and one commit."""
+        if not self.connection:
+            err = f'No DB connection. Last error: {self.last_error}'
+            raise RuntimeError(err)
+        with self.lock:
+            cur = self.connection.cursor()
+            try:
+                cur.executemany(query, rows)
+                self._commit()
+                return cur.rowcount
+            except Exception:
+                self.connection.rollback()
+                raise
+            finally:
+                cur.close()
+
+    def _commit(self):
+        # Inside transaction() the block commits once at the end
+        if not self._in_transaction:
             self.connection.commit()
-            return cur.lastrowid
-        finally:
-            cur.close()
+
+    @contextmanager
+    def transaction(self):
+        """
+        Runs the block as one transaction: execute/execute_many inside it do not
+        commit, the block commits at the end and rolls everything back if it raises.
+        The connection lock is held throughout so threads sharing the connection
+        cannot slip statements into it. Nested blocks join the outer transaction.
+        """
+        if not self.connection:
+            err = f'No DB connection. Last error: {self.last_error}'
+            raise RuntimeError(err)
+        with self.lock:
+            if self._in_transaction:
+                yield self
+                return
+            # End any read snapshot so the transaction sees other sessions' committed writes
+            self.connection.commit()
+            self._in_transaction = True
+            try:
+                yield self
+                self.connection.commit()
+            except BaseException:
+                self.connection.rollback()
+                raise
+            finally:
+                self._in_transaction = False
 
     def fetch(self, query, params=None):
         if not self.connection:
             err = f'No DB connection. Last error: {self.last_error}'
             raise RuntimeError(err)
-        cur = self.connection.cursor(dictionary=True)
-        try:
-            cur.execute(query, params or ())
-            return cur.fetchall()
-        finally:
-            cur.close()
+        with self.lock:
+            cur = self.connection.cursor(dictionary=True)
+            try:
+                cur.execute(query, params or ())
+                return cur.fetchall()
+            finally:
+                cur.close()
+
+    def stream(self, query, params=None, chunk_size=1000):
+        """
+        Yields (column_names, rows) for each chunk of up to ``chunk_size`` row tuples,
+        read through an unbuffered (server-side) cursor so large results never sit
+        in memory at once. The connection is held until the generator is exhausted
+        or closed, so stream on a connection of its own.
+        """
+        if not self.connection:
+            err = f'No DB connection. Last error: {self.last_error}'
+            raise RuntimeError(err)
+        with self.lock:
+            cur = self.connection.cursor(buffered=False)
+            try:
+                cur.execute(query, params or ())
+                columns = list(cur.column_names)
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    yield columns, []
+                while rows:
+                    yield columns, rows
+                    rows = cur.fetchmany(chunk_size)
+            finally:
+                try:
+                    cur.close()
+                except Error:
+                    # Stopped early: drain the unread rows so the connection stays usable
+                    self.connection.consume_results()
+                    cur.close()
+
+    def ping(self):
+        """Round-trips to the server, reconnecting once if the link went idle."""
+        if not self.connection:
+            raise RuntimeError(f'No DB connection. Last error: {self.last_error}')
+        with self.lock:
+            self.connection.ping(reconnect=True, attempts=1, delay=0)
+
+    def commit(self):
+        """Ends the current transaction so later reads see other sessions' writes."""
+        if self.connection:
+            with self.lock:
+                self._commit()
 
     def close(self):
         if self.connection and self.connection.is_connected():
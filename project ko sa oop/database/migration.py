@@ -3,6 +3,7 @@ Database migration and update utilities.
 Handles schema changes, column additions, and data updates.
 """
 from database.db_connection import Database
+from database.schema_cache import SchemaCache
 from utils.logger import setup_logging
 
 logger = setup_logging(__name__)
@@ -19,6 +20,14 @@ class DatabaseMigration:
             db: Database connection instance
         """
         self.db = db
+        self.schema = SchemaCache(db)
+    
+    def _alter(self, query):
+        """Runs a DDL statement and drops the cached schema it changed."""
+        try:
+            return self.db.execute(query)
+        finally:
+            self.schema.invalidate()
     
     def add_column(self, table_name, column_name, column_definition):
         """
@@ -34,16 +43,13 @@ class DatabaseMigration:
         """
         try:
             # Check if column exists
-            columns = self.db.fetch(f"SHOW COLUMNS FROM {table_name}")
-            column_names = [col['Field'] for col in columns]
-            
-            if column_name in column_names:
+            if self.schema.has_column(table_name, column_name):
                 logger.info(f"Column '{column_name}' already exists in table '{table_name}'")
                 return True
             
             # Add column
             query = f"ALTER TABLE {table_name} ADD COLUMN `{column_name}` {column_definition}"
-            self.db.execute(query)
+            self._alter(query)
             logger.info(f"Column '{column_name}' added to table '{table_name}'")
             return True
         except Exception as e:
@@ -64,7 +70,7 @@ class DatabaseMigration:
         """
         try:
             query = f"ALTER TABLE {table_name} MODIFY COLUMN `{column_name}` {new_definition}"
-            self.db.execute(query)
+            self._alter(query)
             logger.info(f"Column '{column_name}' in table '{table_name}' modified")
             return True
         except Exception as e:
@@ -84,15 +90,12 @@ class DatabaseMigration:
         """
         try:
             # Check if column exists first
-            columns = self.db.fetch(f"SHOW COLUMNS FROM {table_name}")
-            column_names = [col['Field'] for col in columns]
-            
-            if column_name not in column_names:
+            if not self.schema.has_column(table_name, column_name):
                 logger.info(f"Column '{column_name}' doesn't exist in table '{table_name}'")
                 return True
             
             query = f"ALTER TABLE {table_name} DROP COLUMN `{column_name}`"
-            self.db.execute(query)
+            self._alter(query)
             logger.info(f"Column '{column_name}' dropped from table '{table_name}'")
             return True
         except Exception as e:
@@ -114,32 +117,51 @@ class DatabaseMigration:
         """
         try:
             query = f"ALTER TABLE {table_name} CHANGE COLUMN `{old_name}` `{new_name}` {definition}"
-            self.db.execute(query)
+            self._alter(query)
             logger.info(f"Column '{old_name}' renamed to '{new_name}' in table '{table_name}'")
             return True
         except Exception as e:
             logger.error(f"Failed to rename column in '{table_name}': {str(e)}")
             raise
     
-    def add_index(self, table_name, index_name, columns):
+    def index_exists(self, table_name, index_name):
+        """
+        Check whether an index exists on a table.
+
+        Args:
+            table_name: Name of the table
+            index_name: Name of the index
+
+        Returns:
+            True if the index exists, False otherwise
+        """
+        return self.schema.has_index(table_name, index_name)
+
+    def add_index(self, table_name, index_name, columns, unique=False):
         """
-        Add an index to a table.
+        Add an index to a table if it doesn't exist.
         
         Args:
             table_name: Name of the table
             index_name: Name of the index
             columns: List of column names or single column name
+            unique: Create a UNIQUE index
             
         Returns:
             True if successful, False otherwise
         """
         try:
+            if self.index_exists(table_name, index_name):
+                logger.info(f"Index '{index_name}' already exists in table '{table_name}'")
+                return True
+
             if isinstance(columns, str):
                 columns = [columns]
-            
+
             columns_str = ', '.join([f"`{col}`" for col in columns])
-            query = f"ALTER TABLE {table_name} ADD INDEX `{index_name}` ({columns_str})"
-            self.db.execute(query)
+            kind = "UNIQUE INDEX" if unique else "INDEX"
+            query = f"ALTER TABLE {table_name} ADD {kind} `{index_name}` ({columns_str})"
+            self._alter(query)
             logger.info(f"Index '{index_name}' added to table '{table_name}'")
             return True
         except Exception as e:
@@ -152,7 +174,7 @@ class DatabaseMigration:
                        ADD CONSTRAINT `{fk_name}` 
                        FOREIGN KEY (`{column_name}`) 
                        REFERENCES {ref_table}(`{ref_column}`)"""
-            self.db.execute(query)
+            self._alter(query)
             logger.info(f"Foreign key '{fk_name}' added to table '{table_name}'")
             return True
         except Exception as e:
@@ -161,14 +183,11 @@ class DatabaseMigration:
     
     def create_table(self, table_name, table_definition):
         try:
-            tables = self.db.fetch("SHOW TABLES")
-            table_names = [list(row.values())[0] for row in tables]
-            
-            if table_name in table_names:
+            if self.schema.has_table(table_name):
                 logger.info(f"Table '{table_name}' already exists")
                 return True
             
-            self.db.execute(table_definition)
+            self._alter(table_definition)
             logger.info(f"Table '{table_name}' created")
             return True
         except Exception as e:
@@ -200,7 +219,7 @@ class DatabaseMigration:
                 backup_name = f"{table_name}_backup_{timestamp}"
             
             query = f"CREATE TABLE {backup_name} AS SELECT * FROM {table_name}"
-            self.db.execute(query)
+            self._alter(query)
             logger.info(f"Table '{table_name}' backed up to '{backup_name}'")
             return backup_name
         except Exception as e:
@@ -0,0 +1,102 @@
+"""
+Schema metadata cache.
+
+Tables, columns and indexes of the current database are read with a single
+information_schema query and kept in memory, shared by every connection to
+the same database in this process. BaseManager builds its archive column lists
+from it and DatabaseMigration plans its changes against it, instead of issuing
+SHOW COLUMNS / SHOW TABLES / SHOW INDEX per call. Any DDL run through
+DatabaseMigration invalidates it; DDL from other processes is picked up once the
+metadata is older than ``SCHEMA_CACHE_TTL_S``.
+"""
+import threading
+import time
+from database.db_connection import Database
+from utils.constants import SCHEMA_CACHE_TTL_S
+from utils.logger import setup_logging
+
+logger = setup_logging(__name__)
+
+_SCHEMA_QUERY = """
+    SELECT 'column' AS Kind, TABLE_NAME AS Table_Name, COLUMN_NAME AS Name, EXTRA AS Detail,
+           ORDINAL_POSITION AS Position
+    FROM information_schema.COLUMNS
+    WHERE TABLE_SCHEMA = DATABASE()
+    UNION ALL
+    SELECT 'index', TABLE_NAME, INDEX_NAME, COLUMN_NAME, SEQ_IN_INDEX
+    FROM information_schema.STATISTICS
+    WHERE TABLE_SCHEMA = DATABASE()
+    ORDER BY Table_Name, Kind, Position
+"""
+
+# Database name -> (load time, metadata), shared by every connection to that database
+_schemas = {}
+# Database name -> invalidation count, so a load that raced an invalidation is not stored
+_generations = {}
+_schemas_lock = threading.Lock()
+
+
+class SchemaCache:
+    """View of the shared metadata of ``db``'s database; reloads go through ``db``."""
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.name = db.database
+
+    def _schema(self):
+        with _schemas_lock:
+            entry = _schemas.get(self.name)
+            generation = _generations.get(self.name, 0)
+        if entry is not None and time.monotonic() - entry[0] < SCHEMA_CACHE_TTL_S:
+            return entry[1]
+
+        # Read outside the lock so other databases' lookups do not wait on this round-trip
+        loaded_at = time.monotonic()
+        columns, generated, indexes = {}, {}, {}
+        for row in self.db.fetch(_SCHEMA_QUERY):
+            table = row['Table_Name']
+            if row['Kind'] == 'column':
+                columns.setdefault(table, []).append(row['Name'])
+                # 'VIRTUAL GENERATED' / 'STORED GENERATED'; expression defaults show as DEFAULT_GENERATED
+                if (row['Detail'] or '').upper().endswith(' GENERATED'):
+                    generated.setdefault(table, set()).add(row['Name'])
+            else:
+                indexes.setdefault(table, {}).setdefault(row['Name'], []).append(row['Detail'])
+        schema = {'columns': columns, 'generated': generated, 'indexes': indexes}
+        with _schemas_lock:
+            if _generations.get(self.name, 0) == generation:
+                _schemas[self.name] = (loaded_at, schema)
+        logger.debug(f"Schema cache loaded: {len(columns)} tables")
+        return schema
+
+    def invalidate(self):
+        """Drops the metadata; call after DDL so the next lookup reloads it."""
+        with _schemas_lock:
+            _schemas.pop(self.name, None)
+            _generations[self.name] = _generations.get(self.name, 0) + 1
+
+    def tables(self):
+        return set(self._schema()['columns'])
+
+    def has_table(self, table_name):
+        return table_name in self._schema()['columns']
+
+    def columns(self, table_name):
+        """Column names of ``table_name`` in table order (empty if it does not exist)."""
+        return list(self._schema()['columns'].get(table_name, ()))
+
+    def stored_columns(self, table_name):
+        """Columns that can be written; generated columns are computed by MySQL."""
+        schema = self._schema()
+        generated = schema['generated'].get(table_name, set())
+        return [col for col in schema['columns'].get(table_name, ()) if col not in generated]
+
+    def has_column(self, table_name, column_name):
+        return column_name in self.columns(table_name)
+
+    def indexes(self, table_name):
+        """{index name: [columns in index order]} of ``table_name``."""
+        return {name: list(cols) for name, cols in self._schema()['indexes'].get(table_name, {}).items()}
+
+    def has_index(self, table_name, index_name):
+        return index_name in self._schema()['indexes'].get(table_name, {})
@@ -1,14 +1,28 @@
 import customtkinter as ctk
 from tkinter import messagebox
-from datetime import datetime
+from datetime import datetime, date, timedelta
 import calendar
+from utils.autocomplete import AutocompleteCombobox
+from utils.date_picker import DatePicker
+from utils.ui_constants import AUTOCOMPLETE_PRELOAD_LIMIT, FREE_SLOT_SUGGESTIONS, WEEK_CACHE_SIZE, CALENDAR_CELL_MAX_ENTRIES
+from backend.slot_engine import SlotEngine
+from backend.calendar_cache import WeekCache, week_start
 
 class AppointmentsFrame(ctk.CTkFrame):
-    def __init__(self, master, manager, patient_manager, doctor_manager, *args, **kwargs):
+    WATCHED_TABLES = {'appointments', 'patients', 'doctors', 'doctor_availability'}
+
+    def __init__(self, master, manager, patient_manager, doctor_manager, availability_manager=None, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
         self.manager = manager
         self.patient_manager = patient_manager
         self.doctor_manager = doctor_manager
+        self.slot_engine = SlotEngine(manager, availability_manager, doctor_manager) if availability_manager else None
+        self.free_slots = {}
+        self.week_cache = WeekCache(manager.list_appointments_between, max_weeks=WEEK_CACHE_SIZE)
+        self.current_week = week_start(date.today())
+        # Server time of the last change check; None until the first one
+        self.changes_since = None
+        self.pending_tables = set()
         self.build()
 
     def build(self):
@@ -39,11 +53,13 @@ class AppointmentsFrame(ctk.CTkFrame):
         frm.pack(padx=20, pady=10, fill='x')
 
         ctk.CTkLabel(frm, text='Select Patient', font=('Segoe UI', 12, 'bold')).pack(anchor='w', pady=(10, 3))
-        self.patient_combo = ctk.CTkComboBox(frm, values=self.get_patients_list(), state='readonly', height=35, font=('Segoe UI', 12))
+        self.patient_combo = AutocompleteCombobox(frm, search=self.search_patients, height=35, font=('Segoe UI', 12))
+        self.patient_combo.set_items(self.get_patients_list(), partial=self.patients_partial)
         self.patient_combo.pack(fill='x', pady=(0, 10))
 
         ctk.CTkLabel(frm, text='Select Doctor', font=('Segoe UI', 12, 'bold')).pack(anchor='w', pady=(10, 3))
-        self.doctor_combo = ctk.CTkComboBox(frm, values=self.get_doctors_list(), state='readonly', height=35, font=('Segoe UI', 12))
+        self.doctor_combo = AutocompleteCombobox(frm, height=35, font=('Segoe UI', 12))
+        self.doctor_combo.set_items(self.get_doctors_list())
         self.doctor_combo.pack(fill='x', pady=(0, 10))
 
         # Date Picker
@@ -82,6 +98,12 @@ class AppointmentsFrame(ctk.CTkFrame):
         self.minute_combo = ctk.CTkComboBox(time_frame, values=['00', '15', '30', '45'], variable=self.minute_var, width=80)
         self.minute_combo.pack(side='left', padx=5, fill='x', expand=True)
 
+        # Next free slots for the selected doctor, or any doctor when none is picked
+        if self.slot_engine:
+            ctk.CTkButton(frm, text='🔍 Find Free Slots', command=self.find_free_slots, height=35, font=('Segoe UI', 12, 'bold')).pack(fill='x', pady=(0, 5))
+            self.free_slot_combo = ctk.CTkComboBox(frm, values=[], state='readonly', command=self.apply_free_slot, height=35, font=('Segoe UI', 12))
+            self.free_slot_combo.pack(fill='x', pady=(0, 10))
+
         # Buttons
         btn_frm = ctk.CTkFrame(frm, fg_color="transparent")
         btn_frm.pack(fill='x', pady=10)
@@ -102,9 +124,28 @@ class AppointmentsFrame(ctk.CTkFrame):
         right = ctk.CTkFrame(main, fg_color=("white", "#0f0f0f"))
         right.pack(side='right', fill='both', expand=True, padx=15, pady=15)
 
-        ctk.CTkLabel(right, text='Scheduled Appointments', font=('Segoe UI', 16, 'bold')).pack(pady=(0, 10))
+        tabs = ctk.CTkTabview(right)
+        tabs.pack(fill='both', expand=True)
+        week_tab = tabs.add('Week')
+        list_tab = tabs.add('List')
+
+        # Week calendar: one row per doctor with bookings, one column per day
+        nav = ctk.CTkFrame(week_tab, fg_color="transparent")
+        nav.pack(fill='x', pady=(0, 10))
+        ctk.CTkButton(nav, text='◀', command=lambda: self.change_week(-1), width=40, height=32, font=('Segoe UI', 12, 'bold')).pack(side='left')
+        ctk.CTkButton(nav, text='Today', command=self.go_to_today, width=70, height=32, font=('Segoe UI', 12)).pack(side='left', padx=5)
+        ctk.CTkButton(nav, text='▶', command=lambda: self.change_week(1), width=40, height=32, font=('Segoe UI', 12, 'bold')).pack(side='left')
+        ctk.CTkButton(nav, text='📅', command=self.pick_week, width=40, height=32, font=('Segoe UI', 12)).pack(side='left', padx=5)
+        self.week_label = ctk.CTkLabel(nav, text='', font=('Segoe UI', 14, 'bold'))
+        self.week_label.pack(side='left', padx=10)
 
-        self.txt = ctk.CTkTextbox(right, font=('Consolas', 11), fg_color=("#f5f5f5", "#1a1a1a"))
+        self.week_grid = ctk.CTkScrollableFrame(week_tab, fg_color=("#f5f5f5", "#1a1a1a"))
+        self.week_grid.pack(fill='both', expand=True)
+
+        self.list_title = ctk.CTkLabel(list_tab, text='Scheduled Appointments', font=('Segoe UI', 16, 'bold'))
+        self.list_title.pack(pady=(0, 10))
+
+        self.txt = ctk.CTkTextbox(list_tab, font=('Consolas', 11), fg_color=("#f5f5f5", "#1a1a1a"))
         self.txt.pack(fill='both', expand=True, padx=0, pady=0)
 
         self.view_appointments()
@@ -128,10 +169,12 @@ class AppointmentsFrame(ctk.CTkFrame):
             self.day_combo.configure(values=[str(i) for i in range(1, 32)])
 
     def get_patients_list(self):
+        self.patients_partial = False
         try:
-            patients = self.patient_manager.list_patients()
+            patients = self.patient_manager.list_patients(limit=AUTOCOMPLETE_PRELOAD_LIMIT)
             if not patients:
                 return ['No patients found']
+            self.patients_partial = len(patients) >= AUTOCOMPLETE_PRELOAD_LIMIT
             patient_list = []
             for p in patients:
                 display = f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']}"
@@ -140,6 +183,14 @@ class AppointmentsFrame(ctk.CTkFrame):
         except:
             return ['Error loading patients']
 
+    def search_patients(self, term, limit):
+        """Server-side lookup for patients outside the preloaded slice."""
+        try:
+            patients = self.patient_manager.search_patients(term, limit)
+            return [f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']}" for p in patients]
+        except Exception:
+            return []
+
     def get_doctors_list(self):
         try:
             doctors = self.doctor_manager.list_doctors()
@@ -153,9 +204,10 @@ class AppointmentsFrame(ctk.CTkFrame):
         except:
             return ['Error loading doctors']
 
-    def get_appointments_list(self):
+    def get_appointments_list(self, appointments=None):
         try:
-            appointments = self.manager.list_appointments()
+            if appointments is None:
+                appointments = self.week_cache.get(self.current_week)
             if not appointments:
                 return ['No appointments found']
             appt_list = []
@@ -171,6 +223,46 @@ class AppointmentsFrame(ctk.CTkFrame):
         except:
             return ['Error loading appointments']
 
+    def find_free_slots(self):
+        try:
+            doctor_selection = self.doctor_combo.get().strip()
+            doctor_id = None
+            if doctor_selection and self.doctor_combo.has_item(doctor_selection):
+                doctor_id = doctor_selection.split(':')[0].strip()
+
+            slots = self.slot_engine.next_free_slots(doctor_id=doctor_id, count=FREE_SLOT_SUGGESTIONS)
+            doctors = {d['Doctor_ID']: d['Name'] for d in self.doctor_manager.list_doctors()}
+            self.free_slots = {}
+            for slot_doctor, day, time in slots:
+                display = f"{day} {time} - {slot_doctor}: {doctors.get(slot_doctor, '')}"
+                self.free_slots[display] = (slot_doctor, day, time)
+
+            values = list(self.free_slots) or ['No free slots found']
+            self.free_slot_combo.configure(values=values)
+            self.free_slot_combo.set(values[0])
+            if self.free_slots:
+                self.apply_free_slot(values[0])
+        except Exception as e:
+            messagebox.showerror('Error', f'Failed to find free slots: {str(e)}')
+
+    def apply_free_slot(self, selection=None):
+        """Copies a suggested slot into the doctor, date and time pickers."""
+        slot = self.free_slots.get(selection or self.free_slot_combo.get())
+        if not slot:
+            return
+        doctor_id, day, time = slot
+        for item in self.get_doctors_list():
+            if item.split(':')[0].strip() == str(doctor_id):
+                self.doctor_combo.set(item)
+                break
+        self.year_var.set(str(day.year))
+        self.month_var.set(calendar.month_name[day.month])
+        self.update_days()
+        self.day_var.set(str(day.day))
+        hour, minute = time.split(':')
+        self.hour_var.set(hour)
+        self.minute_var.set(minute)
+
     def schedule_appointment(self):
         try:
             patient_selection = self.patient_combo.get().strip()
@@ -180,6 +272,10 @@ class AppointmentsFrame(ctk.CTkFrame):
                 messagebox.showerror('Validation Error', 'Please select both a patient and a doctor.')
                 return
 
+            if not self.patient_combo.has_item(patient_selection) or not self.doctor_combo.has_item(doctor_selection):
+                messagebox.showerror('Validation Error', 'Please pick the patient and doctor from the suggestions.')
+                return
+
             patient_id = patient_selection.split(':')[0].strip()
             doctor_id = doctor_selection.split(':')[0].strip()
 
@@ -187,13 +283,15 @@ class AppointmentsFrame(ctk.CTkFrame):
             month_name = self.month_var.get()
             month_num = list(calendar.month_name).index(month_name)
             day = self.day_var.get()
-            date_str = f"{year}-{month_num:02d}-{day:02s}"
+            date_str = f"{year}-{month_num:02d}-{int(day):02d}"
 
             hour = self.hour_var.get()
             minute = self.minute_var.get()
             time_str = f"{hour}:{minute}"
 
             self.manager.schedule(patient_id, doctor_id, date_str, time_str)
+            if self.slot_engine:
+                self.slot_engine.invalidate()
             messagebox.showinfo('Success', 'Appointment scheduled successfully')
             self.view_appointments()
         except ValueError as ve:
@@ -202,11 +300,22 @@ class AppointmentsFrame(ctk.CTkFrame):
             messagebox.showerror('Error', str(e))
 
     def view_appointments(self):
+        """Drops the cached weeks whose appointments changed since the last call, then redraws."""
+        try:
+            days, self.changes_since = self.manager.changed_days_since(self.changes_since)
+            self.week_cache.invalidate(days)
+        except Exception:
+            self.week_cache.invalidate()
+        self.show_week()
+
+    def show_list(self, appointments, start, end):
+        """Fills the list tab and the cancel/done dropdowns with the week's appointments."""
+        self.list_title.configure(text=f"Appointments {start.strftime('%b %d')} - {end.strftime('%b %d, %Y')}")
         try:
-            appointments = self.manager.list_appointments()
             self.txt.delete('1.0', 'end')
+            self.update_appointment_dropdowns(appointments)
             if not appointments:
-                self.txt.insert('end', 'No appointments scheduled.')
+                self.txt.insert('end', 'No appointments this week.')
                 return
 
             header = f"{'ID':<5} {'Patient ID':<12} {'Doctor ID':<12} {'Date':<15} {'Time':<10} {'Status':<15}\n"
@@ -222,16 +331,83 @@ class AppointmentsFrame(ctk.CTkFrame):
                 status = appt.get('Status', 'N/A')
                 
                 self.txt.insert('end', f"{appt_id:<5} {patient_id:<12} {doctor_id:<12} {date:<15} {time:<10} {status:<15}\n")
-            
-            self.update_appointment_dropdowns()
         except Exception as e:
             messagebox.showerror('Error', f'Failed to load appointments: {str(e)}')
             self.txt.delete('1.0', 'end')
             self.txt.insert('end', f'Error: {str(e)}')
 
-    def update_appointment_dropdowns(self):
+    def show_week(self):
+        """Renders the current week from the cache and prefetches its neighbours."""
+        start = self.current_week
+        end = start + timedelta(days=6)
+        self.week_label.configure(text=f"{start.strftime('%b %d')} - {end.strftime('%b %d, %Y')}")
+        for widget in self.week_grid.winfo_children():
+            widget.destroy()
+
+        try:
+            rows = self.week_cache.get(start)
+        except Exception as e:
+            ctk.CTkLabel(self.week_grid, text=f'Error loading week: {str(e)}').grid(row=0, column=0, sticky='w')
+            self.txt.delete('1.0', 'end')
+            self.txt.insert('end', f'Error: {str(e)}')
+            return
+        finally:
+            self.week_cache.prefetch(start - timedelta(days=7), start + timedelta(days=7))
+        self.show_list(rows, start, end)
+
+        cells = {}
+        for appt in rows:
+            if appt['Status'] == 'Cancelled':
+                continue
+            mark = '✓ ' if appt['Status'] == 'Done' else ''
+            time = str(appt['Appointment_Time'])[:-3]
+            cells.setdefault((appt['Doctor_ID'], appt['Appointment_Date']), []).append(
+                f"{mark}{time} {appt.get('Patient_Name') or appt['Patient_ID']}")
+
+        ctk.CTkLabel(self.week_grid, text='Doctor', font=('Segoe UI', 11, 'bold')).grid(row=0, column=0, padx=4, pady=4, sticky='w')
+        for col in range(7):
+            day = start + timedelta(days=col)
+            color = ("#27ae60", "#1e8449") if day == date.today() else None
+            ctk.CTkLabel(self.week_grid, text=day.strftime('%a %d'), font=('Segoe UI', 11, 'bold'),
+                         text_color=color).grid(row=0, column=col + 1, padx=4, pady=4)
+            self.week_grid.grid_columnconfigure(col + 1, weight=1)
+
+        doctors = {d['Doctor_ID']: d['Name'] for d in self.doctor_manager.list_doctors()}
+        booked_doctors = sorted({doctor_id for doctor_id, _ in cells}, key=lambda d: doctors.get(d, ''))
+        if not booked_doctors:
+            ctk.CTkLabel(self.week_grid, text='No appointments this week.').grid(row=1, column=0, columnspan=8, pady=20)
+            return
+
+        for row, doctor_id in enumerate(booked_doctors, start=1):
+            ctk.CTkLabel(self.week_grid, text=doctors.get(doctor_id, f'Doctor {doctor_id}'), font=('Segoe UI', 11, 'bold'),
+                         anchor='w').grid(row=row, column=0, padx=4, pady=4, sticky='nw')
+            for col in range(7):
+                entries = cells.get((doctor_id, start + timedelta(days=col)), [])
+                text = '\n'.join(entries[:CALENDAR_CELL_MAX_ENTRIES])
+                if len(entries) > CALENDAR_CELL_MAX_ENTRIES:
+                    text += f"\n+{len(entries) - CALENDAR_CELL_MAX_ENTRIES} more"
+                ctk.CTkLabel(self.week_grid, text=text, font=('Segoe UI', 10), justify='left', anchor='nw',
+                             fg_color=("white", "#0f0f0f") if entries else "transparent",
+                             corner_radius=4).grid(row=row, column=col + 1, padx=2, pady=2, sticky='nsew')
+
+    def change_week(self, step):
+        self.current_week += timedelta(days=7 * step)
+        self.show_week()
+
+    def go_to_today(self):
+        self.current_week = week_start(date.today())
+        self.show_week()
+
+    def pick_week(self):
+        picker = DatePicker(self, title='Go to Week', density_loader=self.manager.count_by_day)
+        self.wait_window(picker)
+        if picker.selected_date:
+            self.current_week = week_start(picker.selected_date.date())
+            self.show_week()
+
+    def update_appointment_dropdowns(self, appointments=None):
         try:
-            appt_list = self.get_appointments_list()
+            appt_list = self.get_appointments_list(appointments)
             if hasattr(self, 'delete_combo'):
                 self.delete_combo.configure(values=appt_list)
                 if appt_list and 'No appointments' not in appt_list[0]:
@@ -285,7 +461,30 @@ class AppointmentsFrame(ctk.CTkFrame):
         except Exception as e:
             messagebox.showerror('Error', str(e))
 
+    def on_data_changed(self, tables):
+        """Change feed callback: refetch only what changed, and only while visible."""
+        self.pending_tables |= tables
+        if self.winfo_ismapped():
+            self.apply_pending_changes()
+
+    def apply_pending_changes(self):
+        tables, self.pending_tables = self.pending_tables, set()
+        if self.slot_engine and tables & {'appointments', 'doctors', 'doctor_availability'}:
+            self.slot_engine.invalidate()
+        if 'patients' in tables:
+            self.patient_combo.set_items(self.get_patients_list(), partial=self.patients_partial)
+        if 'doctors' in tables:
+            self.doctor_combo.set_items(self.get_doctors_list())
+        if 'appointments' in tables:
+            # Only the weeks with changed bookings are reloaded
+            self.view_appointments()
+        elif 'patients' in tables or 'doctors' in tables:
+            # Names shown in the calendar
+            self.week_cache.invalidate()
+            self.show_week()
+
     def pack(self, *args, **kwargs):
-        """Override pack to refresh data when the frame is shown."""
-        self.view_appointments()
+        """Override pack to bring the data up to date when the frame is shown."""
+        if self.pending_tables:
+            self.apply_pending_changes()
         super().pack(*args, **kwargs)
\ No newline at end of file
@@ -1,9 +1,23 @@
 import customtkinter as ctk
 
 class DashboardFrame(ctk.CTkFrame):
+    # Card -> tables whose changes can move its number
+    CARD_TABLES = {
+        'patient_card': {'patients'},
+        'doctor_card': {'doctors'},
+        'appointment_card': {'appointments'},
+        'sales_card': {'sales'},
+        'inventory_card': {'inventory'},
+        'reminders_card': {'appointment_reminders', 'patients', 'appointments'},
+        'recalls_card': {'patient_recalls'},
+        'low_stock_card': {'low_stock_alerts'},
+    }
+    WATCHED_TABLES = set().union(*CARD_TABLES.values())
+
     def __init__(self, master, managers, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
         self.managers = managers
+        self.pending_tables = set()
         self.build()
         self.refresh_stats()
 
@@ -25,7 +39,7 @@ class DashboardFrame(ctk.CTkFrame):
 
         # Grid layout for stats
         stats_container.grid_columnconfigure((0, 1, 2), weight=1)
-        stats_container.grid_rowconfigure((0, 1), weight=1)
+        stats_container.grid_rowconfigure((0, 1, 2), weight=1)
 
         # Stat cards
         self.patient_card = self.create_stat_card(stats_container, "Today's Patients", "0", "👥")
@@ -46,6 +60,12 @@ class DashboardFrame(ctk.CTkFrame):
         self.reminders_card = self.create_stat_card(stats_container, "Pending Reminders", "0", "🔔")
         self.reminders_card.grid(row=1, column=2, padx=10, pady=10, sticky="nsew")
 
+        self.recalls_card = self.create_stat_card(stats_container, "Recalls Due", "0", "👓")
+        self.recalls_card.grid(row=2, column=0, padx=10, pady=10, sticky="nsew")
+
+        self.low_stock_card = self.create_stat_card(stats_container, "Low Stock Items", "0", "⚠️")
+        self.low_stock_card.grid(row=2, column=1, padx=10, pady=10, sticky="nsew")
+
 
     def create_stat_card(self, parent, title, initial_value, icon):
         card = ctk.CTkFrame(parent, fg_color=("#f0f0f0", "#1a1a1a"), corner_radius=10)
@@ -62,32 +82,23 @@ class DashboardFrame(ctk.CTkFrame):
         card.value_label = value_label 
         return card
 
-    def refresh_stats(self):
+    def refresh_stats(self, tables=None):
+        """Recounts the cards affected by ``tables`` (all cards when None)."""
+        counters = {
+            'patient_card': self.managers['pm'].count_patients_today,
+            'doctor_card': self.managers['dm'].count_doctors,
+            'appointment_card': self.managers['am'].count_appointments,
+            'sales_card': self.managers['sm'].count_sales,
+            'inventory_card': self.managers['im'].count_items,
+            'reminders_card': self.managers['rem_m'].count_pending_reminders,
+            'recalls_card': self.managers['recall_m'].count_pending,
+            'low_stock_card': self.managers['sm'].count_low_stock,
+        }
         try:
-            # Patients registered today
-            patients_today = self.managers['pm'].count_patients_today()
-            self.patient_card.value_label.configure(text=str(patients_today))
-
-            # Total doctors
-            doctors_count = len(self.managers['dm'].list_doctors())
-            self.doctor_card.value_label.configure(text=str(doctors_count))
-
-            # Total appointments
-            appointments_count = len(self.managers['am'].list_appointments())
-            self.appointment_card.value_label.configure(text=str(appointments_count))
-
-            # Total sales
-            sales = self.managers['sm'].get_all_sales()
-            sales_count = len(sales) if sales else 0
-            self.sales_card.value_label.configure(text=str(sales_count))
-
-            # Total inventory items
-            inventory_count = len(self.managers['im'].list_items())
-            self.inventory_card.value_label.configure(text=str(inventory_count))
-
-            # Pending reminders
-            reminders_count = len(self.managers['rem_m'].get_pending_reminders())
-            self.reminders_card.value_label.configure(text=str(reminders_count))
+            for card_name, count in counters.items():
+                if tables is None or self.CARD_TABLES[card_name] & tables:
+                    getattr(self, card_name).value_label.configure(text=str(count()))
+            self.pending_tables.clear()
 
         except Exception as e:
             print(f"Error refreshing dashboard stats: {e}")
@@ -95,6 +106,13 @@ class DashboardFrame(ctk.CTkFrame):
             error_label = ctk.CTkLabel(self, text=f"Failed to load stats: {e}", text_color="red")
             error_label.pack()
 
+    def on_data_changed(self, tables):
+        """Change feed callback; hidden dashboards just remember what to recount."""
+        self.pending_tables |= tables
+        if self.winfo_ismapped():
+            self.refresh_stats(set(self.pending_tables))
+
     def pack(self, *args, **kwargs):
-        self.refresh_stats()
+        if self.pending_tables:
+            self.refresh_stats(set(self.pending_tables))
         super().pack(*args, **kwargs)
\ No newline at end of file
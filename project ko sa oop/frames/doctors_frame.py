@@ -1,11 +1,14 @@
 import customtkinter as ctk
+import calendar
 from tkinter import messagebox
 from utils.alert_system import AlertSystem
+from utils.constants import DEFAULT_WORK_START, DEFAULT_WORK_END, DEFAULT_SLOT_MINUTES
 
 class DoctorsFrame(ctk.CTkFrame):
-    def __init__(self, master, manager, *args, **kwargs):
+    def __init__(self, master, manager, availability_manager=None, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
         self.manager = manager
+        self.availability_manager = availability_manager
         self.build()
     
     def build(self):
@@ -72,6 +75,29 @@ class DoctorsFrame(ctk.CTkFrame):
         self.delete_id.pack(fill='x', pady=(0, 10))
         ctk.CTkButton(frm, text='🗑️ Delete Doctor', command=self.delete_doctor, height=40, font=('Segoe UI', 12, 'bold'), fg_color=("#e74c3c", "#c0392b")).pack(fill='x', pady=5)
         
+        # Working hours section
+        if self.availability_manager:
+            ctk.CTkLabel(frm, text='Working Hours', font=('Segoe UI', 12, 'bold')).pack(anchor='w', pady=(15, 3))
+            self.hours_doctor_id = ctk.CTkEntry(frm, placeholder_text='Doctor ID', height=35, font=('Segoe UI', 12))
+            self.hours_doctor_id.pack(fill='x', pady=(0, 5))
+            self.hours_weekday = ctk.CTkComboBox(frm, values=list(calendar.day_name), state='readonly', height=35, font=('Segoe UI', 12))
+            self.hours_weekday.set(calendar.day_name[0])
+            self.hours_weekday.pack(fill='x', pady=(0, 5))
+            
+            hours_frm = ctk.CTkFrame(frm, fg_color=("transparent"))
+            hours_frm.pack(fill='x', pady=(0, 5))
+            self.hours_start = ctk.CTkEntry(hours_frm, placeholder_text=DEFAULT_WORK_START, width=80, height=35, font=('Segoe UI', 12))
+            self.hours_start.pack(side='left', fill='x', expand=True, padx=(0, 5))
+            self.hours_end = ctk.CTkEntry(hours_frm, placeholder_text=DEFAULT_WORK_END, width=80, height=35, font=('Segoe UI', 12))
+            self.hours_end.pack(side='left', fill='x', expand=True, padx=5)
+            self.hours_slot = ctk.CTkComboBox(hours_frm, values=['10', '15', '20', '30', '45', '60'], width=70, height=35, font=('Segoe UI', 12))
+            self.hours_slot.set(str(DEFAULT_SLOT_MINUTES))
+            self.hours_slot.pack(side='left', padx=(5, 0))
+            
+            ctk.CTkButton(frm, text='💾 Save Hours', command=self.save_hours, height=40, font=('Segoe UI', 12, 'bold'), fg_color=("#27ae60", "#1e8449")).pack(fill='x', pady=5)
+            ctk.CTkButton(frm, text='🚫 Mark Day Off', command=self.clear_hours, height=40, font=('Segoe UI', 12, 'bold'), fg_color=("#f39c12", "#d68910")).pack(fill='x', pady=5)
+            ctk.CTkButton(frm, text='🕒 View Hours', command=self.view_hours, height=40, font=('Segoe UI', 12, 'bold')).pack(fill='x', pady=5)
+        
         # Right panel - Display
         right = ctk.CTkFrame(main, fg_color=("white", "#0f0f0f"))
         right.pack(side='right', fill='both', expand=True, padx=15, pady=15)
@@ -157,6 +183,49 @@ class DoctorsFrame(ctk.CTkFrame):
         if matched == 0:
             self.txt.insert('end', f"No doctors found matching '{query}'")
     
+    def save_hours(self):
+        try:
+            doctor_id = self.hours_doctor_id.get().strip()
+            if not doctor_id:
+                AlertSystem.error('Validation Error', 'Doctor ID is required')
+                return
+            weekday = list(calendar.day_name).index(self.hours_weekday.get())
+            start = self.hours_start.get().strip() or DEFAULT_WORK_START
+            end = self.hours_end.get().strip() or DEFAULT_WORK_END
+            self.availability_manager.set_availability(doctor_id, weekday, start, end, self.hours_slot.get())
+            AlertSystem.success('Success', f'{calendar.day_name[weekday]} hours saved for doctor {doctor_id}')
+            self.view_hours()
+        except Exception as e:
+            AlertSystem.error('Error', str(e))
+    
+    def clear_hours(self):
+        try:
+            doctor_id = self.hours_doctor_id.get().strip()
+            if not doctor_id:
+                AlertSystem.error('Validation Error', 'Doctor ID is required')
+                return
+            weekday = list(calendar.day_name).index(self.hours_weekday.get())
+            self.availability_manager.clear_day(doctor_id, weekday)
+            self.view_hours()
+        except Exception as e:
+            AlertSystem.error('Error', str(e))
+    
+    def view_hours(self):
+        doctor_id = self.hours_doctor_id.get().strip()
+        if not doctor_id:
+            AlertSystem.error('Validation Error', 'Doctor ID is required')
+            return
+        rows = self.availability_manager.get_availability(doctor_id)
+        self.txt.delete('1.0', 'end')
+        if not rows:
+            self.txt.insert('end', f"Doctor {doctor_id} uses the clinic default hours ({DEFAULT_WORK_START}-{DEFAULT_WORK_END}, Mon-Sat, {DEFAULT_SLOT_MINUTES} min slots)\n")
+            return
+        for r in rows:
+            if r['End_Time'] == r['Start_Time']:
+                self.txt.insert('end', f"{calendar.day_name[r['Weekday']]:<10} | Day off\n")
+                continue
+            self.txt.insert('end', f"{calendar.day_name[r['Weekday']]:<10} | {r['Start_Time']} - {r['End_Time']} | {r['Slot_Minutes']} min slots\n")
+    
     def view_archive(self):
         rows=self.manager.list_archived(); self.txt.delete('1.0','end')
         for r in rows: self.txt.insert('end', f"{r['Doctor_ID']} | {r['Name']} | Deleted: {r['Deleted_On']}\n")
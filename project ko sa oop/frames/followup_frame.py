@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 from utils.logger import setup_logging
 from utils.constants import *
 from utils.ui_constants import *
+from utils.autocomplete import AutocompleteCombobox
 
 logger = setup_logging(__name__)
 
@@ -19,6 +20,7 @@ class FollowUpFrame(ctk.CTkFrame):
         self.pm = managers.get('pm')
         self.dm = managers.get('dm')
         self.am = managers.get('am')
+        self.recall_m = managers.get('recall_m')
         self.doctors_list = []
         self.patients_dict = {}
         
@@ -48,7 +50,8 @@ class FollowUpFrame(ctk.CTkFrame):
         # Patient selection
         ctk.CTkLabel(frm, text='Select Patient *', font=FONT_LABEL_BOLD).pack(anchor='w', pady=(PADDING_SMALL, 3))
         self.patient_list = self.get_patients_list()
-        self.patient_combo = ctk.CTkComboBox(frm, values=self.patient_list, state='readonly', height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL, command=self.on_patient_selected)
+        self.patient_combo = AutocompleteCombobox(frm, search=self.search_patients, height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL, command=self.on_patient_selected)
+        self.patient_combo.set_items(self.patient_list, partial=len(self.patients_dict) >= AUTOCOMPLETE_PRELOAD_LIMIT)
         self.patient_combo.pack(fill='x', pady=(0, 10))
         
         # Patient info
@@ -70,7 +73,8 @@ class FollowUpFrame(ctk.CTkFrame):
         # Doctor selection
         ctk.CTkLabel(frm, text='Preferred Doctor *', font=FONT_LABEL_BOLD).pack(anchor='w', pady=(PADDING_SMALL, 3))
         self.doctors_list = self.get_doctors_list()
-        self.doctor_combo = ctk.CTkComboBox(frm, values=self.doctors_list, state='readonly', height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL)
+        self.doctor_combo = AutocompleteCombobox(frm, height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL)
+        self.doctor_combo.set_items(self.doctors_list)
         self.doctor_combo.pack(fill='x', pady=(0, 10))
         
         # Notes
@@ -90,6 +94,13 @@ class FollowUpFrame(ctk.CTkFrame):
         self.list_textbox = ctk.CTkTextbox(right, font=FONT_MONO_SMALL, fg_color=COLOR_TEXT_BG)
         self.list_textbox.pack(fill='both', expand=True, padx=PADDING_LARGE, pady=PADDING_SMALL)
         
+        # Close a recall once the patient has been contacted
+        close_frm = ctk.CTkFrame(right, fg_color="transparent")
+        close_frm.pack(fill='x', padx=PADDING_LARGE, pady=(0, PADDING_SMALL))
+        self.recall_id = ctk.CTkEntry(close_frm, placeholder_text='Recall #', width=100, height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL)
+        self.recall_id.pack(side='left', padx=(0, PADDING_SMALL))
+        ctk.CTkButton(close_frm, text=f'{ICON_CHECK} Mark Contacted', command=self.close_recall, height=ENTRY_HEIGHT, font=FONT_BUTTON, fg_color=BTN_WARNING).pack(side='left', fill='x', expand=True)
+        
         # Refresh button
         ctk.CTkButton(right, text='Refresh List', command=self.load_followups, height=BUTTON_HEIGHT, font=FONT_BUTTON, fg_color=BTN_INFO).pack(fill='x', padx=PADDING_LARGE, pady=(0, PADDING_NORMAL))
         
@@ -97,22 +108,31 @@ class FollowUpFrame(ctk.CTkFrame):
     
     def get_patients_list(self):
         try:
-            patients = self.pm.list_patients()
+            patients = self.pm.list_patients(limit=AUTOCOMPLETE_PRELOAD_LIMIT)
             if not patients:
                 return ['No patients found']
             
-            patient_list = []
             self.patients_dict = {}
-            for p in patients:
-                display_name = f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']} ({p['Age']})"
-                patient_list.append(display_name)
-                self.patients_dict[display_name] = p
-            
-            return patient_list
+            return self._register_patients(patients)
         except Exception as e:
             logger.error(f"Error getting patients list: {e}")
             return ['Error loading patients']
     
+    def _register_patients(self, patients):
+        patient_list = []
+        for p in patients:
+            display_name = f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']} ({p['Age']})"
+            patient_list.append(display_name)
+            self.patients_dict[display_name] = p
+        return patient_list
+    
+    def search_patients(self, term, limit):
+        try:
+            return self._register_patients(self.pm.search_patients(term, limit))
+        except Exception as e:
+            logger.error(f"Error searching patients: {e}")
+            return []
+    
     def get_doctors_list(self):
         try:
             doctors = self.dm.list_doctors()
@@ -126,6 +146,9 @@ class FollowUpFrame(ctk.CTkFrame):
             if selected and selected in self.patients_dict:
                 patient = self.patients_dict[selected]
                 patient_info = f"Patient: {patient['Surname']}, {patient['FirstName']}\nID: {patient['Patient_ID']}\nAge: {patient['Age']} | {patient['Gender']}\nContact: {patient['Contact']}"
+                recalls = self.recall_m.get_patient_recalls(patient['Patient_ID'], source='followup')
+                if recalls:
+                    patient_info += f"\nFollow-up due: {recalls[0]['Due_Date']} ({recalls[0]['Reason']})"
                 self.patient_info.configure(text=patient_info)
         except Exception as e:
             logger.error(f"Error selecting patient: {e}")
@@ -135,7 +158,7 @@ class FollowUpFrame(ctk.CTkFrame):
             patient_sel = self.patient_combo.get()
             followup_type = self.followup_type.get()
             days_str = self.followup_days.get()
-            doctor_name = self.doctor_combo.get()
+            doctor_name = self.doctor_combo.get().strip()
             notes = self.notes.get('1.0', 'end-1c').strip()
             
             if not all([patient_sel, followup_type, days_str, doctor_name]):
@@ -155,7 +178,7 @@ class FollowUpFrame(ctk.CTkFrame):
                     doctor_id = doc['Doctor_ID']
                     break
             
-            if not doctor_id:
+            if not doctor_id or not self.doctor_combo.has_item(doctor_name):
                 self.show_error('Error', 'Invalid doctor selection')
                 return
 
@@ -169,6 +192,10 @@ class FollowUpFrame(ctk.CTkFrame):
                 date=appointment_date,
                 time=appointment_time
             )
+            # Only the follow-up shown for this patient is booked; recalls from their other records stay queued
+            recalls = self.recall_m.get_patient_recalls(patient['Patient_ID'], source='followup')
+            if recalls:
+                self.recall_m.close(recalls[0]['Recall_ID'], status='Scheduled')
          
             self.show_success('Success', f'Follow-up scheduled!\n\nPatient: {patient["Surname"]}, {patient["FirstName"]}\nType: {followup_type}\nDate: {appointment_date}\nDoctor: {doctor_name}')
         
@@ -186,8 +213,38 @@ class FollowUpFrame(ctk.CTkFrame):
             logger.error(f"Error scheduling follow-up: {e}")
             self.show_error('Error', f'Failed to schedule: {str(e)}')
     
+    def close_recall(self):
+        try:
+            recall_id = self.recall_id.get().strip().lstrip('#')
+            if not recall_id.isdigit():
+                self.show_error('Validation Error', 'Enter the recall number shown in the list')
+                return
+            if not self.recall_m.close(int(recall_id)):
+                self.show_error('Error', f'Recall #{recall_id} is not pending')
+                return
+            self.recall_id.delete(0, 'end')
+            self.load_followups()
+        except Exception as e:
+            logger.error(f"Error closing recall: {e}")
+            self.show_error('Error', f'Failed to close recall: {str(e)}')
+    
     def load_followups(self):
         self.list_textbox.delete('1.0', 'end')
+        try:
+            due = self.recall_m.list_due(source='followup')
+            if due:
+                self.list_textbox.insert('end', f'DUE FOR FOLLOW-UP ({len(due)}):\n' + '='*50 + '\n')
+                for recall in due:
+                    self.list_textbox.insert('end', f"#{recall['Recall_ID']}  {recall['Due_Date']}  {recall['Name']}  {recall['Contact'] or ''}\n  {recall['Reason']}\n")
+                self.list_textbox.insert('end', '\n')
+            expiring = self.recall_m.list_due(source='prescription', within_days=PRESCRIPTION_EXPIRY_WARNING_DAYS)
+            if expiring:
+                self.list_textbox.insert('end', f'PRESCRIPTIONS EXPIRING ({len(expiring)}):\n' + '='*50 + '\n')
+                for recall in expiring:
+                    self.list_textbox.insert('end', f"#{recall['Recall_ID']}  {recall['Due_Date']}  {recall['Name']}  {recall['Contact'] or ''}\n")
+                self.list_textbox.insert('end', '\n')
+        except Exception as e:
+            logger.error(f"Error loading due recalls: {e}")
         try:
             appointments = self.am.list_appointments()
             if not appointments:
@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from tkinter import messagebox
+from backend.analytics import inventory_valuation
 
 class InventoryFrame(ctk.CTkFrame):
     def __init__(self, master, manager, *args, **kwargs):
@@ -50,15 +51,29 @@ class InventoryFrame(ctk.CTkFrame):
         
         ctk.CTkLabel(frm, text='Price (₱)', font=('Segoe UI', 12, 'bold')).pack(anchor='w', pady=(10, 3))
         self.price = ctk.CTkEntry(frm, placeholder_text='Price', height=35, font=('Segoe UI', 12))
-        self.price.pack(fill='x', pady=(0, 20))
+        self.price.pack(fill='x', pady=(0, 10))
+        
+        ctk.CTkLabel(frm, text='Supplier', font=('Segoe UI', 12, 'bold')).pack(anchor='w', pady=(10, 3))
+        self.supplier = ctk.CTkEntry(frm, placeholder_text='Supplier (optional)', height=35, font=('Segoe UI', 12))
+        self.supplier.pack(fill='x', pady=(0, 20))
         
         btn_frm = ctk.CTkFrame(frm, fg_color=("transparent"))
         btn_frm.pack(fill='x', pady=10)
         
         ctk.CTkButton(btn_frm, text='➕ Add Item', command=self.add, height=40, font=('Segoe UI', 12, 'bold'), fg_color=("#27ae60", "#1e8449")).pack(fill='x', pady=5)
         ctk.CTkButton(btn_frm, text='👁️ View Items', command=self.view, height=40, font=('Segoe UI', 12, 'bold')).pack(fill='x', pady=5)
+        ctk.CTkButton(btn_frm, text='🚚 Reorder List', command=self.view_reorder_list, height=40, font=('Segoe UI', 12, 'bold'), fg_color=("#2980b9", "#1f618d")).pack(fill='x', pady=5)
+        ctk.CTkButton(btn_frm, text='⚠️ Low Stock', command=self.view_low_stock, height=40, font=('Segoe UI', 12, 'bold'), fg_color=("#e67e22", "#ca6f1e")).pack(fill='x', pady=5)
         ctk.CTkButton(btn_frm, text='📑 View Archive', command=self.view_archive, height=40, font=('Segoe UI', 12, 'bold'), fg_color=("#f39c12", "#d68910")).pack(fill='x', pady=5)
         
+        # Reorder point
+        ctk.CTkLabel(frm, text='Reorder Point', font=('Segoe UI', 14, 'bold')).pack(anchor='w', pady=(20, 3))
+        self.reorder_id = ctk.CTkEntry(frm, placeholder_text='Item ID', height=35, font=('Segoe UI', 12))
+        self.reorder_id.pack(fill='x', pady=(0, 10))
+        self.reorder_point = ctk.CTkEntry(frm, placeholder_text='Alert below this many units', height=35, font=('Segoe UI', 12))
+        self.reorder_point.pack(fill='x', pady=(0, 10))
+        ctk.CTkButton(frm, text='🔔 Set Reorder Point', command=self.set_reorder_point, height=40, font=('Segoe UI', 12, 'bold')).pack(fill='x', pady=5)
+        
         # Right panel
         right = ctk.CTkFrame(main, fg_color=("white", "#0f0f0f"))
         right.pack(side='right', fill='both', expand=True, padx=15, pady=15)
@@ -95,17 +110,19 @@ class InventoryFrame(ctk.CTkFrame):
                 messagebox.showerror('Invalid','Quantity must be a number and Price must be numeric')
                 return
             
-            self.manager.add_item(name, category, q, p, '')
+            self.manager.add_item(name, category, q, p, self.supplier.get().strip())
             messagebox.showinfo('OK','Item added')
             self.name.delete(0, 'end')
             self.category.set('Lenses')
             self.qty.delete(0, 'end')
             self.price.delete(0, 'end')
+            self.supplier.delete(0, 'end')
             self.view()
         except Exception as e:
             messagebox.showerror('Error', str(e))
     def view(self):
         try:
+            self.manager.invalidate_cache()
             rows = self.manager.list_items()
             self.txt.delete('1.0', 'end')
             
@@ -120,6 +137,13 @@ class InventoryFrame(ctk.CTkFrame):
                 if category not in categories:
                     categories[category] = []
                 categories[category].append(item)
+
+            # Stock value per category and overall, computed column-wise
+            totals = inventory_valuation([item.get('Quantity_On_Hand') or 0 for item in rows],
+                                         [item.get('Unit_Price') or 0 for item in rows],
+                                         [str(item.get('Category', 'Unknown')) for item in rows],
+                                         [item['Reorder_Point'] for item in rows])
+            valuation = {c['Category']: c for c in totals['categories']}
             
             # Display header
             self.txt.insert('end', '='*70 + '\n')
@@ -142,27 +166,101 @@ class InventoryFrame(ctk.CTkFrame):
                     
                     # Color code low stock
                     stock_display = f"{stock} pcs"
-                    if stock < 10:
+                    if stock < item['Reorder_Point']:
                         stock_display += " ⚠️"
                     
                     self.txt.insert('end', f'{item_id:<5} {name:<30} {stock_display:<10} ₱{price:<9.2f}\n')
                 
                 # Category summary
-                total_items = len(items)
-                total_stock = sum(item.get('Quantity_On_Hand', 0) for item in items)
-                self.txt.insert('end', f'\nCategory Total: {total_items} items, {total_stock} units in stock\n')
+                summary = valuation[str(category)]
+                self.txt.insert('end', f"\nCategory Total: {summary['Items']} items, {summary['Units']} units in stock, ₱{summary['Value']:,.2f}\n")
             
             # Grand total
             self.txt.insert('end', '\n' + '='*70 + '\n')
-            total_items = len(rows)
-            total_stock = sum(item.get('Quantity_On_Hand', 0) for item in rows)
-            total_value = sum(item.get('Quantity_On_Hand', 0) * item.get('Unit_Price', 0) for item in rows)
-            self.txt.insert('end', f'GRAND TOTAL: {total_items} items | {total_stock} units | ₱{total_value:,.2f}\n')
+            self.txt.insert('end', f"GRAND TOTAL: {totals['items']} items | {totals['units']} units | ₱{totals['value']:,.2f}\n")
             self.txt.insert('end', '='*70 + '\n')
             
         except Exception as e:
             self.txt.delete('1.0', 'end')
             self.txt.insert('end', f'Error loading inventory: {str(e)}')
+    def set_reorder_point(self):
+        try:
+            item_id = int(self.reorder_id.get().strip())
+            reorder_point = int(self.reorder_point.get().strip())
+        except ValueError:
+            messagebox.showerror('Invalid', 'Item ID and reorder point must be whole numbers')
+            return
+        try:
+            self.manager.set_reorder_point(item_id, reorder_point)
+            messagebox.showinfo('OK', f'Item #{item_id} now alerts below {reorder_point} units')
+            self.reorder_id.delete(0, 'end')
+            self.reorder_point.delete(0, 'end')
+            self.view()
+        except Exception as e:
+            messagebox.showerror('Error', str(e))
+    def view_low_stock(self):
+        try:
+            rows = self.manager.list_low_stock()
+            self.txt.delete('1.0', 'end')
+            
+            if not rows:
+                self.txt.insert('end', 'No items are below their reorder point.')
+                return
+            
+            self.txt.insert('end', '='*70 + '\n')
+            self.txt.insert('end', 'LOW STOCK (below reorder point)\n')
+            self.txt.insert('end', '='*70 + '\n')
+            self.txt.insert('end', f'{"ID":<5} {"Item Name":<30} {"Category":<18} {"Stock":>6} {"Reorder":>8}\n')
+            self.txt.insert('end', '-'*70 + '\n')
+            for item in rows:
+                name = (item.get('name') or 'Unknown')[:28]
+                category = (item.get('category') or '')[:16]
+                self.txt.insert('end', f"{item['Product_ID']:<5} {name:<30} {category:<18} {item['Quantity']:>6} {item['Reorder_Point']:>8}\n")
+            self.txt.insert('end', '\n' + '='*70 + '\n')
+            self.txt.insert('end', f"{len(rows)} items to reorder\n")
+            
+        except Exception as e:
+            self.txt.delete('1.0', 'end')
+            self.txt.insert('end', f'Error loading low stock: {str(e)}')
+    def view_reorder_list(self):
+        try:
+            suppliers = self.manager.reorder_list()
+            self.txt.delete('1.0', 'end')
+            
+            if not suppliers:
+                self.txt.insert('end', 'No items need reordering. The forecast is refreshed in the background as sales post.')
+                return
+            
+            self.txt.insert('end', '='*78 + '\n')
+            self.txt.insert('end', 'REORDER LIST (by supplier)\n')
+            self.txt.insert('end', '='*78 + '\n')
+            
+            grand_total = 0
+            for supplier, items in suppliers.items():
+                self.txt.insert('end', f'\n🚚 {supplier.upper()}\n')
+                self.txt.insert('end', '-'*78 + '\n')
+                self.txt.insert('end', f'{"ID":<5} {"Item Name":<28} {"Stock":>6} {"/day":>7} {"Days":>7} {"Order":>6} {"Order By":>11}\n')
+                self.txt.insert('end', '-'*78 + '\n')
+                
+                supplier_total = 0
+                for item in items:
+                    name = (item.get('Item_Name') or 'Unknown')[:26]
+                    cost = item['Reorder_Qty'] * float(item.get('Unit_Price') or 0)
+                    supplier_total += cost
+                    self.txt.insert('end', f"{item['Inventory_ID']:<5} {name:<28} {item['Stock_On_Hand']:>6} "
+                                           f"{float(item['Daily_Demand']):>7.2f} {float(item['Days_Left']):>7.1f} "
+                                           f"{item['Reorder_Qty']:>6} {str(item['Reorder_By'] or ''):>11}\n")
+                
+                grand_total += supplier_total
+                self.txt.insert('end', f"\nSupplier Total: {len(items)} items, ₱{supplier_total:,.2f}\n")
+            
+            self.txt.insert('end', '\n' + '='*78 + '\n')
+            self.txt.insert('end', f"ESTIMATED ORDER VALUE: ₱{grand_total:,.2f}\n")
+            self.txt.insert('end', '='*78 + '\n')
+            
+        except Exception as e:
+            self.txt.delete('1.0', 'end')
+            self.txt.insert('end', f'Error loading reorder list: {str(e)}')
     def view_archive(self):
         rows=self.manager.list_archived(); self.txt.delete('1.0','end')
         for r in rows: self.txt.insert('end', f"{r['Inventory_ID']} | {r['Item_Name']} | Deleted: {r['Deleted_On']}\n")
@@ -1,6 +1,7 @@
 import customtkinter as ctk
 from tkinter import messagebox
 from utils.ui_constants import *
+from utils.autocomplete import AutocompleteCombobox
 
 class MedicalRecordsFrame(ctk.CTkFrame):
     def __init__(self, master, managers, *args, **kwargs):
@@ -41,13 +42,13 @@ class MedicalRecordsFrame(ctk.CTkFrame):
 
         # Form fields - Patient Selection
         ctk.CTkLabel(frm, text='Select Patient *', font=FONT_LABEL_BOLD).pack(anchor='w', pady=(10, 3))
-        self.patient_combo = ctk.CTkComboBox(frm, values=['Select a patient...'], state='readonly', height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL)
+        self.patient_combo = AutocompleteCombobox(frm, search=self.search_patients, height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL)
         self.patient_combo.set('Select a patient...')
         self.patient_combo.pack(fill='x', pady=(0, 10))
 
         # Doctor Selection
         ctk.CTkLabel(frm, text='Select Doctor *', font=FONT_LABEL_BOLD).pack(anchor='w', pady=(10, 3))
-        self.doctor_combo = ctk.CTkComboBox(frm, values=['Select a doctor...'], state='readonly', height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL)
+        self.doctor_combo = AutocompleteCombobox(frm, height=ENTRY_HEIGHT, font=FONT_LABEL_NORMAL)
         self.doctor_combo.set('Select a doctor...')
         self.doctor_combo.pack(fill='x', pady=(0, 10))
 
@@ -91,47 +92,57 @@ class MedicalRecordsFrame(ctk.CTkFrame):
     def load_patients(self):
         """Load all patients into the dropdown"""
         try:
-            patients = self.patient_manager.list_patients()
+            patients = self.patient_manager.list_patients(limit=AUTOCOMPLETE_PRELOAD_LIMIT)
             self.patients_dict.clear()
             
             if not patients:
-                self.patient_combo.configure(values=['No patients available'])
+                self.patient_combo.set_items(['No patients available'])
                 return
             
-            patient_list = []
-            for p in patients:
-                patient_display = f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']} ({p['Age']}, {p['Gender']})"
-                patient_list.append(patient_display)
-                self.patients_dict[patient_display] = p
-            
-            self.patient_combo.configure(values=patient_list)
+            patient_list = self._register_patients(patients)
+            self.patient_combo.set_items(patient_list, partial=len(patients) >= AUTOCOMPLETE_PRELOAD_LIMIT)
         except Exception as e:
             messagebox.showerror('Error', f'Failed to load patients: {str(e)}')
+
+    def _register_patients(self, patients):
+        patient_list = []
+        for p in patients:
+            patient_display = f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']} ({p['Age']}, {p['Gender']})"
+            patient_list.append(patient_display)
+            self.patients_dict[patient_display] = p
+        return patient_list
+
+    def search_patients(self, term, limit):
+        """Look up patients that are not in the preloaded list"""
+        try:
+            return self._register_patients(self.patient_manager.search_patients(term, limit))
+        except Exception:
+            return []
     
     def load_doctors(self):
         try:
             doctors = self.doctor_manager.list_doctors()
             
             if not doctors:
-                self.doctor_combo.configure(values=['No doctors available'])
+                self.doctor_combo.set_items(['No doctors available'])
                 return
             
             doctor_list = [f"{d['Doctor_ID']}: {d['Name']}" for d in doctors]
-            self.doctor_combo.configure(values=doctor_list)
+            self.doctor_combo.set_items(doctor_list)
         except Exception as e:
             messagebox.showerror('Error', f'Failed to load doctors: {str(e)}')
 
     def add_record(self):
         try:
             patient_selection = self.patient_combo.get()
-            if not patient_selection or patient_selection in ['Select a patient...', 'No patients available']:
+            if not patient_selection or patient_selection not in self.patients_dict:
                 messagebox.showerror('Validation Error', 'Please select a patient.')
                 return
             
             patient_id = patient_selection.split(':')[0].strip()
             
             doctor_selection = self.doctor_combo.get()
-            if not doctor_selection or doctor_selection in ['Select a doctor...', 'No doctors available']:
+            if not doctor_selection or not self.doctor_combo.has_item(doctor_selection) or doctor_selection == 'No doctors available':
                 messagebox.showerror('Validation Error', 'Please select a doctor.')
                 return
             
@@ -1,15 +1,18 @@
 import customtkinter as ctk
 from tkinter import messagebox
+from utils.autocomplete import AutocompleteCombobox
+from utils.ui_constants import AUTOCOMPLETE_PRELOAD_LIMIT
 
 class PatientHistoryFrame(ctk.CTkFrame):
     def __init__(self, master, patient_manager, prescription_manager, medical_records_manager, 
-                 appointment_manager, sales_manager, *args, **kwargs):
+                 appointment_manager, sales_manager, recall_manager, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
         self.pat_m = patient_manager
         self.pres_m = prescription_manager
         self.mr_m = medical_records_manager
         self.apt_m = appointment_manager
         self.sales_m = sales_manager
+        self.recall_m = recall_manager
         self.current_patient = None
         self.build()
 
@@ -31,7 +34,7 @@ class PatientHistoryFrame(ctk.CTkFrame):
         top_frame.pack(fill='x', pady=(0, 15))
         
         ctk.CTkLabel(top_frame, text='Select Patient:', font=('Segoe UI', 12, 'bold')).pack(side='left', padx=10, pady=10)
-        self.patient_combo = ctk.CTkComboBox(top_frame, state='readonly', height=32, font=('Segoe UI', 11))
+        self.patient_combo = AutocompleteCombobox(top_frame, search=self.search_patients, height=32, font=('Segoe UI', 11))
         self.patient_combo.pack(side='left', fill='x', expand=True, padx=10, pady=10)
         
         ctk.CTkButton(top_frame, text='📊 View', command=self.view_patient_history, height=32, font=('Segoe UI', 11, 'bold'), 
@@ -72,22 +75,27 @@ class PatientHistoryFrame(ctk.CTkFrame):
 
     def load_patients(self):
         try:
-            patients = self.pat_m.list_patients()
-            patient_list = [f"{p['Patient_ID']} - {p['Name']}" for p in patients]
-            self.patient_combo.configure(values=patient_list)
+            patients = self.pat_m.list_patients(limit=AUTOCOMPLETE_PRELOAD_LIMIT)
+            patient_list = [f"{p['Patient_ID']} - {p['Surname']}, {p['FirstName']}" for p in patients]
+            self.patient_combo.set_items(patient_list, partial=len(patients) >= AUTOCOMPLETE_PRELOAD_LIMIT)
         except Exception as e:
             messagebox.showerror('Error', str(e))
 
+    def search_patients(self, term, limit):
+        try:
+            return [f"{p['Patient_ID']} - {p['Surname']}, {p['FirstName']}" for p in self.pat_m.search_patients(term, limit)]
+        except Exception:
+            return []
+
     def view_patient_history(self):
         try:
             patient_str = self.patient_combo.get()
-            if not patient_str:
+            if not patient_str or not self.patient_combo.has_item(patient_str):
                 messagebox.showerror('Error', 'Select a patient')
                 return
             
             patient_id = int(patient_str.split(' - ')[0])
-            patient = self.pat_m.list_patients()
-            self.current_patient = next((p for p in patient if p['Patient_ID'] == patient_id), None)
+            self.current_patient = self.pat_m.get_patient(patient_id)
             
             if not self.current_patient:
                 messagebox.showerror('Error', 'Patient not found')
@@ -145,10 +153,9 @@ class PatientHistoryFrame(ctk.CTkFrame):
             f"Medical Records: {len(records) if records else 0}\n\n")
         
         # Next follow-up
-        followups = self.mr_m.check_due_followups()
-        due = [f for f in followups if f['Patient_ID'] == p['Patient_ID']]
+        due = self.recall_m.get_patient_recalls(p['Patient_ID'], source='followup', due_only=True)
         if due:
-            self.content_txt.insert('end', f"⚠️  DUE FOR FOLLOW-UP: {due[0]['Diagnosis']} (Since {due[0]['Recorded_Date']})\n")
+            self.content_txt.insert('end', f"⚠️  DUE FOR FOLLOW-UP: {due[0]['Reason']} (Since {due[0]['Due_Date']})\n")
 
     def show_appointments(self):
         apts = [a for a in self.apt_m.list_appointments() if a['Patient_ID'] == self.current_patient['Patient_ID']]
@@ -2,6 +2,8 @@ import customtkinter as ctk
 from tkinter import messagebox
 from utils.alert_system import AlertSystem
 from utils.date_picker import DatePicker
+from utils.autocomplete import AutocompleteCombobox
+from utils.ui_constants import AUTOCOMPLETE_PRELOAD_LIMIT
 
 class PrescriptionsFrame(ctk.CTkFrame):
     def __init__(self, master, prescription_manager, patient_manager, doctor_manager, *args, **kwargs):
@@ -31,11 +33,11 @@ class PrescriptionsFrame(ctk.CTkFrame):
         form_frame.pack(padx=10, pady=10, fill='x')
         
         ctk.CTkLabel(form_frame, text='Patient', font=('Segoe UI', 11, 'bold')).pack(anchor='w', padx=10, pady=(8, 2))
-        self.patient_combo = ctk.CTkComboBox(form_frame, state='readonly', height=32, font=('Segoe UI', 11))
+        self.patient_combo = AutocompleteCombobox(form_frame, search=self.search_patients, height=32, font=('Segoe UI', 11))
         self.patient_combo.pack(fill='x', padx=10, pady=(0, 8))
         
         ctk.CTkLabel(form_frame, text='Doctor', font=('Segoe UI', 11, 'bold')).pack(anchor='w', padx=10, pady=(5, 2))
-        self.doctor_combo = ctk.CTkComboBox(form_frame, state='readonly', height=32, font=('Segoe UI', 11))
+        self.doctor_combo = AutocompleteCombobox(form_frame, height=32, font=('Segoe UI', 11))
         self.doctor_combo.pack(fill='x', padx=10, pady=(0, 8))
 
         ctk.CTkLabel(form_frame, text='🔴 Right Eye (OD)', font=('Segoe UI', 11, 'bold')).pack(anchor='w', padx=10, pady=(10, 5))
@@ -102,20 +104,26 @@ class PrescriptionsFrame(ctk.CTkFrame):
 
     def load_combos(self):
         try:
-            patients = self.pat_m.list_patients()
-            patient_list = [f"{p['Patient_ID']} - {p['Name']}" for p in patients]
-            self.patient_combo.configure(values=patient_list)
+            patients = self.pat_m.list_patients(limit=AUTOCOMPLETE_PRELOAD_LIMIT)
+            patient_list = [f"{p['Patient_ID']} - {p['Surname']}, {p['FirstName']}" for p in patients]
+            self.patient_combo.set_items(patient_list, partial=len(patients) >= AUTOCOMPLETE_PRELOAD_LIMIT)
             
             doctors = self.doc_m.list_doctors()
             doctor_list = [f"{d['Doctor_ID']} - {d['Name']}" for d in doctors]
-            self.doctor_combo.configure(values=doctor_list)
+            self.doctor_combo.set_items(doctor_list)
         except Exception as e:
             messagebox.showerror('Error', str(e))
 
+    def search_patients(self, term, limit):
+        try:
+            return [f"{p['Patient_ID']} - {p['Surname']}, {p['FirstName']}" for p in self.pat_m.search_patients(term, limit)]
+        except Exception:
+            return []
+
     def create_prescription(self):
         try:
-            patient_id = int(self.patient_combo.get().split(' - ')[0]) if self.patient_combo.get() else None
-            doctor_id = int(self.doctor_combo.get().split(' - ')[0]) if self.doctor_combo.get() else None
+            patient_id = int(self.patient_combo.get().split(' - ')[0]) if self.patient_combo.has_item(self.patient_combo.get()) else None
+            doctor_id = int(self.doctor_combo.get().split(' - ')[0]) if self.doctor_combo.has_item(self.doctor_combo.get()) else None
             
             if not patient_id or not doctor_id:
                 messagebox.showerror('Validation Error', 'Patient and Doctor are required')
@@ -1,11 +1,16 @@
 import customtkinter as ctk
+import threading
 from tkinter import messagebox
 from datetime import datetime, timedelta
+from backend.reminder_dispatch import ReminderDispatcher
+from utils.constants import REMINDER_LOOKAHEAD_DAYS, LOGIN_POLL_INTERVAL_MS
 
 class RemindersFrame(ctk.CTkFrame):
-    def __init__(self, master, managers, *args, **kwargs):
+    def __init__(self, master, managers, jobs=None, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
         self.managers = managers
+        self.jobs = jobs
+        self.dispatch_thread = None
         self.reminder_manager = managers['rem_m']
         self.patient_manager = managers['pm']
         self.appointment_manager = managers['am']
@@ -49,6 +54,11 @@ class RemindersFrame(ctk.CTkFrame):
         ctk.CTkButton(frm, text='➕ Create Reminder', command=self.create_reminder, height=45, font=('Segoe UI', 13, 'bold')).pack(fill='x', pady=5)
         ctk.CTkButton(frm, text='🔄 Refresh List', command=self.refresh_data, height=45, font=('Segoe UI', 13, 'bold')).pack(fill='x', pady=5)
 
+        ctk.CTkLabel(frm, text='Batch Reminders', font=('Segoe UI', 12, 'bold')).pack(anchor='w', pady=(20, 3))
+        ctk.CTkButton(frm, text=f'⚡ Generate Next {REMINDER_LOOKAHEAD_DAYS} Days', command=self.generate_reminders, height=45, font=('Segoe UI', 13, 'bold'), fg_color=("#27ae60", "#1e8449")).pack(fill='x', pady=5)
+        self.send_button = ctk.CTkButton(frm, text='📤 Send Due Reminders', command=self.send_due_reminders, height=45, font=('Segoe UI', 13, 'bold'), fg_color=("#f39c12", "#d68910"))
+        self.send_button.pack(fill='x', pady=5)
+
         right = ctk.CTkFrame(main, fg_color=("white", "#0f0f0f"))
         right.pack(side='right', fill='both', expand=True, padx=(7.5, 0), pady=0)
 
@@ -137,6 +147,46 @@ class RemindersFrame(ctk.CTkFrame):
         except Exception as e:
             messagebox.showerror('Error', str(e))
 
+    def generate_reminders(self):
+        try:
+            added = self.reminder_manager.generate_for_upcoming()
+            messagebox.showinfo('Reminders', f'{added} new reminder(s) created for the next {REMINDER_LOOKAHEAD_DAYS} days.')
+            self.view_reminders()
+        except Exception as e:
+            messagebox.showerror('Error', str(e))
+
+    def send_due_reminders(self):
+        """Hands dispatch to the background scheduler, or to a worker thread when there is none."""
+        if self.jobs and self.jobs.is_alive():
+            self.jobs.run_now('reminders.dispatch')
+            messagebox.showinfo('Reminders', 'Sending due reminders in the background.')
+            return
+        if self.dispatch_thread and self.dispatch_thread.is_alive():
+            return
+        self.dispatch_result = None
+        self.send_button.configure(state='disabled', text='Sending...')
+        self.dispatch_thread = threading.Thread(target=self._dispatch, name='reminder-dispatch', daemon=True)
+        self.dispatch_thread.start()
+        self.after(LOGIN_POLL_INTERVAL_MS, self._check_dispatch)
+
+    def _dispatch(self):
+        try:
+            self.dispatch_result = ReminderDispatcher(self.reminder_manager).run_once()
+        except Exception as e:
+            self.dispatch_result = e
+
+    def _check_dispatch(self):
+        if self.dispatch_thread.is_alive():
+            self.after(LOGIN_POLL_INTERVAL_MS, self._check_dispatch)
+            return
+        self.send_button.configure(state='normal', text='📤 Send Due Reminders')
+        if isinstance(self.dispatch_result, Exception):
+            messagebox.showerror('Error', str(self.dispatch_result))
+        else:
+            sent, failed = self.dispatch_result
+            messagebox.showinfo('Reminders', f'{sent} reminder(s) sent, {failed} failed.')
+        self.view_reminders()
+
     def refresh_data(self):
         """Refresh appointments list and reminders"""
         self.appointment_combo.configure(values=self.get_appointments_list())
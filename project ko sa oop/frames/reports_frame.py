@@ -1,10 +1,20 @@
+import os
 import customtkinter as ctk
-from tkinter import messagebox
+from tkinter import messagebox, filedialog
+from datetime import date, datetime, timedelta
+from backend.export import ExportWorker, EXPORT_DATASETS, EXPORT_FORMATS
+from backend.report_jobs import ReportJobQueue, REPORT_DEFINITIONS
+from utils.constants import REPORT_DEFAULT_RANGE_DAYS
 
 class ReportsFrame(ctk.CTkFrame):
+    REPORTS = list(REPORT_DEFINITIONS)
+
     def __init__(self, master, managers, *args, **kwargs):
         super().__init__(master, *args, **kwargs)
         self.managers = managers
+        self.export_worker = None
+        self.report_jobs = ReportJobQueue()
+        self.report_job = None
         self.build()
 
     def build(self):
@@ -22,11 +32,62 @@ class ReportsFrame(ctk.CTkFrame):
 
         ctk.CTkLabel(report_selection_frame, text="📈 Select Report:", font=('Segoe UI', 14, 'bold')).pack(side='left', padx=15, pady=15)
 
-        self.report_combo = ctk.CTkComboBox(report_selection_frame, values=["Sales Report", "Patient Demographics"], command=self.generate_report, height=38, font=('Segoe UI', 12))
+        self.report_combo = ctk.CTkComboBox(report_selection_frame, values=self.REPORTS, command=self.generate_report, height=38, font=('Segoe UI', 12))
         self.report_combo.set("Select a report to generate")
         self.report_combo.pack(side='left', fill='x', expand=True, padx=15, pady=15)
 
-        ctk.CTkButton(report_selection_frame, text="🔄 Refresh", command=lambda: self.generate_report(self.report_combo.get()), height=38, font=('Segoe UI', 12, 'bold')).pack(side='left', padx=(0, 15), pady=15)
+        ctk.CTkButton(report_selection_frame, text="🔄 Refresh", command=lambda: self.generate_report(self.report_combo.get(), refresh=True), height=38, font=('Segoe UI', 12, 'bold')).pack(side='left', padx=(0, 15), pady=15)
+
+        range_frame = ctk.CTkFrame(main, fg_color=("white", "#0f0f0f"))
+        range_frame.pack(fill='x', pady=(0, 15), padx=0)
+
+        today = date.today()
+        ctk.CTkLabel(range_frame, text="From:", font=('Segoe UI', 12, 'bold')).pack(side='left', padx=(15, 5), pady=10)
+        self.from_entry = ctk.CTkEntry(range_frame, width=120, height=32, font=('Segoe UI', 12))
+        self.from_entry.insert(0, (today - timedelta(days=REPORT_DEFAULT_RANGE_DAYS)).isoformat())
+        self.from_entry.pack(side='left', pady=10)
+
+        ctk.CTkLabel(range_frame, text="To:", font=('Segoe UI', 12, 'bold')).pack(side='left', padx=(15, 5), pady=10)
+        self.to_entry = ctk.CTkEntry(range_frame, width=120, height=32, font=('Segoe UI', 12))
+        self.to_entry.insert(0, today.isoformat())
+        self.to_entry.pack(side='left', pady=10)
+
+        ctk.CTkLabel(range_frame, text="(YYYY-MM-DD)", font=('Segoe UI', 11)).pack(side='left', padx=10, pady=10)
+
+        self.cancel_report_btn = ctk.CTkButton(range_frame, text="Cancel", command=self.cancel_report, width=80, height=32,
+                                               font=('Segoe UI', 12), fg_color=("#e74c3c", "#c0392b"), state='disabled')
+        self.cancel_report_btn.pack(side='right', padx=15, pady=10)
+        self.report_status = ctk.CTkLabel(range_frame, text="", font=('Segoe UI', 11))
+        self.report_status.pack(side='right', padx=(0, 10), pady=10)
+        self.report_progress = ctk.CTkProgressBar(range_frame, width=160)
+        self.report_progress.set(0)
+        self.report_progress.pack(side='right', padx=(0, 10), pady=10)
+
+        export_frame = ctk.CTkFrame(main, fg_color=("white", "#0f0f0f"))
+        export_frame.pack(fill='x', pady=(0, 15), padx=0)
+
+        ctk.CTkLabel(export_frame, text="📤 Export:", font=('Segoe UI', 12, 'bold')).pack(side='left', padx=(15, 5), pady=10)
+        self.export_combo = ctk.CTkComboBox(export_frame, values=list(EXPORT_DATASETS), state='readonly', width=170, height=32, font=('Segoe UI', 12))
+        self.export_combo.set(next(iter(EXPORT_DATASETS)))
+        self.export_combo.pack(side='left', pady=10)
+        self.format_combo = ctk.CTkComboBox(export_frame, values=list(EXPORT_FORMATS), state='readonly', width=90, height=32, font=('Segoe UI', 12))
+        self.format_combo.set(EXPORT_FORMATS[0])
+        self.format_combo.pack(side='left', padx=10, pady=10)
+
+        self.export_btn = ctk.CTkButton(export_frame, text="Export", command=self.start_export, width=90, height=32, font=('Segoe UI', 12, 'bold'))
+        self.export_btn.pack(side='left', pady=10)
+        self.export_report_btn = ctk.CTkButton(export_frame, text="Export Report", command=lambda: self.start_export(report=True),
+                                               width=110, height=32, font=('Segoe UI', 12, 'bold'))
+        self.export_report_btn.pack(side='left', padx=(10, 0), pady=10)
+        self.cancel_export_btn = ctk.CTkButton(export_frame, text="Cancel", command=self.cancel_export, width=80, height=32,
+                                               font=('Segoe UI', 12), fg_color=("#e74c3c", "#c0392b"), state='disabled')
+        self.cancel_export_btn.pack(side='left', padx=10, pady=10)
+
+        self.export_progress = ctk.CTkProgressBar(export_frame, width=160)
+        self.export_progress.set(0)
+        self.export_progress.pack(side='left', padx=(0, 10), pady=10)
+        self.export_status = ctk.CTkLabel(export_frame, text="", font=('Segoe UI', 11))
+        self.export_status.pack(side='left', padx=(0, 15), pady=10)
 
         display_frame = ctk.CTkFrame(main, fg_color=("white", "#0f0f0f"))
         display_frame.pack(fill='both', expand=True, padx=0, pady=0)
@@ -36,29 +97,150 @@ class ReportsFrame(ctk.CTkFrame):
         self.txt = ctk.CTkTextbox(display_frame, font=('Consolas', 11), fg_color=("#f5f5f5", "#1a1a1a"), text_color=("black", "white"))
         self.txt.pack(fill='both', expand=True, padx=15, pady=(0, 15))
 
-    def generate_report(self, report_name):
-        self.txt.delete('1.0', 'end')
+    def start_export(self, report=False):
+        """Exports the selected dataset over the From/To range, or with ``report`` the report shown below."""
+        if self.export_worker and not self.export_worker.done:
+            return
+        job = self.report_job
+        if report:
+            if job is None or job.sections is None:
+                messagebox.showinfo("Export", "Generate a report first.")
+                return
+            name = job.name
+        else:
+            name = self.export_combo.get()
+            try:
+                start, end = self.get_range()
+            except ValueError as e:
+                messagebox.showerror("Export Error", str(e))
+                return
+        file_format = self.format_combo.get()
+        extension = f".{file_format.lower()}"
+        path = filedialog.asksaveasfilename(
+            parent=self, defaultextension=extension, filetypes=[(file_format, f"*{extension}")],
+            initialfile=f"{name.lower().replace(' ', '_')}_{date.today().isoformat()}{extension}")
+        if not path:
+            return
         try:
-            if report_name == "Sales Report":
-                report_data = self.managers['sm'].get_sales_report()
-                self.txt.insert('end', "--- Sales Report by Category ---\n\n")
-                header = f"{'Category':<20} {'Items Sold':<15} {'Total Quantity':<15} {'Avg Price (₱)':<15}\n"
-                self.txt.insert('end', header)
-                self.txt.insert('end', "="*70 + "\n")
-                if not report_data:
-                    self.txt.insert('end', "No sales data available.")
-                    return
-                for row in report_data:
-                    self.txt.insert('end', f"{row['category']:<20} {row['count']:<15} {row['total_qty']:<15} {row['avg_price']:<15.2f}\n")
-
-            elif report_name == "Patient Demographics":
-                patients = self.managers['pm'].list_patients()
-                self.txt.insert('end', "--- Patient Demographics Report ---\n\n")
-                self.txt.insert('end', f"Total Patients: {len(patients)}\n\n")
-
+            if report:
+                self.export_worker = ExportWorker.for_report(job.sections, path, file_format)
             else:
-                self.txt.insert('end', "Please select a valid report.")
+                self.export_worker = ExportWorker.for_dataset(name, path, file_format, start, end)
+        except ValueError as e:
+            messagebox.showerror("Export Error", str(e))
+            return
+        self.export_worker.start()
+        self.export_btn.configure(state='disabled')
+        self.export_report_btn.configure(state='disabled')
+        self.cancel_export_btn.configure(state='normal')
+        self.export_progress.set(0)
+        self.poll_export()
+
+    def cancel_export(self):
+        if self.export_worker:
+            self.export_worker.cancel()
+            self.export_status.configure(text="Cancelling...")
+
+    def poll_export(self):
+        worker = self.export_worker
+        if worker.total:
+            self.export_progress.set(min(1.0, worker.rows_written / worker.total))
+        if not worker.done:
+            total = f" / {worker.total:,}" if worker.total else ""
+            self.export_status.configure(text=f"{worker.rows_written:,}{total} rows")
+            self.after(200, self.poll_export)
+            return
+
+        self.export_btn.configure(state='normal')
+        self.export_report_btn.configure(state='normal')
+        self.cancel_export_btn.configure(state='disabled')
+        if worker.error:
+            self.export_status.configure(text="Export failed")
+            messagebox.showerror("Export Error", f"Export failed: {worker.error}")
+        elif worker.cancelled:
+            self.export_progress.set(0)
+            self.export_status.configure(text="Export cancelled")
+        else:
+            self.export_progress.set(1)
+            self.export_status.configure(text=f"{worker.rows_written:,} rows saved to {os.path.basename(worker.exporter.path)}")
+
+    def get_range(self):
+        """(start, end) from the date fields; blank means from the earliest data / up to today."""
+        try:
+            return tuple(datetime.strptime(text, '%Y-%m-%d').date() if text else None
+                         for text in (self.from_entry.get().strip(), self.to_entry.get().strip()))
+        except ValueError:
+            raise ValueError('Dates must be in YYYY-MM-DD format')
+
+    def write_table(self, title, columns, rows, totals=()):
+        """Prints ``rows`` under ``title``; columns are (key, heading, width, format spec)."""
+        self.txt.insert('end', f"--- {title} ---\n\n")
+        self.txt.insert('end', ' '.join(f"{heading:<{width}}" for _, heading, width, _ in columns) + "\n")
+        self.txt.insert('end', "=" * sum(width + 1 for _, _, width, _ in columns) + "\n")
+        if not rows:
+            self.txt.insert('end', "No data for the selected dates.\n")
+            return
+        if totals:
+            rows = list(rows) + [{columns[0][0]: 'Total', **{key: sum(r.get(key) or 0 for r in rows) for key in totals}}]
+        for row in rows:
+            cells = []
+            for key, _, width, spec in columns:
+                value = row.get(key)
+                value = '' if value is None else format(value, spec) if spec else str(value)
+                cells.append(f"{value:<{width}}")
+            self.txt.insert('end', ' '.join(cells) + "\n")
+
+    def generate_report(self, report_name, refresh=False):
+        if report_name not in self.REPORTS:
+            self.txt.delete('1.0', 'end')
+            self.txt.insert('end', "Please select a valid report.")
+            return
+        try:
+            params = self.get_range()
+        except ValueError as e:
+            messagebox.showerror("Report Error", str(e))
+            return
+
+        if self.report_job and not self.report_job.done:
+            self.report_job.cancel()
+        self.report_job = self.report_jobs.submit(report_name, params, refresh)
+        self.cancel_report_btn.configure(state='normal')
+        self.report_progress.set(0)
+        self.poll_report(self.report_job)
+
+    def cancel_report(self):
+        if self.report_job:
+            self.report_job.cancel()
+
+    def poll_report(self, job):
+        if job is not self.report_job:
+            return  # superseded by a newer request
+        if not job.done:
+            self.report_progress.set(job.progress)
+            self.report_status.configure(text=f"⏳ {job.status}...")
+            self.after(150, lambda: self.poll_report(job))
+            return
+
+        self.cancel_report_btn.configure(state='disabled')
+        self.report_progress.set(1 if job.sections is not None else 0)
+        self.report_status.configure(text=("⚡ From cache" if job.cached else job.status))
+        if job.error:
+            messagebox.showerror("Report Error", f"Failed to generate report: {job.error}")
+            self.txt.delete('1.0', 'end')
+            self.txt.insert('end', f"Error: {job.error}")
+        elif job.sections is not None:
+            self.show_report(job)
+
+    def show_report(self, job):
+        start, end = job.params
+        self.txt.delete('1.0', 'end')
+        self.txt.insert('end', f"{job.name}\nPeriod: {start or 'beginning'} to {end or 'today'}\n\n")
+        for section in job.sections:
+            self.write_table(section['title'], section['columns'], section['rows'], section['totals'])
+            self.txt.insert('end', "\n")
 
-        except Exception as e:
-            messagebox.showerror("Report Error", f"Failed to generate report: {e}")
-            self.txt.insert('end', f"Error: {e}")
\ No newline at end of file
+    def destroy(self):
+        if self.export_worker and not self.export_worker.done:
+            self.export_worker.cancel()
+        self.report_jobs.shutdown()
+        super().destroy()
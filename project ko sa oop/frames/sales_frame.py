@@ -1,6 +1,8 @@
 import customtkinter as ctk
 from tkinter import messagebox, ttk
 from datetime import datetime
+from utils.autocomplete import AutocompleteCombobox
+from utils.ui_constants import AUTOCOMPLETE_PRELOAD_LIMIT
 
 class SalesFrame(ctk.CTkFrame):
     def __init__(self, master, sales_manager, billing_manager, patient_manager, inventory_manager, invoice_manager, *args, **kwargs):
@@ -35,13 +37,13 @@ class SalesFrame(ctk.CTkFrame):
         sales_frm.pack(padx=10, pady=10, fill='x')
         
         ctk.CTkLabel(sales_frm, text='Customer Name', font=('Segoe UI', 11, 'bold')).pack(anchor='w', padx=10, pady=(8, 2))
-        self.customer_name_combo = ctk.CTkComboBox(sales_frm, values=[], height=32, font=('Segoe UI', 11))
+        self.customer_name_combo = AutocompleteCombobox(sales_frm, search=self.search_patients, height=32, font=('Segoe UI', 11))
         self.customer_name_combo.pack(fill='x', padx=10, pady=(0, 8))
         self.customer_name_combo.set("Select Patient")
         self.patient_id_map = {}
         
         ctk.CTkLabel(sales_frm, text='Select Product', font=('Segoe UI', 11, 'bold')).pack(anchor='w', padx=10, pady=(5, 2))
-        self.sale_product_combo = ctk.CTkComboBox(sales_frm, values=[], height=32, font=('Segoe UI', 11), state='readonly', command=self.on_product_selected)
+        self.sale_product_combo = AutocompleteCombobox(sales_frm, height=32, font=('Segoe UI', 11), command=self.on_product_selected)
         self.sale_product_combo.pack(fill='x', padx=10, pady=(0, 8))
         self.sale_product_combo.set("Select Product")
         self.product_map = {}
@@ -92,6 +94,8 @@ class SalesFrame(ctk.CTkFrame):
 
     def view_products(self):
         try:
+            # Refresh and the post-sale reload must show current stock, not the cached list
+            self.inventory_manager.invalidate_cache()
             products = self.inventory_manager.list_items()
             self.products_txt.delete('1.0', 'end')
             if not products:
@@ -122,7 +126,7 @@ class SalesFrame(ctk.CTkFrame):
                 
                 self.products_txt.insert('end', f"ID: {pid} | {pname} | ₱{pprice} | Stock: {pqty}\n")
             
-            self.sale_product_combo.configure(values=product_list)
+            self.sale_product_combo.set_items(product_list)
             self.products_txt.insert('end', f'\nTotal loaded into dropdown: {len(product_list)}\n')
         except Exception as e:
             messagebox.showerror('Error', str(e))
@@ -138,17 +142,27 @@ class SalesFrame(ctk.CTkFrame):
 
     def load_patients(self):
         try:
-            patients = self.patient_manager.list_patients()
+            patients = self.patient_manager.list_patients(limit=AUTOCOMPLETE_PRELOAD_LIMIT)
             self.patient_id_map.clear()
-            patient_names = []
-            for p in patients:
-                full_name = p['Name']
-                self.patient_id_map[full_name] = p['Patient_ID']
-                patient_names.append(full_name)
-            self.customer_name_combo.configure(values=patient_names)
+            patient_names = self._register_patients(patients)
+            self.customer_name_combo.set_items(patient_names, partial=len(patients) >= AUTOCOMPLETE_PRELOAD_LIMIT)
         except Exception as e:
             messagebox.showerror('Error', f'Failed to load patients: {str(e)}')
 
+    def _register_patients(self, patients):
+        patient_names = []
+        for p in patients:
+            display = f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']}"
+            self.patient_id_map[display] = p
+            patient_names.append(display)
+        return patient_names
+
+    def search_patients(self, term, limit):
+        try:
+            return self._register_patients(self.patient_manager.search_patients(term, limit))
+        except Exception:
+            return []
+
     def add_to_cart(self):
         try:
             selected_product = self.sale_product_combo.get()
@@ -206,19 +220,21 @@ class SalesFrame(ctk.CTkFrame):
 
     def complete_sale(self):
         try:
-            customer_name = self.customer_name_combo.get()
+            selection = self.customer_name_combo.get()
             
-            if not customer_name or customer_name == "Select Patient":
+            if not selection or selection == "Select Patient":
                 messagebox.showerror('Validation Error', 'Please select a patient.')
                 return
             if not self.cart:
                 messagebox.showerror('Validation Error', 'Cart is empty')
                 return
             
-            patient_id = self.patient_id_map.get(customer_name)
-            if not patient_id:
+            patient = self.patient_id_map.get(selection)
+            if not patient:
                 messagebox.showerror('Validation Error', 'Invalid patient selected. Please refresh patient list.')
                 return
+            patient_id = patient['Patient_ID']
+            customer_name = f"{patient['Surname']}, {patient['FirstName']}"
 
             sale_id = self.sales_manager.create_sale(customer_name, self.cart)
             
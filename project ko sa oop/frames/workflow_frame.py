@@ -4,6 +4,8 @@ from frames.base_frame import BaseFrame
 from utils.input_validator import InputValidator
 from utils.logger import setup_logging
 from utils.ui_constants import *
+from utils.autocomplete import AutocompleteCombobox
+from utils.constants import DEFAULT_TAX_RATE
 from datetime import datetime, timedelta
 
 logger = setup_logging(__name__)
@@ -24,6 +26,7 @@ class WorkflowFrame(BaseFrame):
         self.current_patient = None
         self.current_step = 0
         self.doctors_list = []
+        self.patients_dict = {}
         self.workflow_steps = [
             {"title": "1️⃣ Patient Check-In", "name": "registration"},
             {"title": "2️⃣ Eye Examination", "name": "examination"},
@@ -161,7 +164,8 @@ class WorkflowFrame(BaseFrame):
 
         ctk.CTkLabel(frm, text='Select Patient *', font=('Segoe UI', 16, 'bold')).pack(anchor='w', pady=(10, 5))
         self.exam_patient_list = self.get_patients_list()
-        self.exam_patient = ctk.CTkComboBox(frm, values=self.exam_patient_list, state='readonly', height=45, font=('Segoe UI', 14), command=self.on_patient_selected)
+        self.exam_patient = AutocompleteCombobox(frm, search=self.search_patients, height=45, font=('Segoe UI', 14), command=self.on_patient_selected)
+        self.exam_patient.set_items(self.exam_patient_list, partial=self.patients_partial)
         self.exam_patient.pack(fill='x', pady=(0, 10))
         
         self.exam_patient_info = ctk.CTkLabel(frm, text='', font=('Segoe UI', 13), justify='left')
@@ -170,7 +174,8 @@ class WorkflowFrame(BaseFrame):
         ctk.CTkLabel(frm, text="", fg_color=COLOR_SEPARATOR, height=2).pack(fill='x', padx=0, pady=15)
         
         ctk.CTkLabel(frm, text='Examining Doctor *', font=('Segoe UI', 16, 'bold')).pack(anchor='w', pady=(10, 5))
-        self.exam_doctor = ctk.CTkComboBox(frm, values=self.get_doctors_list(), state='readonly', height=45, font=('Segoe UI', 14))
+        self.exam_doctor = AutocompleteCombobox(frm, height=45, font=('Segoe UI', 14))
+        self.exam_doctor.set_items(self.get_doctors_list())
         self.exam_doctor.pack(fill='x', pady=(0, 20))
         
         ctk.CTkLabel(frm, text='OD (Right Eye) - Prescription', font=('Segoe UI', 18, 'bold'), text_color=("#2980b9", "#3498db")).pack(anchor='w', pady=(15, 10))
@@ -300,7 +305,8 @@ class WorkflowFrame(BaseFrame):
         
         ctk.CTkLabel(frm, text='Select Patient *', font=('Segoe UI', 14, 'bold')).pack(anchor='w', pady=(10, 5))
         self.billing_patient_list = self.get_patients_list()
-        self.billing_patient = ctk.CTkComboBox(frm, values=self.billing_patient_list, state='readonly', height=45, font=('Segoe UI', 14), command=self.on_billing_patient_selected)
+        self.billing_patient = AutocompleteCombobox(frm, search=self.search_patients, height=45, font=('Segoe UI', 14), command=self.on_billing_patient_selected)
+        self.billing_patient.set_items(self.billing_patient_list, partial=self.patients_partial)
         self.billing_patient.pack(fill='x', pady=(0, 10))
         
         self.billing_patient_info = ctk.CTkLabel(frm, text='', font=('Segoe UI', 13), justify='left')
@@ -349,7 +355,8 @@ class WorkflowFrame(BaseFrame):
         
         ctk.CTkLabel(frm, text='Select Patient *', font=('Segoe UI', 16, 'bold')).pack(anchor='w', pady=(10, 5))
         self.sales_patient_list = self.get_patients_list()
-        self.sales_patient = ctk.CTkComboBox(frm, values=self.sales_patient_list, state='readonly', height=50, font=('Segoe UI', 16), command=self.on_sales_patient_selected)
+        self.sales_patient = AutocompleteCombobox(frm, search=self.search_patients, height=50, font=('Segoe UI', 16), command=self.on_sales_patient_selected)
+        self.sales_patient.set_items(self.sales_patient_list, partial=self.patients_partial)
         self.sales_patient.pack(fill='x', pady=(0, 15))
         
         self.sales_patient_info = ctk.CTkLabel(frm, text='', font=('Segoe UI', 14), justify='left')
@@ -370,7 +377,7 @@ class WorkflowFrame(BaseFrame):
         self.glasses_fields_frame = ctk.CTkFrame(self.dynamic_fields_container, fg_color="transparent")
         
         ctk.CTkLabel(self.glasses_fields_frame, text='Select Glasses Product (Optional)', font=('Segoe UI', 14, 'bold')).pack(anchor='w', pady=(5, 5))
-        self.glasses_product_combo = ctk.CTkComboBox(self.glasses_fields_frame, values=[], state='readonly', height=50, font=('Segoe UI', 16), command=self.on_glasses_product_selected)
+        self.glasses_product_combo = AutocompleteCombobox(self.glasses_fields_frame, height=50, font=('Segoe UI', 16), command=self.on_glasses_product_selected)
         self.glasses_product_combo.set('Select from inventory or enter manually')
         self.glasses_product_combo.pack(fill='x', pady=(0, 15))
         
@@ -389,7 +396,7 @@ class WorkflowFrame(BaseFrame):
         self.generic_fields_frame = ctk.CTkFrame(self.dynamic_fields_container, fg_color="transparent")
         
         ctk.CTkLabel(self.generic_fields_frame, text='Select Product', font=('Segoe UI', 14, 'bold')).pack(anchor='w', pady=(5, 5))
-        self.product_name_combo = ctk.CTkComboBox(self.generic_fields_frame, values=[], state='readonly', height=50, font=('Segoe UI', 16), command=self.on_product_name_selected)
+        self.product_name_combo = AutocompleteCombobox(self.generic_fields_frame, height=50, font=('Segoe UI', 16), command=self.on_product_name_selected)
         self.product_name_combo.set('Select Product')
         self.product_name_combo.pack(fill='x', pady=(0, 15))
         self.product_map = {}
@@ -481,23 +488,34 @@ class WorkflowFrame(BaseFrame):
             return ['No doctors available']
 
     def get_patients_list(self):
+        self.patients_partial = False
         try:
-            patients = self.pm.list_patients()
+            patients = self.pm.list_patients(limit=AUTOCOMPLETE_PRELOAD_LIMIT)
             if not patients:
                 return ['No patients found']
             
-            patient_list = []
             self.patients_dict = {}
-            for p in patients:
-                display_name = f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']} ({p['Age']})"
-                patient_list.append(display_name)
-                self.patients_dict[display_name] = p
-            
-            return patient_list
+            self.patients_partial = len(patients) >= AUTOCOMPLETE_PRELOAD_LIMIT
+            return self._register_patients(patients)
         except Exception as e:
             logger.error(f"Error getting patients list: {e}")
             return ['Error loading patients']
 
+    def _register_patients(self, patients):
+        patient_list = []
+        for p in patients:
+            display_name = f"{p['Patient_ID']}: {p['Surname']}, {p['FirstName']} ({p['Age']})"
+            patient_list.append(display_name)
+            self.patients_dict[display_name] = p
+        return patient_list
+
+    def search_patients(self, term, limit):
+        try:
+            return self._register_patients(self.pm.search_patients(term, limit))
+        except Exception as e:
+            logger.error(f"Error searching patients: {e}")
+            return []
+
     def on_patient_selected(self, selected=None):
         try:
             if not selected:
@@ -869,30 +887,27 @@ class WorkflowFrame(BaseFrame):
                 self.bill_textbox.insert('end', 'Please select a patient to view their bills.')
                 return
             
-            bills = self.bm.list_bills()
-            if not bills:
-                self.bill_textbox.insert('end', 'No bills created yet.')
-                return
-            
-            patient_bills = [b for b in bills if b['Patient_ID'] == self.billing_patient_info_obj['Patient_ID']]
+            patient_bills = self.bm.list_patient_bills(self.billing_patient_info_obj['Patient_ID'])
             
             if not patient_bills:
                 self.bill_textbox.insert('end', f"No bills for {self.billing_patient_info_obj['Surname']}, {self.billing_patient_info_obj['FirstName']}")
                 return
             
-            total = 0
+            subtotal = 0
             bill_text = "ITEMIZED BILL:\n" + "="*40 + "\n"
             for bill in patient_bills:
                 amount = float(bill['Amount'])
-                total += amount
+                subtotal += amount
                 method = bill.get('Payment_Method', 'N/A')
                 bill_text += f"Bill #{bill['Bill_ID']:<13} ₱{amount:>8.2f} ({method})\n"
+            tax = round(subtotal * DEFAULT_TAX_RATE, 2)
+            total = subtotal + tax
             
             bill_text += "-"*40 + "\n"
-            bill_text += f"{'SUBTOTAL':<20} ₱{total:>8.2f}\n"
-            bill_text += f"{'TAX (12%)':<20} ₱{(total*0.12):>8.2f}\n"
+            bill_text += f"{'SUBTOTAL':<20} ₱{subtotal:>8.2f}\n"
+            bill_text += f"{f'TAX ({DEFAULT_TAX_RATE:.0%})':<20} ₱{tax:>8.2f}\n"
             bill_text += "="*40 + "\n"
-            bill_text += f"{'TOTAL':<20} ₱{(total*1.12):>8.2f}\n"
+            bill_text += f"{'TOTAL':<20} ₱{total:>8.2f}\n"
             
             self.bill_textbox.insert('end', bill_text)
         except Exception as e:
@@ -1041,14 +1056,14 @@ Notes: {notes}
                 self.product_map[display_name] = product
             
             if category == 'Glasses':
-                self.glasses_product_combo.configure(values=product_names)
+                self.glasses_product_combo.set_items(product_names)
                 if product_names:
                     self.glasses_product_combo.set(product_names[0])
                     self.on_glasses_product_selected(product_names[0])
                 else:
                     self.glasses_product_combo.set('Select from inventory or enter manually')
             else:
-                self.product_name_combo.configure(values=product_names)
+                self.product_name_combo.set_items(product_names)
                 if product_names:
                     self.product_name_combo.set(product_names[0])
                     self.on_product_name_selected(product_names[0])
@@ -1129,10 +1144,12 @@ Notes: {notes}
                 self.show_error('Error', 'Quantity must be a number and price must be numeric')
                 return
             
+            product = None
             if category == 'Glasses':
                 selected_glasses = self.glasses_product_combo.get()
                 if selected_glasses and selected_glasses not in ['Select from inventory or enter manually', 'No products available', 'Error loading products']:
                     product_name = selected_glasses.split(' (₱')[0]
+                    product = self.product_map.get(selected_glasses)
                 else:
                     frame_type = self.frame_type.get()
                     lens_type = self.lens_type.get()
@@ -1151,16 +1168,16 @@ Notes: {notes}
                     return
                 
                 product_name = selected_product.split(' (₱')[0]
+                product = self.product_map.get(selected_product)
             
             try:
                 patient_name = f"{self.sales_patient_info_obj['Surname']}, {self.sales_patient_info_obj['FirstName']}"
                 total_price = price * quantity
                 
-                sale_query = "INSERT INTO sales (customer_name, total, sale_date) VALUES (%s, %s, NOW())"
-                sale_id = self.sm.db.execute(sale_query, (patient_name, total_price))
-                
-                item_query = "INSERT INTO sales_products (name, category, description, price, quantity) VALUES (%s, %s, %s, %s, %s)"
-                self.sm.db.execute(item_query, (product_name, category, f"Sale #{sale_id} - {patient_name}", price, quantity))
+                # Inventory items are sold under their shared catalog id; custom glasses are made to order
+                item = {'product_id': product.get('Inventory_ID') if product else None,
+                        'name': product_name, 'category': category, 'quantity': quantity, 'price': price}
+                sale_id = self.sm.create_sale(patient_name, [item])
 
                 # --- Add to billing automatically ---
                 if hasattr(self, 'billing_patient_info_obj') and self.billing_patient_info_obj:
@@ -1247,14 +1264,8 @@ Notes: {notes}
                 self.sales_summary_textbox.insert('end', 'Please select a patient to view their sales.')
                 return
             
-            all_sales = self.sm.get_all_sales()
             patient_name = f"{self.sales_patient_info_obj['Surname']}, {self.sales_patient_info_obj['FirstName']}"
-            
-            if not all_sales:
-                self.sales_summary_textbox.insert('end', 'No sales records yet.')
-                return
-            
-            patient_sales = [s for s in all_sales if s.get('customer_name') == patient_name]
+            patient_sales = self.sm.get_sales_by_customer(patient_name)
             
             if not patient_sales:
                 self.sales_summary_textbox.insert('end', f'No sales for {patient_name}')
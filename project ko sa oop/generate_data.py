@@ -0,0 +1,5 @@
+from database.data_generator import main
+
+
+if __name__ == '__main__':
+    main()
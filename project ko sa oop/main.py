@@ -1,6 +1,12 @@
 import customtkinter as ctk
 from database.db_connection import Database
-from backend.managers import PatientManager, DoctorManager, AppointmentManager, InventoryManager, BillingManager, UserManager, ProcedureManager, SalesManager, PrescriptionManager, MedicalRecordsManager, ReminderManager, InvoiceManager
+from database.migration import DatabaseMigration
+from database.schema_cache import SchemaCache
+from backend.managers import PatientManager, DoctorManager, AppointmentManager, InventoryManager, BillingManager, UserManager, ProcedureManager, SalesManager, PrescriptionManager, MedicalRecordsManager, ReminderManager, InvoiceManager, AvailabilityManager, RecallManager, ReportManager
+from backend.change_feed import ChangeFeed, install_change_triggers
+from backend.rollups import install_rollup_triggers, mark_all_dirty, ROLLUP_QUERIES
+from backend.prewarm import SessionPrewarmer, default_warmup_tasks
+from backend.jobs import JobScheduler, default_jobs
 from frames.dashboard_frame import DashboardFrame
 from frames.doctors_frame import DoctorsFrame
 from frames.medical_records_frame import MedicalRecordsFrame
@@ -17,20 +23,22 @@ from utils.password_manager import PasswordManager
 from utils.logger import setup_logging
 from utils.constants import *
 from tkinter import messagebox
+import threading
 
 logger = setup_logging(__name__)
 
 ctk.set_appearance_mode(APPEARANCE_MODE)
 ctk.set_default_color_theme(COLOR_THEME)
 
-class LoginWindow(ctk.CTk):
-    def __init__(self, db):
-        super().__init__()
+class LoginForm:
+    """Username/password form shared by the startup window and the re-login dialog."""
+
+    def init_login(self, db):
         self.db = db
         self.user_manager = UserManager(db)
-        self.title(LOGIN_WINDOW_TITLE)
-        self.geometry(LOGIN_GEOMETRY)
         self.user_data = None
+        self._login_thread = None
+        self._login_result = None
         self.build()
 
     def build(self):
@@ -40,23 +48,98 @@ class LoginWindow(ctk.CTk):
         self.user_entry = ctk.CTkEntry(frm, font=('Segoe UI', 12)); self.user_entry.grid(row=0, column=1, padx=10, pady=8)
         ctk.CTkLabel(frm, text='Password', font=('Segoe UI', 12)).grid(row=1, column=0, padx=10, pady=8)
         self.pw_entry = ctk.CTkEntry(frm, font=('Segoe UI', 12), show='*'); self.pw_entry.grid(row=1, column=1, padx=10, pady=8)
-        ctk.CTkButton(self, text='Login', command=self.try_login, font=('Segoe UI', 12, 'bold')).pack(pady=12)
+        self.login_btn = ctk.CTkButton(self, text='Login', command=self.try_login, font=('Segoe UI', 12, 'bold'))
+        self.login_btn.pack(pady=12)
+        self.pw_entry.bind('<Return>', lambda e: self.try_login())
 
     def try_login(self):
-        u = self.user_manager.verify_user(self.user_entry.get().strip(), self.pw_entry.get())
+        if self._login_thread and self._login_thread.is_alive():
+            return
+        username = self.user_entry.get().strip()
+        password = self.pw_entry.get()
+        self.login_btn.configure(state='disabled', text='Signing in...')
+
+        # bcrypt is deliberately slow; keep it off the Tk thread
+        def verify():
+            self._login_result = self.user_manager.verify_user(username, password)
+
+        self._login_result = None
+        self._login_thread = threading.Thread(target=verify, name='login-verify', daemon=True)
+        self._login_thread.start()
+        self.after(LOGIN_POLL_INTERVAL_MS, lambda: self._finish_login(username))
+
+    def _finish_login(self, username):
+        if self._login_thread.is_alive():
+            self.after(LOGIN_POLL_INTERVAL_MS, lambda: self._finish_login(username))
+            return
+
+        u = self._login_result
         if not u:
-            logger.warning(f"Failed login attempt with username: {self.user_entry.get().strip()}")
-            messagebox.showerror('Login failed', ERROR_INVALID_CREDENTIALS)
+            self.login_btn.configure(state='normal', text='Login')
+            logger.warning(f"Failed login attempt with username: {username}")
+            messagebox.showerror('Login failed', ERROR_INVALID_CREDENTIALS, parent=self)
             return
         
         self.user_data = u
-        self.destroy() 
+        self.on_login(u)
+
+    def on_login(self, user):
+        self.destroy()
+
+class LoginWindow(LoginForm, ctk.CTk):
+    def __init__(self, db, managers=None):
+        super().__init__()
+        self.title(LOGIN_WINDOW_TITLE)
+        self.geometry(LOGIN_GEOMETRY)
+        self.init_login(db)
+        # Warm the connection and shared lists while the user is still typing
+        if managers:
+            SessionPrewarmer(default_warmup_tasks(db, managers)).start()
+
+class LoginDialog(LoginForm, ctk.CTkToplevel):
+    """Login shown on top of the hidden main window after a logout."""
+
+    def __init__(self, master, db, on_success, on_cancel):
+        super().__init__(master)
+        self.title(LOGIN_WINDOW_TITLE)
+        self.geometry(LOGIN_GEOMETRY)
+        self.on_success = on_success
+        self.protocol('WM_DELETE_WINDOW', on_cancel)
+        self.init_login(db)
+        self.after(100, self.user_entry.focus_set)
+
+    def on_login(self, user):
+        self.destroy()
+        self.on_success(user)
+
+def build_managers(db):
+    """Creates the managers shared by the login prewarm and the main window."""
+    return {
+        'pm': PatientManager(db),
+        'dm': DoctorManager(db),
+        'am': AppointmentManager(db),
+        'im': InventoryManager(db),
+        'bm': BillingManager(db),
+        'proc_m': ProcedureManager(db),
+        'sm': SalesManager(db),
+        'pres_m': PrescriptionManager(db),
+        'mr_m': MedicalRecordsManager(db),
+        'rem_m': ReminderManager(db),
+        'inv_m': InvoiceManager(db),
+        'avail_m': AvailabilityManager(db),
+        'recall_m': RecallManager(db),
+        'rep_m': ReportManager(db)
+    }
 
 def ensure_sample_data(db):
     """
     Ensures that all necessary tables and some sample data exist in the database.
     This function is idempotent and can be run safely multiple times.
+
+    Returns the double-booked doctor slots that kept the one-booking-per-slot index
+    from being created (empty when there are none).
     """
+    double_bookings = []
     
     tables = {
         'patients': """
@@ -73,7 +156,11 @@ def ensure_sample_data(db):
               `Email` varchar(100) DEFAULT NULL,
               `Medical_History` text,
               `Registration_Date` date DEFAULT (curdate()),
-              PRIMARY KEY (`Patient_ID`)
+              `City` varchar(100) GENERATED ALWAYS AS (IF(LOCATE(',', `Address`) > 0, LEFT(TRIM(SUBSTRING_INDEX(`Address`, ',', -1)), 100), NULL)) STORED,
+              PRIMARY KEY (`Patient_ID`),
+              KEY `idx_patients_surname` (`Surname`),
+              KEY `idx_patients_firstname` (`FirstName`),
+              KEY `idx_patients_demographics` (`Registration_Date`, `Age_Group`, `Gender`, `City`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'archived_patients': """
@@ -130,7 +217,12 @@ def ensure_sample_data(db):
               `Appointment_Date` date NOT NULL,
               `Appointment_Time` time NOT NULL,
               `Status` varchar(20) NOT NULL,
-              PRIMARY KEY (`Appointment_ID`)
+              `Active_Slot` tinyint GENERATED ALWAYS AS (IF(`Status` = 'Scheduled', 1, NULL)) VIRTUAL,
+              `Updated_At` datetime(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+              PRIMARY KEY (`Appointment_ID`),
+              UNIQUE KEY `uq_appointments_active_slot` (`Doctor_ID`, `Appointment_Date`, `Appointment_Time`, `Active_Slot`),
+              KEY `idx_appointments_date` (`Appointment_Date`, `Appointment_Time`),
+              KEY `idx_appointments_updated` (`Updated_At`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'archived_appointments': """
@@ -142,7 +234,8 @@ def ensure_sample_data(db):
               `Appointment_Time` time NOT NULL,
               `Status` varchar(20) NOT NULL,
               `Deleted_On` datetime NOT NULL,
-              PRIMARY KEY (`Appointment_ID`)
+              PRIMARY KEY (`Appointment_ID`),
+              KEY `idx_archived_appointments_deleted` (`Deleted_On`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'inventory': """
@@ -176,7 +269,20 @@ def ensure_sample_data(db):
               `Billing_Date` date DEFAULT (curdate()),
               `Payment_Method` varchar(50) DEFAULT NULL,
               `Status` varchar(20) NOT NULL,
-              PRIMARY KEY (`Bill_ID`)
+              PRIMARY KEY (`Bill_ID`),
+              KEY `idx_billing_date` (`Billing_Date`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'doctor_availability': """
+            CREATE TABLE `doctor_availability` (
+              `Availability_ID` int NOT NULL AUTO_INCREMENT,
+              `Doctor_ID` int NOT NULL,
+              `Weekday` tinyint NOT NULL,
+              `Start_Time` time NOT NULL,
+              `End_Time` time NOT NULL,
+              `Slot_Minutes` smallint NOT NULL DEFAULT 15,
+              PRIMARY KEY (`Availability_ID`),
+              UNIQUE KEY `uq_doctor_availability_day` (`Doctor_ID`, `Weekday`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'users': """
@@ -198,7 +304,7 @@ def ensure_sample_data(db):
               PRIMARY KEY (`Procedure_ID`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
-        'sales_products': """
+        'sales_products': f"""
             CREATE TABLE `sales_products` (
               `id` int NOT NULL AUTO_INCREMENT,
               `name` varchar(100) NOT NULL,
@@ -206,7 +312,10 @@ def ensure_sample_data(db):
               `description` text,
               `price` decimal(10,2) NOT NULL,
               `quantity` int NOT NULL,
-              PRIMARY KEY (`id`)
+              `Reorder_Point` int NOT NULL DEFAULT {DEFAULT_REORDER_POINT},
+              `Below_Reorder` tinyint(1) GENERATED ALWAYS AS (`quantity` < `Reorder_Point`) STORED,
+              PRIMARY KEY (`id`),
+              KEY `idx_products_below_reorder` (`Below_Reorder`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'sales': """
@@ -215,7 +324,8 @@ def ensure_sample_data(db):
               `customer_name` varchar(100) NOT NULL,
               `total` decimal(10,2) NOT NULL,
               `sale_date` datetime NOT NULL,
-              PRIMARY KEY (`id`)
+              PRIMARY KEY (`id`),
+              KEY `idx_sales_date` (`sale_date`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'sale_items': """
@@ -225,7 +335,8 @@ def ensure_sample_data(db):
               `product_id` int NOT NULL,
               `quantity` int NOT NULL,
               `price` decimal(10,2) NOT NULL,
-              PRIMARY KEY (`id`)
+              PRIMARY KEY (`id`),
+              KEY `idx_sale_items_sale` (`sale_id`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'prescriptions': """
@@ -245,7 +356,8 @@ def ensure_sample_data(db):
               `OS_Axis` varchar(10) DEFAULT NULL,
               `OS_Add` varchar(10) DEFAULT NULL,
               `Notes` text,
-              PRIMARY KEY (`Prescription_ID`)
+              PRIMARY KEY (`Prescription_ID`),
+              KEY `idx_prescriptions_expiry` (`Expiry_Date`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'medical_records': """
@@ -260,7 +372,9 @@ def ensure_sample_data(db):
               `Clinical_Notes` text,
               `Recommendations` text,
               `Follow_up_Days` int DEFAULT '90',
-              PRIMARY KEY (`Record_ID`)
+              `Updated_At` datetime(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6),
+              PRIMARY KEY (`Record_ID`),
+              KEY `idx_records_updated` (`Updated_At`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'appointment_reminders': """
@@ -273,7 +387,14 @@ def ensure_sample_data(db):
               `Contact_Method` varchar(20) DEFAULT 'SMS',
               `Status` varchar(20) DEFAULT 'Pending',
               `Sent_Date` datetime DEFAULT NULL,
-              PRIMARY KEY (`Reminder_ID`)
+              `Attempts` tinyint NOT NULL DEFAULT 0,
+              `Claim_Token` varchar(36) DEFAULT NULL,
+              `Claimed_At` datetime DEFAULT NULL,
+              `Retry_After` datetime DEFAULT NULL,
+              PRIMARY KEY (`Reminder_ID`),
+              UNIQUE KEY `uq_reminders_appointment_date` (`Appointment_ID`, `Reminder_Date`),
+              KEY `idx_reminders_status_date` (`Status`, `Reminder_Date`),
+              KEY `idx_reminders_claim` (`Claim_Token`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """,
         'invoices': """
@@ -288,14 +409,147 @@ def ensure_sample_data(db):
               `Grand_Total` decimal(10,2) NOT NULL,
               `Status` varchar(20) DEFAULT 'Unpaid',
               `Generated_By` varchar(50) DEFAULT NULL,
-              PRIMARY KEY (`Invoice_ID`)
+              PRIMARY KEY (`Invoice_ID`),
+              KEY `idx_invoices_date` (`Invoice_Date`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'patient_recalls': """
+            CREATE TABLE `patient_recalls` (
+              `Recall_ID` int NOT NULL AUTO_INCREMENT,
+              `Patient_ID` int NOT NULL,
+              `Source` varchar(20) NOT NULL,
+              `Source_ID` int NOT NULL,
+              `Due_Date` date NOT NULL,
+              `Reason` varchar(255) DEFAULT NULL,
+              `Status` varchar(20) NOT NULL DEFAULT 'Pending',
+              `Created_At` datetime DEFAULT CURRENT_TIMESTAMP,
+              `Closed_At` datetime DEFAULT NULL,
+              PRIMARY KEY (`Recall_ID`),
+              UNIQUE KEY `uq_recalls_source` (`Source`, `Source_ID`),
+              KEY `idx_recalls_status_due` (`Status`, `Due_Date`),
+              KEY `idx_recalls_patient` (`Patient_ID`, `Due_Date`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'scan_watermarks': """
+            CREATE TABLE `scan_watermarks` (
+              `Scanner` varchar(50) NOT NULL,
+              `Last_Date` date NOT NULL,
+              `Last_ID` int NOT NULL DEFAULT '0',
+              `Last_Changed` datetime(6) DEFAULT NULL,
+              `Updated_At` datetime DEFAULT NULL,
+              PRIMARY KEY (`Scanner`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'inventory_movements': """
+            CREATE TABLE `inventory_movements` (
+              `Movement_ID` bigint NOT NULL AUTO_INCREMENT,
+              `Product_ID` int NOT NULL,
+              `Movement_Type` enum('sale','restock','adjustment','return') NOT NULL,
+              `Quantity` int NOT NULL,
+              `Balance_After` int NOT NULL,
+              `Sale_ID` int DEFAULT NULL,
+              `Reference` varchar(100) DEFAULT NULL,
+              `Created_At` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+              PRIMARY KEY (`Movement_ID`),
+              KEY `idx_movements_product` (`Product_ID`, `Movement_ID`),
+              KEY `idx_movements_sale` (`Sale_ID`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'low_stock_alerts': """
+            CREATE TABLE `low_stock_alerts` (
+              `Product_ID` int NOT NULL,
+              `Quantity` int NOT NULL,
+              `Reorder_Point` int NOT NULL,
+              `Raised_At` datetime NOT NULL,
+              PRIMARY KEY (`Product_ID`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'inventory_forecast': """
+            CREATE TABLE `inventory_forecast` (
+              `Inventory_ID` int NOT NULL,
+              `Stock_On_Hand` int NOT NULL DEFAULT '0',
+              `Daily_Demand` decimal(10,3) NOT NULL DEFAULT '0.000',
+              `Days_Left` decimal(10,1) DEFAULT NULL,
+              `Reorder_Qty` int NOT NULL DEFAULT '0',
+              `Reorder_By` date DEFAULT NULL,
+              `Updated_At` datetime DEFAULT NULL,
+              PRIMARY KEY (`Inventory_ID`),
+              KEY `idx_forecast_reorder` (`Reorder_Qty`, `Days_Left`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'report_dirty_days': """
+            CREATE TABLE `report_dirty_days` (
+              `Source` varchar(20) NOT NULL,
+              `Day` date NOT NULL,
+              PRIMARY KEY (`Source`, `Day`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'sales_daily': """
+            CREATE TABLE `sales_daily` (
+              `Day` date NOT NULL,
+              `Sales` int NOT NULL DEFAULT '0',
+              `Revenue` decimal(14,2) NOT NULL DEFAULT '0.00',
+              PRIMARY KEY (`Day`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'sales_daily_product': """
+            CREATE TABLE `sales_daily_product` (
+              `Day` date NOT NULL,
+              `Product_ID` int NOT NULL,
+              `Sales` int NOT NULL DEFAULT '0',
+              `Quantity` int NOT NULL DEFAULT '0',
+              `Revenue` decimal(14,2) NOT NULL DEFAULT '0.00',
+              PRIMARY KEY (`Day`, `Product_ID`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'billing_daily': """
+            CREATE TABLE `billing_daily` (
+              `Day` date NOT NULL,
+              `Payment_Method` varchar(50) NOT NULL DEFAULT '',
+              `Status` varchar(20) NOT NULL,
+              `Bills` int NOT NULL DEFAULT '0',
+              `Amount` decimal(14,2) NOT NULL DEFAULT '0.00',
+              PRIMARY KEY (`Day`, `Payment_Method`, `Status`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'invoices_daily': """
+            CREATE TABLE `invoices_daily` (
+              `Day` date NOT NULL,
+              `Status` varchar(20) NOT NULL DEFAULT '',
+              `Invoices` int NOT NULL DEFAULT '0',
+              `Total_Amount` decimal(14,2) NOT NULL DEFAULT '0.00',
+              `Tax` decimal(14,2) NOT NULL DEFAULT '0.00',
+              `Grand_Total` decimal(14,2) NOT NULL DEFAULT '0.00',
+              PRIMARY KEY (`Day`, `Status`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'patients_daily': """
+            CREATE TABLE `patients_daily` (
+              `Day` date NOT NULL,
+              `Age_Group` varchar(20) NOT NULL,
+              `Gender` varchar(10) NOT NULL,
+              `City` varchar(100) NOT NULL DEFAULT '',
+              `Patients` int NOT NULL DEFAULT '0',
+              PRIMARY KEY (`Day`, `Age_Group`, `Gender`, `City`)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+        """,
+        'table_versions': """
+            CREATE TABLE `table_versions` (
+              `Table_Name` varchar(64) NOT NULL,
+              `Shard` tinyint unsigned NOT NULL DEFAULT '0',
+              `Version` bigint NOT NULL DEFAULT '0',
+              `Updated_At` datetime(6) DEFAULT NULL,
+              PRIMARY KEY (`Table_Name`, `Shard`)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
         """
     }
 
     try:
-        # Get existing tables
-        existing_tables = {row['Tables_in_optical_clinic_db'] for row in db.fetch('SHOW TABLES')}
+        # Get existing tables (one information_schema read, reused by every migration check below);
+        # dropped first so the plan never starts from metadata another process has since changed
+        schema = SchemaCache(db)
+        schema.invalidate()
+        existing_tables = schema.tables()
         
         # Create tables that don't exist
         for table_name, create_sql in tables.items():
@@ -303,27 +557,44 @@ def ensure_sample_data(db):
                 logger.info(f"Creating table: {table_name}...")
                 db.execute(create_sql)
                 logger.info(f"Table {table_name} created successfully.")
+        if set(tables) - existing_tables:
+            schema.invalidate()
+
+        # Version counters that drive the UI auto-refresh, one row per shard
+        if 'table_versions' in existing_tables and not schema.has_column('table_versions', 'Shard'):
+            db.execute("""ALTER TABLE table_versions
+                          ADD COLUMN `Shard` tinyint unsigned NOT NULL DEFAULT '0' AFTER `Table_Name`,
+                          DROP PRIMARY KEY, ADD PRIMARY KEY (`Table_Name`, `Shard`)""")
+            schema.invalidate()
+        install_change_triggers(db)
+
+        # Dirty-day tracking for the report rollups; new rollup tables queue every existing day
+        install_rollup_triggers(db)
+        new_sources = [source for source, queries in ROLLUP_QUERIES.items()
+                       if any(table not in existing_tables for table, _ in queries)]
+        if new_sources:
+            mark_all_dirty(db, new_sources)
 
         # Check and add missing columns for existing tables
         # For patients table
         if 'patients' in existing_tables:
-            columns = db.fetch("SHOW COLUMNS FROM patients")
-            column_names = [col['Field'] for col in columns]
+            migration = DatabaseMigration(db)
+            column_names = schema.columns('patients')
             if 'Surname' not in column_names:
                 logger.info("Adding 'Surname' column to patients table...")
-                db.execute("ALTER TABLE patients ADD COLUMN `Surname` varchar(100) NOT NULL DEFAULT ''")
+                migration.add_column('patients', 'Surname', "varchar(100) NOT NULL DEFAULT ''")
                 logger.info("'Surname' column added to patients table.")
             if 'FirstName' not in column_names:
                 logger.info("Adding 'FirstName' column to patients table...")
-                db.execute("ALTER TABLE patients ADD COLUMN `FirstName` varchar(100) NOT NULL DEFAULT ''")
+                migration.add_column('patients', 'FirstName', "varchar(100) NOT NULL DEFAULT ''")
                 logger.info("'FirstName' column added to patients table.")
             if 'MiddleInitial' not in column_names:
                 logger.info("Adding 'MiddleInitial' column to patients table...")
-                db.execute("ALTER TABLE patients ADD COLUMN `MiddleInitial` varchar(10) DEFAULT NULL")
+                migration.add_column('patients', 'MiddleInitial', "varchar(10) DEFAULT NULL")
                 logger.info("'MiddleInitial' column added to patients table.")
             if 'Registration_Date' not in column_names:
                 logger.info("Adding 'Registration_Date' column to patients table...")
-                db.execute("ALTER TABLE patients ADD COLUMN `Registration_Date` date DEFAULT (curdate())")
+                migration.add_column('patients', 'Registration_Date', "date DEFAULT (curdate())")
                 logger.info("'Registration_Date' column added to patients table.")
 
             # Migrate data from old 'Name' column if it exists
@@ -351,24 +622,119 @@ def ensure_sample_data(db):
                     db.execute("UPDATE patients SET Surname=%s, FirstName=%s, MiddleInitial=%s WHERE Patient_ID=%s",
                                (surname, firstname, middleinitial, patient['Patient_ID']))
                 logger.info("Data migration completed. Dropping old 'Name' column...")
-                db.execute("ALTER TABLE patients DROP COLUMN `Name`")
+                migration.drop_column('patients', 'Name')
                 logger.info("'Name' column dropped from patients table.")
 
+            # Prefix indexes used by the autocomplete patient search
+            migration = DatabaseMigration(db)
+            migration.add_index('patients', 'idx_patients_surname', 'Surname')
+            migration.add_index('patients', 'idx_patients_firstname', 'FirstName')
+
+            # City parsed once from the free-text address, and a covering index for the demographics rollup
+            migration.add_column('patients', 'City', "varchar(100) GENERATED ALWAYS AS (IF(LOCATE(',', `Address`) > 0, LEFT(TRIM(SUBSTRING_INDEX(`Address`, ',', -1)), 100), NULL)) STORED")
+            migration.add_index('patients', 'idx_patients_demographics', ['Registration_Date', 'Age_Group', 'Gender', 'City'])
+
+        # One active booking per doctor slot, enforced by the database
+        if 'appointments' in existing_tables:
+            migration = DatabaseMigration(db)
+            if not migration.index_exists('appointments', 'uq_appointments_active_slot'):
+                duplicates = db.fetch("""SELECT Doctor_ID, Appointment_Date, Appointment_Time,
+                                                GROUP_CONCAT(Appointment_ID ORDER BY Appointment_ID) AS Appointment_IDs
+                                         FROM appointments WHERE Status = 'Scheduled'
+                                         GROUP BY Doctor_ID, Appointment_Date, Appointment_Time
+                                         HAVING COUNT(*) > 1""")
+                migration.add_column('appointments', 'Active_Slot',
+                                     "tinyint GENERATED ALWAYS AS (IF(`Status` = 'Scheduled', 1, NULL)) VIRTUAL")
+                if duplicates:
+                    # Which booking to keep is the clinic's call; leave them and retry on the next start
+                    for dup in duplicates:
+                        logger.error(f"Appointments {dup['Appointment_IDs']} double-book doctor {dup['Doctor_ID']} on "
+                                     f"{dup['Appointment_Date']} {dup['Appointment_Time']}; slot index not created")
+                    double_bookings = duplicates
+                else:
+                    migration.add_index('appointments', 'uq_appointments_active_slot',
+                                        ['Doctor_ID', 'Appointment_Date', 'Appointment_Time', 'Active_Slot'], unique=True)
+            # Range scans for the slot engine when searching across all doctors
+            migration.add_index('appointments', 'idx_appointments_date', ['Appointment_Date', 'Appointment_Time'])
+            # Write stamps, so the calendar reloads only the weeks that changed
+            migration.add_column('appointments', 'Updated_At',
+                                 "datetime(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)")
+            migration.add_index('appointments', 'idx_appointments_updated', 'Updated_At')
+        if 'archived_appointments' in existing_tables:
+            DatabaseMigration(db).add_index('archived_appointments', 'idx_archived_appointments_deleted', 'Deleted_On')
+
+        # Batch reminder generation and dispatch
+        if 'appointment_reminders' in existing_tables:
+            migration = DatabaseMigration(db)
+            migration.add_column('appointment_reminders', 'Attempts', "tinyint NOT NULL DEFAULT 0")
+            migration.add_column('appointment_reminders', 'Claim_Token', "varchar(36) DEFAULT NULL")
+            migration.add_column('appointment_reminders', 'Claimed_At', "datetime DEFAULT NULL")
+            migration.add_column('appointment_reminders', 'Retry_After', "datetime DEFAULT NULL")
+            if not migration.index_exists('appointment_reminders', 'uq_reminders_appointment_date'):
+                db.execute("""DELETE r1 FROM appointment_reminders r1
+                              JOIN appointment_reminders r2
+                                ON r1.Appointment_ID = r2.Appointment_ID AND r1.Reminder_Date = r2.Reminder_Date
+                               AND r1.Reminder_ID > r2.Reminder_ID""")
+                migration.add_index('appointment_reminders', 'uq_reminders_appointment_date',
+                                    ['Appointment_ID', 'Reminder_Date'], unique=True)
+            migration.add_index('appointment_reminders', 'idx_reminders_status_date', ['Status', 'Reminder_Date'])
+            migration.add_index('appointment_reminders', 'idx_reminders_claim', 'Claim_Token')
+
+        # Write stamps, so the follow-up sync picks up new and edited records alike
+        if 'medical_records' in existing_tables:
+            migration = DatabaseMigration(db)
+            migration.add_column('medical_records', 'Updated_At',
+                                 "datetime(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)")
+            migration.add_index('medical_records', 'idx_records_updated', 'Updated_At')
+        if 'scan_watermarks' in existing_tables:
+            DatabaseMigration(db).add_column('scan_watermarks', 'Last_Changed', "datetime(6) DEFAULT NULL")
+
+        # Range scans for the prescription expiry scanner
+        if 'prescriptions' in existing_tables:
+            DatabaseMigration(db).add_index('prescriptions', 'idx_prescriptions_expiry', 'Expiry_Date')
+
+        # Date-range scans that rebuild the report rollups
+        for table, index_name, column in (('sales', 'idx_sales_date', 'sale_date'),
+                                          ('sale_items', 'idx_sale_items_sale', 'sale_id'),
+                                          ('billing', 'idx_billing_date', 'Billing_Date'),
+                                          ('invoices', 'idx_invoices_date', 'Invoice_Date')):
+            if table in existing_tables:
+                DatabaseMigration(db).add_index(table, index_name, column)
+
+        # Stock ledger: products that predate it start from an opening balance
+        if 'inventory_movements' not in existing_tables:
+            SalesManager(db).record_opening_balances()
+
+        # Reorder points, with an indexed flag for the products below theirs
+        if 'sales_products' in existing_tables:
+            migration = DatabaseMigration(db)
+            migration.add_column('sales_products', 'Reorder_Point', f"int NOT NULL DEFAULT {DEFAULT_REORDER_POINT}")
+            migration.add_column('sales_products', 'Below_Reorder', "tinyint(1) GENERATED ALWAYS AS (`quantity` < `Reorder_Point`) STORED")
+            migration.add_index('sales_products', 'idx_products_below_reorder', 'Below_Reorder')
+        if 'low_stock_alerts' not in existing_tables:
+            SalesManager(db).rebuild_low_stock_alerts()
+
+        # Inventory items and their sales catalog entries share ids
+        if 'inventory' in existing_tables and 'sales_products' in existing_tables:
+            listed = SalesManager(db).sync_catalog()
+            if listed:
+                logger.info(f"Listed {listed} inventory items in the sales catalog")
+
         # For archived_patients table
         if 'archived_patients' in existing_tables:
-            columns = db.fetch("SHOW COLUMNS FROM archived_patients")
-            column_names = [col['Field'] for col in columns]
+            migration = DatabaseMigration(db)
+            column_names = schema.columns('archived_patients')
             if 'Surname' not in column_names:
                 logger.info("Adding 'Surname' column to archived_patients table...")
-                db.execute("ALTER TABLE archived_patients ADD COLUMN `Surname` varchar(100) NOT NULL DEFAULT ''")
+                migration.add_column('archived_patients', 'Surname', "varchar(100) NOT NULL DEFAULT ''")
                 logger.info("'Surname' column added to archived_patients table.")
             if 'FirstName' not in column_names:
                 logger.info("Adding 'FirstName' column to archived_patients table...")
-                db.execute("ALTER TABLE archived_patients ADD COLUMN `FirstName` varchar(100) NOT NULL DEFAULT ''")
+                migration.add_column('archived_patients', 'FirstName', "varchar(100) NOT NULL DEFAULT ''")
                 logger.info("'FirstName' column added to archived_patients table.")
             if 'MiddleInitial' not in column_names:
                 logger.info("Adding 'MiddleInitial' column to archived_patients table...")
-                db.execute("ALTER TABLE archived_patients ADD COLUMN `MiddleInitial` varchar(10) DEFAULT NULL")
+                migration.add_column('archived_patients', 'MiddleInitial', "varchar(10) DEFAULT NULL")
                 logger.info("'MiddleInitial' column added to archived_patients table.")
 
         # Ensure a default user exists
@@ -384,15 +750,34 @@ def ensure_sample_data(db):
 
     except Exception as e:
         logger.error(f"Error during sample data setup: {str(e)}")
+    return double_bookings
+
+
+def report_double_bookings(double_bookings):
+    """Tells an admin which bookings to cancel before double bookings can be blocked."""
+    lines = [f"  Doctor {dup['Doctor_ID']}, {dup['Appointment_Date']} {dup['Appointment_Time']}: "
+             f"appointments {dup['Appointment_IDs']}" for dup in double_bookings[:20]]
+    if len(double_bookings) > 20:
+        lines.append(f"  ... and {len(double_bookings) - 20} more (see the log)")
+    messagebox.showwarning('Double Bookings',
+                           'These doctor slots have more than one scheduled appointment:\n\n'
+                           + '\n'.join(lines)
+                           + '\n\nCancel the extra bookings in Appointments and restart. Until then '
+                           'new double bookings are not blocked.')
 
 class MainApp(ctk.CTk):
-    def __init__(self, db, user, **kwargs):
+    def __init__(self, db, user, managers=None, jobs=None, **kwargs):
         super().__init__()
         self.db = db
         self.user = user
+        self.managers = managers or build_managers(db)
+        self.jobs = jobs
         self.title(APP_TITLE)
         self.geometry(APP_GEOMETRY)
+        self.change_feed = ChangeFeed(db)
         self.build()
+        self.change_feed.poll()
+        self._poll_job = self.after(CHANGE_POLL_INTERVAL_MS, self.poll_changes)
 
     def build(self):
         # Top header 
@@ -403,8 +788,10 @@ class MainApp(ctk.CTk):
         left_top = ctk.CTkFrame(top, fg_color="transparent")
         left_top.pack(side='left', fill='y', padx=20, pady=15)
         ctk.CTkLabel(left_top, text="👤", font=('Segoe UI', 22)).pack(side='left', padx=5) # This emoji is generally safe
-        ctk.CTkLabel(left_top, text=f"{self.user['Username']}", font=('Segoe UI', 16, 'bold')).pack(side='left', padx=5)
-        ctk.CTkLabel(left_top, text=f"({self.user['Role']})", font=('Segoe UI', 12), text_color=("gray50", "gray70")).pack(side='left', padx=5)
+        self.user_label = ctk.CTkLabel(left_top, text=f"{self.user['Username']}", font=('Segoe UI', 16, 'bold'))
+        self.user_label.pack(side='left', padx=5)
+        self.role_label = ctk.CTkLabel(left_top, text=f"({self.user['Role']})", font=('Segoe UI', 12), text_color=("gray50", "gray70"))
+        self.role_label.pack(side='left', padx=5)
         
         right_top = ctk.CTkFrame(top, fg_color="transparent")
         right_top.pack(side='right', fill='y', padx=20, pady=15)
@@ -452,36 +839,50 @@ class MainApp(ctk.CTk):
         self.content = ctk.CTkFrame(main_container, fg_color=("white", "#0a0a0a"))
         self.content.pack(side='left', fill='both', expand=True, padx=10, pady=0)
 
-        # managers
-        managers = {
-            'pm': PatientManager(self.db),
-            'dm': DoctorManager(self.db),
-            'am': AppointmentManager(self.db),
-            'im': InventoryManager(self.db),
-            'bm': BillingManager(self.db),
-            'proc_m': ProcedureManager(self.db),
-            'sm': SalesManager(self.db),
-            'pres_m': PrescriptionManager(self.db),
-            'mr_m': MedicalRecordsManager(self.db),
-            'rem_m': ReminderManager(self.db),
-            'inv_m': InvoiceManager(self.db)
-        }
+        managers = self.managers
+        if self.change_feed.live:
+            # Cached lists must be dropped before frames react to the same change
+            self.change_feed.subscribe({'patients'}, managers['pm'].invalidate_cache)
+            self.change_feed.subscribe({'doctors'}, managers['dm'].invalidate_cache)
+            self.change_feed.subscribe({'inventory', 'sales_products'}, managers['im'].invalidate_cache)
+        else:
+            # Nothing would tell the cache about other terminals' writes; read through instead
+            for key in ('pm', 'dm', 'im'):
+                managers[key].cache_enabled = False
+                managers[key].invalidate_cache()
 
+        self.build_frames()
+        self.show_dashboard()
+
+    def build_frames(self):
+        managers = self.managers
         # frames - Only essential optical clinic frames
         self.frames = {}
         self.frames['dashboard'] = DashboardFrame(self.content, managers)
         self.frames['workflow'] = WorkflowFrame(self.content, managers)
-        self.frames['doctors'] = DoctorsFrame(self.content, managers['dm'])
-        self.frames['appointments'] = AppointmentsFrame(self.content, managers['am'], managers['pm'], managers['dm'])
+        self.frames['doctors'] = DoctorsFrame(self.content, managers['dm'], managers['avail_m'])
+        self.frames['appointments'] = AppointmentsFrame(self.content, managers['am'], managers['pm'], managers['dm'], managers['avail_m'])
         self.frames['medical_records'] = MedicalRecordsFrame(self.content, managers)
         self.frames['sales'] = SalesFrame(self.content, managers['sm'], managers['bm'], managers['pm'], managers['im'], managers['inv_m'])
         self.frames['inventory'] = InventoryFrame(self.content, managers['im'])
         self.frames['followup'] = FollowUpFrame(self.content, managers)
         self.frames['reports'] = ReportsFrame(self.content, managers)
         self.frames['archive'] = ArchiveFrame(self.content, managers)
-        self.frames['reminders'] = RemindersFrame(self.content, managers)
+        self.frames['reminders'] = RemindersFrame(self.content, managers, jobs=self.jobs)
 
-        self.show_dashboard()
+        self.change_feed.subscribe(DashboardFrame.WATCHED_TABLES, self.frames['dashboard'].on_data_changed)
+        self.change_feed.subscribe(AppointmentsFrame.WATCHED_TABLES, self.frames['appointments'].on_data_changed)
+
+    def destroy_frames(self):
+        self.change_feed.unsubscribe(self.frames['dashboard'].on_data_changed)
+        self.change_feed.unsubscribe(self.frames['appointments'].on_data_changed)
+        for frame in self.frames.values():
+            frame.destroy()
+        self.frames = {}
+
+    def poll_changes(self):
+        self.change_feed.poll()
+        self._poll_job = self.after(CHANGE_POLL_INTERVAL_MS, self.poll_changes)
 
     def switch_mode(self, mode):
         actual_mode = mode.split()[-1]  
@@ -525,8 +926,26 @@ class MainApp(ctk.CTk):
         self.hide_all()
         self.frames['reminders'].pack(fill='both',expand=True)
     def logout(self):
-        self.destroy()
-        main()
+        """Hide the window and ask for the next user; the connection, managers and caches stay."""
+        logger.info(f"User '{self.user['Username']}' logged out")
+        self.after_cancel(self._poll_job)
+        self.withdraw()
+        if not KEEP_FRAMES_ON_LOGOUT:
+            self.destroy_frames()
+        LoginDialog(self, self.db, on_success=self.resume_session, on_cancel=self.destroy)
+
+    def resume_session(self, user):
+        # Kept screens hold the previous user's forms and cart
+        if self.frames and user['Username'] != self.user['Username']:
+            self.destroy_frames()
+        self.user = user
+        self.user_label.configure(text=f"{user['Username']}")
+        self.role_label.configure(text=f"({user['Role']})")
+        if not self.frames:
+            self.build_frames()
+        self.show_dashboard()
+        self.deiconify()
+        self.poll_changes()
 
 def main():
     try:
@@ -537,13 +956,21 @@ def main():
             messagebox.showerror('Database Error', error_msg + f'\n\nError: {db.last_error}')
             return
         
-        ensure_sample_data(db)
-        login = LoginWindow(db)
+        double_bookings = ensure_sample_data(db)
+        managers = build_managers(db)
+        login = LoginWindow(db, managers)
         login.mainloop()
 
         if login.user_data:
-            app = MainApp(db, login.user_data)
-            app.mainloop()
+            if double_bookings and login.user_data['Role'] == 'Admin':
+                report_double_bookings(double_bookings)
+            jobs = JobScheduler(default_jobs())
+            jobs.start()
+            try:
+                app = MainApp(db, login.user_data, managers, jobs=jobs)
+                app.mainloop()
+            finally:
+                jobs.stop()
     except RuntimeError as e:
         error_msg = f'Failed to connect to database:\n\n{str(e)}'
         logger.error(error_msg)
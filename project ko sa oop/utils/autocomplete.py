@@ -0,0 +1,221 @@
+"""Type-ahead picker for patients, doctors and products"""
+import bisect
+import re
+import tkinter as tk
+import customtkinter as ctk
+from utils.ui_constants import AUTOCOMPLETE_MAX_RESULTS, AUTOCOMPLETE_DEBOUNCE_MS
+
+_TOKEN_SPLIT = re.compile(r"[\s,:;()\[\]\-]+")
+_NAVIGATION_KEYS = {'Up', 'Down', 'Return', 'KP_Enter', 'Escape', 'Tab', 'Left', 'Right', 'Home', 'End'}
+
+
+class PrefixIndex:
+    """Sorted token index that answers "starts with" queries with a binary search.
+
+    Every display string is split into lowercase tokens (ID, surname, first name, ...)
+    and each token is stored once in a sorted list, so a lookup costs O(log n + k)
+    instead of scanning every item.
+    """
+
+    def __init__(self, items=None):
+        self.items = []
+        self._item_set = set()
+        self._keys = []
+        self._positions = []
+        if items:
+            self.build(items)
+
+    @staticmethod
+    def tokenize(text):
+        return [token for token in _TOKEN_SPLIT.split(str(text).lower()) if token]
+
+    def build(self, items):
+        self.items = list(dict.fromkeys(items))
+        self._item_set = set(self.items)
+        pairs = sorted(
+            (token, pos)
+            for pos, item in enumerate(self.items)
+            for token in set(self.tokenize(item))
+        )
+        self._keys = [token for token, _ in pairs]
+        self._positions = [pos for _, pos in pairs]
+
+    def add(self, item):
+        """Add a single item (e.g. a server-side search hit) without rebuilding."""
+        if item in self._item_set:
+            return
+        pos = len(self.items)
+        self.items.append(item)
+        self._item_set.add(item)
+        for token in set(self.tokenize(item)):
+            i = bisect.bisect_right(self._keys, token)
+            self._keys.insert(i, token)
+            self._positions.insert(i, pos)
+
+    def __contains__(self, item):
+        return item in self._item_set
+
+    def __len__(self):
+        return len(self.items)
+
+    def search(self, query, limit=AUTOCOMPLETE_MAX_RESULTS):
+        tokens = self.tokenize(query)
+        if not tokens:
+            return self.items[:limit]
+
+        first, rest = tokens[0], tokens[1:]
+        lo = bisect.bisect_left(self._keys, first)
+        hi = bisect.bisect_left(self._keys, first + '\uffff')
+
+        results = []
+        seen = set()
+        for i in range(lo, hi):
+            pos = self._positions[i]
+            if pos in seen:
+                continue
+            seen.add(pos)
+            item = self.items[pos]
+            if rest:
+                words = self.tokenize(item)
+                if not all(any(w.startswith(t) for w in words) for t in rest):
+                    continue
+            results.append(item)
+            if len(results) >= limit:
+                break
+        return results
+
+
+class AutocompleteCombobox(ctk.CTkComboBox):
+    """Editable combobox that shows the top matches while the user types.
+
+    Items are loaded with ``set_items``. When the list handed over is only a slice of
+    the table (``partial=True``) and a ``search`` callable is given, queries that find
+    fewer than ``max_results`` local matches are forwarded to the server and the hits
+    are merged into the local index.
+    """
+
+    def __init__(self, master, search=None, max_results=AUTOCOMPLETE_MAX_RESULTS, **kwargs):
+        kwargs.pop('state', None)
+        kwargs.pop('values', None)
+        super().__init__(master, values=[], **kwargs)
+        self.search = search
+        self.max_results = max_results
+        self.index = PrefixIndex()
+        self.partial = False
+        self._popup = None
+        self._listbox = None
+        self._pending = None
+
+        self._entry.bind('<KeyRelease>', self._on_key_release, add='+')
+        self._entry.bind('<Down>', self._focus_popup, add='+')
+        self._entry.bind('<Return>', self._accept_first, add='+')
+        self._entry.bind('<Escape>', lambda e: self._hide_popup(), add='+')
+        self._entry.bind('<FocusOut>', lambda e: self.after(150, self._hide_unless_focused), add='+')
+
+    def set_items(self, items, partial=False):
+        self.index.build(items)
+        self.partial = partial
+        self.configure(values=self.index.items[:self.max_results])
+
+    def has_item(self, value):
+        return value in self.index
+
+    def matches(self, text):
+        local = self.index.search(text, self.max_results)
+        if not (self.partial and self.search and text.strip()) or len(local) >= self.max_results:
+            return local
+
+        remote = self.search(text.strip(), self.max_results) or []
+        for item in remote:
+            self.index.add(item)
+        merged = local + [item for item in remote if item not in local]
+        return merged[:self.max_results]
+
+    def _on_key_release(self, event):
+        if event.keysym in _NAVIGATION_KEYS:
+            return
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        self._pending = self.after(AUTOCOMPLETE_DEBOUNCE_MS, self._refresh)
+
+    def _refresh(self):
+        self._pending = None
+        results = self.matches(self.get())
+        self.configure(values=results)
+        if results and self.get().strip():
+            self._show_popup(results)
+        else:
+            self._hide_popup()
+
+    def _show_popup(self, results):
+        if self._popup is None or not self._popup.winfo_exists():
+            dark = ctk.get_appearance_mode() == 'Dark'
+            self._popup = tk.Toplevel(self)
+            self._popup.overrideredirect(True)
+            self._listbox = tk.Listbox(
+                self._popup, activestyle='none', borderwidth=0, highlightthickness=1,
+                font=self._apply_font_scaling(self._font),
+                bg='#1a1a1a' if dark else 'white', fg='white' if dark else 'black',
+                selectbackground='#1f6aa5' if dark else '#3498db', selectforeground='white'
+            )
+            self._listbox.pack(fill='both', expand=True)
+            self._listbox.bind('<ButtonRelease-1>', self._accept_selection)
+            self._listbox.bind('<Return>', self._accept_selection)
+            self._listbox.bind('<Escape>', lambda e: (self._hide_popup(), self._entry.focus_set()))
+            self._listbox.bind('<FocusOut>', lambda e: self.after(150, self._hide_unless_focused))
+
+        self._listbox.delete(0, 'end')
+        for item in results:
+            self._listbox.insert('end', item)
+        self._listbox.configure(height=min(len(results), 10))
+
+        self._popup.geometry(f"{self.winfo_width()}x{self._listbox.winfo_reqheight()}"
+                             f"+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def _popup_visible(self):
+        return self._popup is not None and self._popup.winfo_exists() and self._popup.winfo_viewable()
+
+    def _hide_popup(self):
+        if self._popup is not None and self._popup.winfo_exists():
+            self._popup.withdraw()
+
+    def _hide_unless_focused(self):
+        try:
+            focused = self.focus_get()
+        except KeyError:
+            focused = None
+        if focused is None or focused is not self._listbox:
+            self._hide_popup()
+
+    def _focus_popup(self, event=None):
+        if self._popup_visible() and self._listbox.size():
+            self._listbox.focus_set()
+            self._listbox.selection_clear(0, 'end')
+            self._listbox.selection_set(0)
+            self._listbox.activate(0)
+        return 'break'
+
+    def _accept_first(self, event=None):
+        if self._popup_visible() and self._listbox.size():
+            self._choose(self._listbox.get(0))
+        return 'break'
+
+    def _accept_selection(self, event=None):
+        selection = self._listbox.curselection()
+        if selection:
+            self._choose(self._listbox.get(selection[0]))
+        return 'break'
+
+    def _choose(self, value):
+        self._hide_popup()
+        self._entry.focus_set()
+        self._dropdown_callback(value)
+
+    def destroy(self):
+        if self._pending is not None:
+            self.after_cancel(self._pending)
+        if self._popup is not None and self._popup.winfo_exists():
+            self._popup.destroy()
+        super().destroy()
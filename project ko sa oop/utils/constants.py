@@ -1,3 +1,5 @@
+import os
+
 DEFAULT_TAX_RATE = 0.12  
 INVOICE_TAX_RATE = DEFAULT_TAX_RATE
 
@@ -6,8 +8,58 @@ PRESCRIPTION_EXPIRY_WARNING_DAYS = 30
 
 DEFAULT_FOLLOWUP_DAYS = 90
 
+# Recall queue scanners (seconds between runs of the background job)
+RECALL_SCAN_INTERVAL_S = 3600
+
+# Daily report rollups
+ROLLUP_REFRESH_INTERVAL_S = 300
+REPORT_DEFAULT_RANGE_DAYS = 30
+REPORT_TREND_WINDOW_DAYS = 7
+
+# Report job queue and its on-disk result cache (per user, independent of the working directory)
+REPORT_WORKERS = 2
+REPORT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".clinic_system", "cache", "reports")
+REPORT_CACHE_TTL_S = 7 * 24 * 3600
+REPORT_CACHE_MAX_FILES = 200
+
+# Made-to-order catalog entries (custom glasses) get ids from here up, clear of the
+# inventory ids that stocked products share with sales_products
+MADE_TO_ORDER_ID_BASE = 1000000000
+
+# Stock level below which a product raises a low-stock alert, unless it has its own reorder point
+DEFAULT_REORDER_POINT = 10
+
+# Inventory reorder forecast: demand is averaged over the window, and an item is
+# reordered when its stock cannot cover the supplier lead time plus the cover period
+FORECAST_WINDOW_DAYS = 90
+FORECAST_LEAD_TIME_DAYS = 14
+FORECAST_COVER_DAYS = 30
+FORECAST_REFRESH_INTERVAL_S = 900
+
+# Rows moved per transaction by BaseManager.archive_many/archive_where/restore_many
+ARCHIVE_CHUNK_SIZE = 1000
+
+# Seconds the shared schema metadata is trusted before it is re-read, so DDL run by
+# another process is picked up
+SCHEMA_CACHE_TTL_S = 300
+
+# Streaming exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Working hours for doctors without a doctor_availability row (weekday 0 = Monday)
+DEFAULT_WORK_DAYS = (0, 1, 2, 3, 4, 5)
+DEFAULT_WORK_START = "08:00"
+DEFAULT_WORK_END = "18:00"
+DEFAULT_SLOT_MINUTES = 15
+SLOT_SEARCH_HORIZON_DAYS = 14
+
 MIN_PASSWORD_LENGTH = 8
 PASSWORD_HASH_ALGORITHM = "bcrypt"  
+BCRYPT_ROUNDS = 12
+PASSWORD_HASH_TARGET_MS = 250
+LOGIN_POLL_INTERVAL_MS = 50
+# Keep the built screens across logout; they are only reused when the same user logs back in
+KEEP_FRAMES_ON_LOGOUT = False
 
 APP_TITLE = "Optical Clinic - Dashboard"
 LOGIN_WINDOW_TITLE = "Clinic Login"
@@ -18,13 +70,44 @@ HEADER_HEIGHT = 70
 
 DATABASE_NAME = "optical_clinic_db"
 CURSOR_TYPE = "dictionary"  
+DB_ERROR_DUPLICATE_KEY = 1062
 
 APPEARANCE_MODE = "dark"
 COLOR_THEME = "dark-blue"
 
+REMINDER_LEAD_DAYS = 1
+REMINDER_LOOKAHEAD_DAYS = 7
+REMINDER_DEFAULT_TIME = "09:00"
+REMINDER_DEFAULT_METHOD = "SMS"
+REMINDER_BATCH_SIZE = 100
+REMINDER_RATE_PER_MINUTE = 120
+REMINDER_MAX_ATTEMPTS = 3
+# Wait before retrying a failed send; doubles with each further attempt
+REMINDER_RETRY_BACKOFF_MINUTES = 5
+REMINDER_CLAIM_TIMEOUT_MINUTES = 15
+REMINDER_OUTBOX_DIR = "outbox"
+REMINDER_SMTP_HOST = None  # e.g. "localhost" with a local debugging SMTP server on 1025
+REMINDER_SMTP_PORT = 1025
+REMINDER_SMTP_FROM = "clinic@localhost"
+REMINDER_GENERATE_INTERVAL_S = 3600
+REMINDER_DISPATCH_INTERVAL_S = 60
+
+CHANGE_POLL_INTERVAL_MS = 3000
+# Seconds of overlap when asking which rows changed since a timestamp, for transactions
+# that commit a little after the rows they wrote were stamped
+CHANGE_LAG_S = 5
+# Counter rows per tracked table; each connection bumps its own, so concurrent writers rarely share one
+CHANGE_FEED_SHARDS = 16
+TRACKED_TABLES = ('patients', 'doctors', 'doctor_availability', 'appointments', 'inventory', 'sales', 'sale_items', 'sales_products', 'appointment_reminders', 'medical_records', 'prescriptions', 'billing', 'invoices', 'patient_recalls', 'low_stock_alerts')
+
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 LOG_FILE = "logs/clinic_system.log"
+LOG_ROTATION = "size"  # "size" or "time"
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_ROTATE_WHEN = "midnight"
+LOG_JSON = False
 
 ERROR_INVALID_CREDENTIALS = "Invalid username or password"
 ERROR_DB_CONNECTION = "Failed to connect to database. Please check:\n1. MySQL server is running\n2. Database credentials in database/db_config.py are correct\n3. Database '{}' exists"
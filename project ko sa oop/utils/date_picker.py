@@ -2,15 +2,24 @@
 import customtkinter as ctk
 from datetime import datetime, timedelta
 
+# Day colours by number of bookings: (minimum count, (light, dark))
+DENSITY_COLORS = [(12, ("#c0392b", "#922b21")), (6, ("#e67e22", "#ba6a1c")), (1, ("#f1c40f", "#b7950b"))]
+
+
 class DatePicker(ctk.CTkToplevel):
     """Calendar-based date picker dialog"""
     
-    def __init__(self, parent, title="Select Date"):
+    def __init__(self, parent, title="Select Date", density_loader=None):
+        """
+        ``density_loader(first_day, last_day)`` may return {date: count}; days are then
+        shaded by how busy they are, with one call per displayed month.
+        """
         super().__init__(parent)
         self.title(title)
-        self.geometry("300x320")
+        self.geometry("300x360" if density_loader else "300x320")
         self.resizable(False, False)
         self.selected_date = None
+        self.density_loader = density_loader
         
     
         self.transient(parent)
@@ -63,17 +72,30 @@ class DatePicker(ctk.CTkToplevel):
         days_in_month = (first_day.replace(day=28) + timedelta(days=4)).day
         start_weekday = first_day.weekday()  
         
+        density = {}
+        if self.density_loader:
+            try:
+                density = self.density_loader(first_day.date(), first_day.replace(day=days_in_month).date())
+            except Exception:
+                density = {}
+        
         day_num = 1
         for week in range(6):
             for day_of_week in range(7):
                 if (week == 0 and day_of_week < start_weekday) or day_num > days_in_month:
                     ctk.CTkLabel(self.calendar_frame, text="", fg_color="transparent").grid(row=week, column=day_of_week, padx=2, pady=2, sticky='nsew')
                 else:
+                    count = density.get(first_day.replace(day=day_num).date(), 0)
+                    color = ("#3498db" if day_num != datetime.now().day else "#27ae60", "#1f6aa5")
+                    for minimum, busy_color in DENSITY_COLORS:
+                        if count >= minimum:
+                            color = busy_color
+                            break
                     btn = ctk.CTkButton(
-                        self.calendar_frame, text=str(day_num),
+                        self.calendar_frame, text=f"{day_num}\n{count}" if count else str(day_num),
                         command=lambda d=day_num: self.select_date(d),
-                        height=30, font=('Segoe UI', 11),
-                        fg_color=("#3498db" if day_num != datetime.now().day else "#27ae60", "#1f6aa5"),
+                        height=36 if density else 30, font=('Segoe UI', 11),
+                        fg_color=color,
                         hover_color=("#2980b9", "#164d7a")
                     )
                     btn.grid(row=week, column=day_of_week, padx=2, pady=2, sticky='nsew')
@@ -1,28 +1,85 @@
+import atexit
+import json
 import logging
+import logging.handlers
 import os
-from utils.constants import LOG_LEVEL, LOG_FORMAT, LOG_FILE
+import queue
+import threading
+from utils.constants import (LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_ROTATION, LOG_MAX_BYTES,
+                             LOG_BACKUP_COUNT, LOG_ROTATE_WHEN, LOG_JSON)
 
+_listener = None
+_configure_lock = threading.Lock()
 
-def setup_logging(name):
-    logger = logging.getLogger(name)
-    logger.setLevel(getattr(logging, LOG_LEVEL))
-    
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, for log shippers and grep-by-field."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _EnqueueOnlyHandler(logging.handlers.QueueHandler):
+    """QueueHandler that skips formatting; the listener thread formats instead."""
+
+    def prepare(self, record):
+        return record
+
+
+def _build_handlers():
+    formatter = JsonFormatter() if LOG_JSON else logging.Formatter(LOG_FORMAT)
+    handlers = []
 
     log_dir = os.path.dirname(LOG_FILE)
     if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir)
 
     if log_dir:
-        file_handler = logging.FileHandler(LOG_FILE)
-        file_handler.setLevel(getattr(logging, LOG_LEVEL))
-        file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-        logger.addHandler(file_handler)
-  
+        if LOG_ROTATION == 'time':
+            file_handler = logging.handlers.TimedRotatingFileHandler(
+                LOG_FILE, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+        else:
+            file_handler = logging.handlers.RotatingFileHandler(
+                LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
+
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(getattr(logging, LOG_LEVEL))
-    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-    logger.addHandler(console_handler)
-    
+    console_handler.setFormatter(formatter)
+    handlers.append(console_handler)
+    return handlers
+
+
+def _configure():
+    """Attach a single queue handler to the root logger and start the writer thread once."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        root.setLevel(getattr(logging, LOG_LEVEL))
+        root.addHandler(_EnqueueOnlyHandler(log_queue))
+
+        _listener = logging.handlers.QueueListener(log_queue, *_build_handlers(), respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+
+
+def setup_logging(name):
+    _configure()
+    logger = logging.getLogger(name)
+    logger.setLevel(getattr(logging, LOG_LEVEL))
     return logger
 
 logger = setup_logging(__name__)
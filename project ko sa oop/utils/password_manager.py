@@ -1,4 +1,6 @@
+import time
 import bcrypt
+from utils.constants import BCRYPT_ROUNDS, PASSWORD_HASH_TARGET_MS
 from utils.logger import setup_logging
 
 logger = setup_logging(__name__)
@@ -11,7 +13,7 @@ class PasswordManager:
             raise ValueError("Password must be a non-empty string")
         
         try:
-            salt = bcrypt.gensalt(rounds=12)
+            salt = bcrypt.gensalt(rounds=BCRYPT_ROUNDS)
             hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
             return hashed.decode('utf-8')
         except Exception as e:
@@ -28,3 +30,34 @@ class PasswordManager:
         except Exception as e:
             logger.error(f"Error verifying password: {str(e)}")
             return False
+
+    @staticmethod
+    def benchmark(rounds_range=range(10, 15), samples=3, target_ms=PASSWORD_HASH_TARGET_MS):
+        """
+        Measure bcrypt verification latency for each cost factor on this machine.
+
+        Returns (timings, recommended) where timings maps rounds -> median ms and
+        recommended is the highest cost that still verifies within target_ms.
+        """
+        password = b'benchmark-password'
+        timings = {}
+        for rounds in rounds_range:
+            hashed = bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
+            runs = []
+            for _ in range(samples):
+                started = time.perf_counter()
+                bcrypt.checkpw(password, hashed)
+                runs.append((time.perf_counter() - started) * 1000)
+            timings[rounds] = sorted(runs)[len(runs) // 2]
+
+        within_target = [r for r, ms in timings.items() if ms <= target_ms]
+        recommended = max(within_target) if within_target else min(timings)
+        return timings, recommended
+
+
+if __name__ == '__main__':
+    timings, recommended = PasswordManager.benchmark()
+    for rounds, ms in timings.items():
+        marker = ' <= current' if rounds == BCRYPT_ROUNDS else ''
+        print(f"rounds={rounds:<3} verify={ms:8.1f} ms{marker}")
+    print(f"Target {PASSWORD_HASH_TARGET_MS} ms -> recommended BCRYPT_ROUNDS = {recommended}")
@@ -152,3 +152,13 @@ PAYMENT_METHODS = ['Cash', 'Card', 'Check']
 SALES_CATEGORIES = ['Lenses', 'Frames', 'Glasses', 'Contact Lenses', 'Eye Care Products', 'Cleaning Solutions', 'Cases & Accessories', 'Reading Glasses', 'Sunglasses', 'Blue Light Glasses']
 APPOINTMENT_STATUS = ['Scheduled', 'Done', 'Cancelled']
 REMINDER_METHODS = ['SMS', 'Email', 'Call']
+
+# AUTOCOMPLETE
+AUTOCOMPLETE_MAX_RESULTS = 20
+AUTOCOMPLETE_PRELOAD_LIMIT = 2000
+FREE_SLOT_SUGGESTIONS = 8
+AUTOCOMPLETE_DEBOUNCE_MS = 150
+
+# CALENDAR
+WEEK_CACHE_SIZE = 12
+CALENDAR_CELL_MAX_ENTRIES = 6